@@ -1,10 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import threading
-import time
+import os
 import random
-import re
 import math
+import time
+from textdetect import Detector
+from textdetect.incremental import LiveDocument
+from textdetect.worker import AnalysisWorker
+
+# Live mode rescores once typing pauses for this long
+LIVE_DELAY_MS = 40
+
+# Background animation: normal and slowest frame interval, interval while an
+# analysis runs, and the share of one CPU the animation may use
+FRAME_MS = 100
+MAX_FRAME_MS = 1000
+BUSY_FRAME_MS = 500
+ANIMATION_CPU_BUDGET = 0.02
 
 class AITextDetectorGUI:
     def __init__(self, root):
@@ -36,116 +48,26 @@ class AITextDetectorGUI:
         self.canvas = tk.Canvas(self.root, bg=self.colors['bg'], highlightthickness=0)
         self.canvas.pack(fill='both', expand=True)
 
+        # The shared engine's "pro" profile: the full lexicon plus the sentence-variety rule
+        self.detector = Detector('pro')
+        # One persistent worker; a new submission or an edit cancels the running job
+        self.worker = AnalysisWorker(self.detector.analyze_stream, self.deliver_result)
+        self.job_id = None
+        self.pred_label = None
+        # Per-block partial results of the text being typed, kept on the worker thread
+        self.live = LiveDocument(self.detector)
+        self.live_after = None
+
         self.setup_neural_background()
         self.setup_ui()
-        self.animate_background()
-        
-        self.ai_indicators = self.get_ai_indicators()
-        self.human_indicators = self.get_human_indicators()
-
-    def get_ai_indicators(self):
-        return {
-            'formal_phrases': [
-                'furthermore', 'moreover', 'consequently', 'therefore', 'nonetheless',
-                'nevertheless', 'additionally', 'subsequently', 'specifically', 'particularly',
-                'accordingly', 'alternatively', 'simultaneously', 'comparatively', 'essentially',
-                'fundamentally', 'substantially', 'significantly', 'comprehensively', 'extensively',
-                'systematically', 'methodically', 'strategically', 'effectively', 'efficiently',
-                'predominantly', 'consistently', 'precisely', 'accurately', 'thoroughly',
-                'systematically', 'methodically', 'strategically', 'comprehensively', 'extensively'
-            ],
-            'technical_terms': [
-                'algorithm', 'methodology', 'framework', 'paradigm', 'optimization',
-                'implementation', 'configuration', 'infrastructure', 'architecture', 'protocol',
-                'specification', 'initialization', 'iteration', 'evaluation', 'validation',
-                'authentication', 'authorization', 'encryption', 'deployment', 'scalability',
-                'interoperability', 'compatibility', 'functionality', 'capability', 'reliability',
-                'maintainability', 'sustainability', 'feasibility', 'viability', 'adaptability'
-            ],
-            'academic_phrases': [
-                'it is important to note', 'it should be emphasized', 'it is worth mentioning',
-                'research indicates', 'studies suggest', 'evidence shows', 'data reveals',
-                'analysis demonstrates', 'findings indicate', 'results suggest', 'research shows',
-                'empirical evidence', 'statistical analysis', 'quantitative data', 'qualitative research',
-                'peer-reviewed studies', 'scholarly articles', 'academic literature', 'theoretical framework',
-                'conceptual model', 'hypothesis testing', 'experimental design', 'control group',
-                'sample size', 'statistical significance', 'correlation analysis', 'regression model'
-            ],
-            'structured_phrases': [
-                'in conclusion', 'to summarize', 'in summary', 'to conclude', 'overall',
-                'in general', 'broadly speaking', 'on the whole', 'all things considered',
-                'taking everything into account', 'to put it simply', 'in other words',
-                'that is to say', 'namely', 'specifically', 'for instance', 'for example',
-                'such as', 'including', 'particularly', 'especially', 'notably', 'remarkably',
-                'interestingly', 'surprisingly', 'unexpectedly', 'predictably', 'understandably'
-            ],
-            'hedge_words': [
-                'potentially', 'possibly', 'presumably', 'arguably', 'conceivably',
-                'theoretically', 'hypothetically', 'presumably', 'allegedly', 'supposedly',
-                'apparently', 'seemingly', 'ostensibly', 'evidently', 'presumably',
-                'likely', 'probably', 'possibly', 'perhaps', 'maybe', 'might',
-                'could', 'would', 'should', 'may', 'can', 'generally', 'typically',
-                'usually', 'commonly', 'frequently', 'often', 'sometimes', 'occasionally'
-            ]
-        }
 
-    def get_human_indicators(self):
-        return {
-            'conversational': [
-                'i think', 'i believe', 'in my opinion', 'personally', 'honestly',
-                'frankly', 'to be honest', 'i feel like', 'i guess', 'i suppose',
-                'you know', 'like', 'um', 'uh', 'well', 'so', 'actually',
-                'basically', 'literally', 'totally', 'really', 'pretty', 'quite',
-                'sort of', 'kind of', 'a bit', 'a little', 'somewhat', 'rather',
-                'fairly', 'definitely', 'absolutely', 'certainly', 'surely', 'obviously'
-            ],
-            'personal_pronouns': [
-                'i am', 'i was', 'i have', 'i had', 'i will', 'i would',
-                'i do', 'i did', 'i can', 'i could', 'i should', 'i must',
-                'my', 'mine', 'myself', 'me', 'we', 'us', 'our', 'ours',
-                'ourselves', 'you', 'your', 'yours', 'yourself', 'yourselves'
-            ],
-            'informal_expressions': [
-                'gonna', 'wanna', 'gotta', 'kinda', 'sorta', 'dunno', 'yeah',
-                'yep', 'nope', 'nah', 'ok', 'okay', 'alright', 'sure', 'fine',
-                'cool', 'awesome', 'great', 'amazing', 'fantastic', 'wonderful',
-                'terrible', 'awful', 'horrible', 'weird', 'strange', 'funny',
-                'crazy', 'insane', 'nuts', 'wild', 'sick', 'dope', 'lit'
-            ],
-            'emotional_expressions': [
-                'i love', 'i hate', 'i enjoy', 'i like', 'i dislike', 'i prefer',
-                'i hope', 'i wish', 'i want', 'i need', 'i feel', 'i think',
-                'excited', 'happy', 'sad', 'angry', 'frustrated', 'disappointed',
-                'surprised', 'shocked', 'amazed', 'confused', 'worried', 'scared',
-                'nervous', 'anxious', 'relieved', 'grateful', 'proud', 'ashamed'
-            ],
-            'internet_slang': [
-                'lol', 'lmao', 'rofl', 'omg', 'wtf', 'btw', 'fyi', 'imo', 'imho',
-                'tbh', 'ngl', 'smh', 'fml', 'yolo', 'bae', 'squad', 'goals',
-                'vibes', 'mood', 'stan', 'ship', 'tea', 'spill', 'salty',
-                'savage', 'fire', 'ghost', 'flex', 'cap', 'no cap', 'periodt'
-            ],
-            'casual_time_refs': [
-                'yesterday', 'today', 'tomorrow', 'this morning', 'last night',
-                'right now', 'just now', 'a while ago', 'earlier', 'later',
-                'soon', 'recently', 'lately', 'nowadays', 'these days',
-                'back in the day', 'once upon a time', 'the other day'
-            ],
-            'personal_experiences': [
-                'my friend', 'my family', 'my mom', 'my dad', 'my brother',
-                'my sister', 'my job', 'my boss', 'my teacher', 'my school',
-                'when i was', 'i remember', 'i recall', 'i experienced',
-                'happened to me', 'i went to', 'i saw', 'i met', 'i heard'
-            ],
-            'contractions': [
-                "i'm", "you're", "he's", "she's", "it's", "we're", "they're",
-                "i've", "you've", "we've", "they've", "i'd", "you'd", "he'd",
-                "she'd", "we'd", "they'd", "i'll", "you'll", "he'll", "she'll",
-                "we'll", "they'll", "won't", "can't", "don't", "doesn't",
-                "didn't", "haven't", "hasn't", "hadn't", "shouldn't", "wouldn't",
-                "couldn't", "mustn't", "needn't", "daren't", "oughtn't"
-            ]
-        }
+        # The animation only runs while the window can be seen
+        self.window_visible = True
+        self.root.bind('<Map>', lambda e: e.widget is self.root and self.set_window_visible(True), add='+')
+        self.root.bind('<Unmap>', lambda e: e.widget is self.root and self.set_window_visible(False), add='+')
+        self.canvas.bind('<Visibility>',
+                         lambda e: self.set_window_visible(e.state != 'VisibilityFullyObscured'))
+        self.start_animation()
 
     def setup_neural_background(self):
         """Create animated neural network background"""
@@ -158,7 +80,7 @@ class AITextDetectorGUI:
             size = random.randint(3, 6)
             pulse = random.uniform(0, 2 * math.pi)
             neuron = {
-                'x': x, 'y': y, 'size': size, 'pulse': pulse,
+                'x': x, 'y': y, 'size': size, 'pulse': pulse, 'drawn': size,
                 'id': self.canvas.create_oval(x-size, y-size, x+size, y+size,
                                             fill=self.colors['accent'], outline='',
                                             stipple='gray25')
@@ -175,16 +97,68 @@ class AITextDetectorGUI:
                                                     width=1, stipple='gray12')
                     self.connections.append({'id': line_id, 'opacity': random.uniform(0.1, 0.3)})
 
+        self.animation_after = None
+        self.frame_interval = FRAME_MS
+        self.frame_cost = 0.0
+        self.last_frame = self.next_frame_due = time.perf_counter()
+
+    def start_animation(self):
+        if self.animation_after is None and self.window_visible and not self.low_power.get():
+            self.next_frame_due = time.perf_counter()
+            self.animation_after = self.root.after(0, self.animate_background)
+
+    def stop_animation(self):
+        if self.animation_after is not None:
+            self.root.after_cancel(self.animation_after)
+            self.animation_after = None
+
+    def set_window_visible(self, visible):
+        self.window_visible = visible
+        if visible:
+            self.start_animation()
+        else:
+            self.stop_animation()
+
+    def toggle_low_power(self):
+        if self.low_power.get():
+            self.stop_animation()
+        else:
+            self.start_animation()
+
     def animate_background(self):
-        """Animate the neural network"""
+        """Animate the neural network within ANIMATION_CPU_BUDGET"""
+        self.animation_after = None
+        start = time.perf_counter()
+        # Falling behind schedule means the event loop is busy, so back off
+        lag = start - self.next_frame_due
+        if lag * 1000 > self.frame_interval / 2:
+            self.frame_interval = min(self.frame_interval * 2, MAX_FRAME_MS)
+        else:
+            self.frame_interval = max(self.frame_interval * 0.9, FRAME_MS)
+
+        # Advance by the time that really passed, so slower frames keep the same speed
+        step = 0.1 * (start - self.last_frame) * 1000 / FRAME_MS
+        self.last_frame = start
+        canvas = str(self.canvas)
+        script = []
         for neuron in self.neurons:
-            neuron['pulse'] += 0.1
-            base_size = neuron['size']
-            new_size = base_size + math.sin(neuron['pulse']) * 2
-            x, y = neuron['x'], neuron['y']
-            self.canvas.coords(neuron['id'], x-new_size, y-new_size, x+new_size, y+new_size)
-        
-        self.root.after(100, self.animate_background)
+            neuron['pulse'] += step
+            # Only neurons whose drawn (whole pixel) size changes are updated
+            size = round(neuron['size'] + math.sin(neuron['pulse']) * 2)
+            if size != neuron['drawn']:
+                neuron['drawn'] = size
+                x, y = neuron['x'], neuron['y']
+                script.append(f"{canvas} coords {neuron['id']} {x-size} {y-size} {x+size} {y+size}")
+        # One Tcl call for all updates instead of one per neuron
+        if script:
+            self.canvas.tk.eval('\n'.join(script))
+
+        self.frame_cost = 0.8 * self.frame_cost + 0.2 * (time.perf_counter() - start)
+        interval = max(self.frame_interval, self.frame_cost * 1000 / ANIMATION_CPU_BUDGET)
+        if self.job_id is not None:
+            interval = max(interval, BUSY_FRAME_MS)
+        self.next_frame_due = start + interval / 1000
+        self.animation_after = self.root.after(int(interval), self.animate_background)
 
     def setup_ui(self):
         main_frame = tk.Frame(self.canvas, bg=self.colors['bg'])
@@ -218,6 +192,13 @@ class AITextDetectorGUI:
         tk.Label(input_header, text="📝 TEXT INPUT", font=("Segoe UI", 14, "bold"),
                 fg=self.colors['text'], bg=self.colors['secondary_bg']).pack(pady=15)
 
+        self.live_mode = tk.BooleanVar(value=False)
+        tk.Checkbutton(input_header, text="⚡ LIVE", variable=self.live_mode, command=self.toggle_live,
+                       font=("Segoe UI", 10, "bold"), fg=self.colors['accent'], bg=self.colors['secondary_bg'],
+                       selectcolor=self.colors['card_bg'], activebackground=self.colors['secondary_bg'],
+                       activeforeground=self.colors['accent'], relief='flat', bd=0,
+                       cursor='hand2').place(relx=1.0, rely=0.5, anchor='e', x=-15)
+
         # Text input with modern styling
         text_frame = tk.Frame(left_panel, bg=self.colors['card_bg'])
         text_frame.pack(fill='both', expand=True, padx=20, pady=20)
@@ -231,6 +212,7 @@ class AITextDetectorGUI:
             wrap=tk.WORD, padx=15, pady=15
         )
         self.text_input.pack(fill='both', expand=True)
+        self.text_input.bind('<<Modified>>', self.on_text_modified)
 
         # Button section
         button_frame = tk.Frame(left_panel, bg=self.colors['card_bg'], height=80)
@@ -272,6 +254,14 @@ class AITextDetectorGUI:
                                     bg=self.colors['secondary_bg'])
         self.status_label.pack(pady=10)
 
+        # Low-power mode stops the background animation (also TEXTDETECT_LOW_POWER=1)
+        self.low_power = tk.BooleanVar(value=os.environ.get('TEXTDETECT_LOW_POWER') == '1')
+        tk.Checkbutton(status_frame, text="🔋 LOW POWER", variable=self.low_power, command=self.toggle_low_power,
+                       font=("Segoe UI", 9), fg=self.colors['text_muted'], bg=self.colors['secondary_bg'],
+                       selectcolor=self.colors['card_bg'], activebackground=self.colors['secondary_bg'],
+                       activeforeground=self.colors['text'], relief='flat', bd=0,
+                       cursor='hand2').place(relx=1.0, rely=0.5, anchor='e', x=-15)
+
     def setup_initial_results(self):
         """Setup initial results display"""
         placeholder = tk.Label(self.results_content, 
@@ -297,75 +287,20 @@ class AITextDetectorGUI:
 
     def advanced_ai_detector(self, text):
         """Enhanced AI detection with 200+ indicators"""
-        text_lower = text.lower()
-        words = text.split()
-        sentences = [s.strip() for s in text.split('.') if s.strip()]
-        
-        ai_score = 0
-        human_score = 0
-        indicators_found = {'ai': [], 'human': []}
-
-        # Check AI indicators
-        for category, indicators in self.ai_indicators.items():
-            for indicator in indicators:
-                count = text_lower.count(indicator)
-                if count > 0:
-                    ai_score += count * 2
-                    indicators_found['ai'].append((indicator, count, category))
-
-        # Check human indicators
-        for category, indicators in self.human_indicators.items():
-            for indicator in indicators:
-                count = text_lower.count(indicator)
-                if count > 0:
-                    human_score += count * 2
-                    indicators_found['human'].append((indicator, count, category))
-
-        # Advanced linguistic analysis
-        avg_sentence_length = sum(len(s.split()) for s in sentences) / max(len(sentences), 1)
-        
-        # AI tends to have longer, more structured sentences
-        if avg_sentence_length > 25:
-            ai_score += 5
-        elif avg_sentence_length < 12:
-            human_score += 3
-
-        # Check for passive voice (more common in AI)
-        passive_patterns = ['was', 'were', 'been', 'being']
-        passive_count = sum(text_lower.count(p) for p in passive_patterns)
-        ai_score += passive_count * 0.5
-
-        # Check for varied sentence structure (more human)
-        sentence_lengths = [len(s.split()) for s in sentences]
-        if len(set(sentence_lengths)) > len(sentence_lengths) * 0.7:
-            human_score += 3
-
-        # Vocabulary complexity
-        unique_words = len(set(words))
-        vocab_ratio = unique_words / max(len(words), 1)
-        if vocab_ratio > 0.8:
-            ai_score += 2  # Very high vocabulary diversity can indicate AI
-        elif vocab_ratio < 0.6:
-            human_score += 2  # Repetitive vocabulary more human
-
-        # Determine final prediction
-        total_score = ai_score + human_score
-        if total_score == 0:
-            confidence = 50
-            prediction = "Neutral"
-        elif ai_score > human_score:
-            confidence = min((ai_score / total_score) * 100, 95)
-            prediction = "AI Generated"
-        else:
-            confidence = min((human_score / total_score) * 100, 95)
-            prediction = "Human Written"
-
-        return prediction, confidence, indicators_found, {
-            'avg_sentence_length': avg_sentence_length,
-            'vocab_ratio': vocab_ratio,
-            'passive_count': passive_count,
-            'ai_score': ai_score,
-            'human_score': human_score
+        return self.unpack_verdict(self.detector.analyze_text(text))
+
+    def unpack_verdict(self, verdict):
+        indicators_found = {'ai': verdict['matches']['ai'], 'human': verdict['matches']['human']}
+
+        return verdict['prediction'], verdict['confidence'], indicators_found, {
+            'avg_sentence_length': verdict['avg_sentence_length'],
+            'vocab_ratio': verdict['vocab_ratio'],
+            'passive_count': verdict['passive_count'],
+            'ai_score': verdict['ai_score'],
+            'human_score': verdict['human_score'],
+            'word_count': verdict['word_count'],
+            'char_count': verdict['char_count'],
+            'sentence_count': verdict['sentence_count']
         }
 
     def analyze_text(self):
@@ -379,60 +314,97 @@ class AITextDetectorGUI:
 
         self.status_label.configure(text="🔄 Neural networks processing... Analyzing linguistic patterns", 
                                    fg=self.colors['warning'])
-        self.analyze_button.configure(text="ANALYZING...", state='disabled')
+        self.analyze_button.configure(text="ANALYZING...")
+        # Clicking again while a job runs replaces it with the new one
+        self.job_id = self.worker.submit(text)
 
-        def process():
-            time.sleep(2)  # Simulate processing time
-            prediction, confidence, indicators, stats = self.advanced_ai_detector(text)
-            self.root.after(0, lambda: self.show_results(prediction, confidence, indicators, stats, text))
+    def deliver_result(self, job_id, verdict, error):
+        """Called on the worker thread; hands the result to the Tk event loop"""
+        self.root.after(0, lambda: self.finish_job(job_id, verdict, error))
 
-        threading.Thread(target=process, daemon=True).start()
+    def finish_job(self, job_id, verdict, error):
+        if job_id != self.job_id or not self.worker.is_current(job_id):
+            return
+        self.job_id = None
+        if error is not None:
+            self.analyze_button.configure(text="🔍 ANALYZE TEXT")
+            self.status_label.configure(text=f"❌ Analysis failed • {error}", fg=self.colors['danger'])
+            return
+        self.show_results(*self.unpack_verdict(verdict))
+
+    def on_text_modified(self, event=None):
+        """Editing the text cancels the analysis of the old text, or rescores it in live mode"""
+        self.text_input.edit_modified(False)
+        if self.live_mode.get():
+            self.schedule_live_update()
+        elif self.job_id is not None:
+            self.worker.cancel()
+            self.job_id = None
+            self.analyze_button.configure(text="🔍 ANALYZE TEXT")
+            self.status_label.configure(text="⏹ Analysis cancelled • The text was edited",
+                                        fg=self.colors['text_muted'])
+
+    def toggle_live(self):
+        if self.live_mode.get():
+            self.schedule_live_update()
+        elif self.live_after is not None:
+            self.root.after_cancel(self.live_after)
+            self.live_after = None
+
+    def schedule_live_update(self):
+        """Debounce keystrokes: rescore once typing pauses for LIVE_DELAY_MS"""
+        if self.live_after is not None:
+            self.root.after_cancel(self.live_after)
+        self.live_after = self.root.after(LIVE_DELAY_MS, self.live_update)
+
+    def live_update(self):
+        self.live_after = None
+        text = self.text_input.get("1.0", "end-1c")
+        if len(text.strip()) < 20:
+            self.status_label.configure(text="⚡ Live mode • Keep typing, at least 20 characters are needed",
+                                        fg=self.colors['text_muted'])
+            return
+        # Only the blocks changed since the last update are rescored
+        self.job_id = self.worker.submit(text, self.live.update)
 
-    def show_results(self, prediction, confidence, indicators, stats, text):
-        self.analyze_button.configure(text="🔍 ANALYZE TEXT", state='normal')
-        
-        # Clear previous results
+    def setup_results_panel(self):
+        """Build the results widgets once; show_results only updates them"""
         for widget in self.results_content.winfo_children():
             widget.destroy()
 
         # Create scrollable results
-        results_canvas = tk.Canvas(self.results_content, bg=self.colors['card_bg'], highlightthickness=0)
-        scrollbar = ttk.Scrollbar(self.results_content, orient="vertical", command=results_canvas.yview)
-        scrollable_frame = tk.Frame(results_canvas, bg=self.colors['card_bg'])
+        self.results_canvas = tk.Canvas(self.results_content, bg=self.colors['card_bg'], highlightthickness=0)
+        scrollbar = ttk.Scrollbar(self.results_content, orient="vertical", command=self.results_canvas.yview)
+        scrollable_frame = tk.Frame(self.results_canvas, bg=self.colors['card_bg'])
 
         scrollable_frame.bind(
             "<Configure>",
-            lambda e: results_canvas.configure(scrollregion=results_canvas.bbox("all"))
+            lambda e: self.results_canvas.configure(scrollregion=self.results_canvas.bbox("all"))
         )
 
-        results_canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        results_canvas.configure(yscrollcommand=scrollbar.set)
+        self.results_canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+        self.results_canvas.configure(yscrollcommand=scrollbar.set)
 
         # Main prediction display
         pred_frame = tk.Frame(scrollable_frame, bg=self.colors['secondary_bg'], relief='flat')
         pred_frame.pack(fill='x', padx=10, pady=10)
 
-        icon = "🤖" if prediction == "AI Generated" else "👤" if prediction == "Human Written" else "⚖️"
-        color = self.colors['ai_color'] if prediction == "AI Generated" else self.colors['human_color']
-        
-        pred_label = tk.Label(pred_frame, text=f"{icon} {prediction.upper()}",
-                             font=("Segoe UI", 18, "bold"), fg=color, bg=self.colors['secondary_bg'])
-        pred_label.pack(pady=15)
+        self.pred_label = tk.Label(pred_frame, font=("Segoe UI", 18, "bold"), bg=self.colors['secondary_bg'])
+        self.pred_label.pack(pady=15)
 
         # Confidence display with modern progress bar
         conf_frame = tk.Frame(pred_frame, bg=self.colors['secondary_bg'])
         conf_frame.pack(pady=10, padx=20, fill='x')
 
-        tk.Label(conf_frame, text=f"Confidence: {confidence:.1f}%",
-                font=("Segoe UI", 12, "bold"), fg=self.colors['text'], 
-                bg=self.colors['secondary_bg']).pack()
+        self.conf_label = tk.Label(conf_frame, font=("Segoe UI", 12, "bold"), fg=self.colors['text'],
+                                   bg=self.colors['secondary_bg'])
+        self.conf_label.pack()
 
         # Modern progress bar
         progress_bg = tk.Frame(conf_frame, bg='#333333', height=8)
         progress_bg.pack(fill='x', pady=10)
 
-        progress_fill = tk.Frame(progress_bg, bg=color, height=8)
-        progress_fill.place(x=0, y=0, relwidth=confidence/100, height=8)
+        self.progress_fill = tk.Frame(progress_bg, height=8)
 
         # Statistics section
         stats_frame = tk.Frame(scrollable_frame, bg=self.colors['card_bg'])
@@ -441,55 +413,77 @@ class AITextDetectorGUI:
         tk.Label(stats_frame, text="📈 LINGUISTIC ANALYSIS", font=("Segoe UI", 12, "bold"),
                 fg=self.colors['accent'], bg=self.colors['card_bg']).pack(anchor='w', pady=5)
 
+        self.stat_labels = []
+        for _ in range(7):
+            label = tk.Label(stats_frame, font=("Segoe UI", 10), fg=self.colors['text_dim'], bg=self.colors['card_bg'])
+            label.pack(anchor='w', padx=20)
+            self.stat_labels.append(label)
+
+        # Indicators found; packed only when there are some
+        self.indicators_frame = tk.Frame(scrollable_frame, bg=self.colors['card_bg'])
+        tk.Label(self.indicators_frame, text="🔍 KEY INDICATORS DETECTED", font=("Segoe UI", 12, "bold"),
+                fg=self.colors['accent'], bg=self.colors['card_bg']).pack(anchor='w', pady=5)
+
+        # Top 10 AI and human indicators
+        self.indicator_sections = {}
+        for group, title, color in (('ai', "🤖 AI Patterns:", self.colors['ai_color']),
+                                    ('human', "👤 Human Patterns:", self.colors['human_color'])):
+            frame = tk.Frame(self.indicators_frame, bg=self.colors['card_bg'])
+            tk.Label(frame, text=title, font=("Segoe UI", 11, "bold"),
+                    fg=color, bg=self.colors['card_bg']).pack(anchor='w', padx=20)
+            labels = [tk.Label(frame, font=("Segoe UI", 9), fg=self.colors['text_dim'], bg=self.colors['card_bg'])
+                      for _ in range(10)]
+            self.indicator_sections[group] = (frame, labels)
+
+        # Pack scrollbar and canvas
+        self.results_canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+    def show_results(self, prediction, confidence, indicators, stats):
+        self.analyze_button.configure(text="🔍 ANALYZE TEXT")
+        if self.pred_label is None:
+            self.setup_results_panel()
+
+        icon = "🤖" if prediction == "AI Generated" else "👤" if prediction == "Human Written" else "⚖️"
+        color = self.colors['ai_color'] if prediction == "AI Generated" else self.colors['human_color']
+
+        self.pred_label.configure(text=f"{icon} {prediction.upper()}", fg=color)
+        self.conf_label.configure(text=f"Confidence: {confidence:.1f}%")
+        self.progress_fill.configure(bg=color)
+        self.progress_fill.place(x=0, y=0, relwidth=confidence/100, height=8)
+
         stats_info = [
-            f"Words: {len(text.split())}",
-            f"Characters: {len(text)}",
-            f"Sentences: {len([s for s in text.split('.') if s.strip()])}",
+            f"Words: {stats['word_count']}",
+            f"Characters: {stats['char_count']}",
+            f"Sentences: {stats['sentence_count']}",
             f"Avg Sentence Length: {stats['avg_sentence_length']:.1f} words",
             f"Vocabulary Ratio: {stats['vocab_ratio']:.2f}",
             f"AI Score: {stats['ai_score']:.1f}",
             f"Human Score: {stats['human_score']:.1f}"
         ]
+        for label, stat in zip(self.stat_labels, stats_info):
+            label.configure(text=f"• {stat}")
 
-        for stat in stats_info:
-            tk.Label(stats_frame, text=f"• {stat}", font=("Segoe UI", 10),
-                    fg=self.colors['text_dim'], bg=self.colors['card_bg']).pack(anchor='w', padx=20)
+        # Repack only the indicator rows this result needs, in order
+        self.indicators_frame.pack_forget()
+        for frame, labels in self.indicator_sections.values():
+            frame.pack_forget()
+            for label in labels:
+                label.pack_forget()
 
-        # Indicators found
         if indicators['ai'] or indicators['human']:
-            indicators_frame = tk.Frame(scrollable_frame, bg=self.colors['card_bg'])
-            indicators_frame.pack(fill='x', padx=10, pady=10)
-
-            tk.Label(indicators_frame, text="🔍 KEY INDICATORS DETECTED", font=("Segoe UI", 12, "bold"),
-                    fg=self.colors['accent'], bg=self.colors['card_bg']).pack(anchor='w', pady=5)
-
-            # Show top AI indicators
-            if indicators['ai']:
-                ai_frame = tk.Frame(indicators_frame, bg=self.colors['card_bg'])
-                ai_frame.pack(fill='x', pady=5)
-                tk.Label(ai_frame, text="🤖 AI Patterns:", font=("Segoe UI", 11, "bold"),
-                        fg=self.colors['ai_color'], bg=self.colors['card_bg']).pack(anchor='w', padx=20)
-                
-                for indicator, count, category in sorted(indicators['ai'], key=lambda x: x[1], reverse=True)[:10]:
-                    tk.Label(ai_frame, text=f"• '{indicator}' ({count}x) - {category}",
-                            font=("Segoe UI", 9), fg=self.colors['text_dim'], 
-                            bg=self.colors['card_bg']).pack(anchor='w', padx=40)
-
-            # Show top human indicators
-            if indicators['human']:
-                human_frame = tk.Frame(indicators_frame, bg=self.colors['card_bg'])
-                human_frame.pack(fill='x', pady=5)
-                tk.Label(human_frame, text="👤 Human Patterns:", font=("Segoe UI", 11, "bold"),
-                        fg=self.colors['human_color'], bg=self.colors['card_bg']).pack(anchor='w', padx=20)
-                
-                for indicator, count, category in sorted(indicators['human'], key=lambda x: x[1], reverse=True)[:10]:
-                    tk.Label(human_frame, text=f"• '{indicator}' ({count}x) - {category}",
-                            font=("Segoe UI", 9), fg=self.colors['text_dim'], 
-                            bg=self.colors['card_bg']).pack(anchor='w', padx=40)
-
-        # Pack scrollbar and canvas
-        results_canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+            self.indicators_frame.pack(fill='x', padx=10, pady=10)
+            for group in ('ai', 'human'):
+                if not indicators[group]:
+                    continue
+                frame, labels = self.indicator_sections[group]
+                frame.pack(fill='x', pady=5)
+                top = sorted(indicators[group], key=lambda x: x[1], reverse=True)[:10]
+                for label, (indicator, count, category) in zip(labels, top):
+                    label.configure(text=f"• '{indicator}' ({count}x) - {category}")
+                    label.pack(anchor='w', padx=40)
+
+        self.results_canvas.yview_moveto(0)
 
         # Update status
         status_text = f"✅ Analysis complete - {prediction} ({confidence:.1f}% confidence)"
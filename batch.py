@@ -0,0 +1,87 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+_detector = None
+_factory = None
+
+
+def _init_worker(detector_factory):
+    """Build one detector per worker process"""
+    global _detector, _factory
+    _factory = detector_factory
+    _detector = detector_factory()
+
+
+def _analyze_chunk(texts, version=None):
+    global _detector
+    # The parent swapped its lexicon: rebuild so results match the parent's
+    if version is not None and getattr(_detector, 'version', version) != version:
+        _detector = _factory()
+    try:
+        # One batched call to the detector's scorer for the whole chunk
+        return _detector.analyze_batch(texts)
+    except Exception:
+        pass
+    # Something in the chunk failed: analyze one by one so only that text gets an error
+    results = []
+    for text in texts:
+        try:
+            results.append(_detector.analyze_text(text))
+        except Exception as e:
+            results.append({'error': str(e)})
+    return results
+
+
+class BatchAnalyzer:
+    """Fan analyze_text out over a process pool and yield results in input order"""
+
+    def __init__(self, detector_factory, workers=None, chunk_size=16, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        # Bound the number of in-flight chunks so huge batches are never
+        # fully materialized in memory
+        self.max_pending = max_pending or self.workers * 4
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(detector_factory,)
+        )
+
+    def analyze(self, items, version=None):
+        """Yield one result per item, in order.
+
+        Strings are analyzed in the pool; anything else (e.g. an error dict
+        produced while validating the input) is passed through in its slot.
+        `version` is the caller's detector version; workers holding another
+        version rebuild their detector first.
+        """
+        pending = deque()
+        chunk = []
+
+        def flush():
+            texts = [item for item in chunk if isinstance(item, str)]
+            future = self.executor.submit(_analyze_chunk, texts, version) if texts else None
+            pending.append((future, list(chunk)))
+            chunk.clear()
+
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                flush()
+                while len(pending) >= self.max_pending:
+                    yield from self._collect(pending.popleft())
+        if chunk:
+            flush()
+        while pending:
+            yield from self._collect(pending.popleft())
+
+    @staticmethod
+    def _collect(entry):
+        future, chunk = entry
+        results = iter(future.result() if future else ())
+        for item in chunk:
+            yield next(results) if isinstance(item, str) else item
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
@@ -0,0 +1,293 @@
+"""Benchmark suite for the detector.
+
+Generates deterministic synthetic corpora and measures throughput, p50/p99
+latency and peak memory of every analysis path:
+
+    single   AITextDetector.analyze_text, one text per call
+    gui      AITextDetectorGUI.advanced_ai_detector, one text per call (no window)
+    batch    BatchAnalyzer over a process pool, one corpus per call
+    http     POST /analyze through the Flask test client, or a live server (--url)
+
+Results are written as JSON; --compare reports every throughput, p99 or
+memory change beyond --threshold against an earlier run and exits with 1 if
+anything regressed.
+
+    python bench.py
+    python bench.py --paths single gui --corpora tweet essay
+    python bench.py --output before.json
+    python bench.py --output after.json --compare before.json
+
+Peak memory is the largest amount of Python memory traced in this process
+during one extra (untimed) pass; batch workers run in other processes and
+are not included. bench_matcher.py benchmarks the phrase matcher alone.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import urllib.request
+
+FILLER = (
+    "the a of and to in is that it for on are with as they be at one have this "
+    "from or had by word but what some we can out other were all there when up "
+    "use your how said an each she which do their time if will way about many "
+    "then them would write like so these her long make thing see him two has "
+    "look more day could go come did number sound no most people my over know "
+    "water than call first who may down side been now find any new work part"
+).split()
+
+# name: (number of texts, characters per text, share of words that start an indicator phrase)
+CORPORA = {
+    'tweet': (400, 200, 0.03),
+    'essay': (60, 4000, 0.03),
+    'document': (2, 1024 * 1024, 0.03),
+    'dense': (60, 4000, 0.30),
+    'clean': (60, 4000, 0.0),
+}
+
+PATHS = ['single', 'gui', 'batch', 'http']
+
+
+def make_text(rng, size, density, phrases, filler):
+    """Sentences of 5-30 words, roughly `size` characters long"""
+    sentences = []
+    length = 0
+    while length < size:
+        words = []
+        for _ in range(rng.randint(5, 30)):
+            words.append(rng.choice(phrases) if rng.random() < density else rng.choice(filler))
+        sentence = ' '.join(words)
+        sentence = sentence[0].upper() + sentence[1:] + '.'
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return ' '.join(sentences)
+
+
+def make_corpus(name, groups, seed=0):
+    """The texts of corpus `name`; the same seed always gives the same texts"""
+    from textdetect.lexicon import normalize_lexicon
+    from textdetect.token_index import tokenize
+
+    count, size, density = CORPORA[name]
+    groups = normalize_lexicon(groups)
+    phrases = sorted({phrase for group in ('ai', 'human') for items in groups[group].values()
+                      for phrase in items})
+    indicator_tokens = {token for categories in groups.values() for items in categories.values()
+                        for phrase in items for token in tokenize(phrase)}
+    # Filler never contains an indicator word, so 'clean' texts match nothing
+    filler = [word for word in FILLER if word not in indicator_tokens]
+    rng = random.Random(f'{seed}:{name}')
+    return [make_text(rng, size, density, phrases, filler) for _ in range(count)]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+
+def measure(run, texts, repeat):
+    """Time `run` (which returns one latency per call) and trace its peak memory"""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        latencies.extend(run(texts))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    run(texts)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = sum(len(text) for text in texts) * repeat
+    return {
+        'texts': len(texts) * repeat,
+        'calls': len(latencies),
+        'seconds': round(elapsed, 4),
+        'texts_per_s': round(len(texts) * repeat / elapsed, 2),
+        'mb_per_s': round(size / elapsed / 1e6, 3),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def per_text(func):
+    def run(texts):
+        latencies = []
+        for text in texts:
+            start = time.perf_counter()
+            func(text)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+    return run
+
+
+def single_runner():
+    from main import detector
+    return per_text(detector.analyze_text), lambda: None
+
+
+def gui_runner():
+    from SourceCode import AITextDetectorGUI
+    from textdetect import Detector
+
+    # The detector does not need a window
+    gui = AITextDetectorGUI.__new__(AITextDetectorGUI)
+    gui.detector = Detector('pro')
+    return per_text(gui.advanced_ai_detector), lambda: None
+
+
+def batch_runner(workers):
+    import main
+    from batch import BatchAnalyzer
+
+    analyzer = BatchAnalyzer(main.make_detector, workers=workers)
+    # Start every worker before timing anything
+    list(analyzer.analyze(['warm up the worker pool'] * analyzer.workers * analyzer.chunk_size))
+
+    def run(texts):
+        start = time.perf_counter()
+        for _ in analyzer.analyze(texts, main.detector.version):
+            pass
+        return [time.perf_counter() - start]
+    return run, analyzer.shutdown
+
+
+def http_runner(url):
+    if url is None:
+        import main
+
+        client = main.app.test_client()
+
+        def post(text):
+            response = client.post('/analyze', json={'text': text})
+            assert response.status_code == 200, response.get_json()
+
+        def run(texts):
+            # Measure analysis, not cache hits
+            main.result_cache.clear()
+            if main.near_duplicates is not None:
+                main.near_duplicates.clear()
+            return per_text(post)(texts)
+        return run, lambda: None
+
+    # A live server keeps its cache between runs, so every request is made unique
+    nonce = f'{time.time_ns():x}'
+    counter = iter(range(sys.maxsize))
+
+    def post(text):
+        body = json.dumps({'text': f'{text} {nonce}x{next(counter)}'}).encode('utf-8')
+        request = urllib.request.Request(url, body, {'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request) as response:
+            response.read()
+    return per_text(post), lambda: None
+
+
+def make_runner(path, args):
+    if path == 'single':
+        return single_runner()
+    if path == 'gui':
+        return gui_runner()
+    if path == 'batch':
+        return batch_runner(args.workers)
+    if path == 'http':
+        return http_runner(args.url)
+    raise ValueError(f'Unknown path {path!r}')
+
+
+def run_suite(paths, corpora, repeat=3, seed=0, args=None):
+    from main import detector
+
+    groups = detector.indicator_groups()
+    texts = {name: make_corpus(name, groups, seed) for name in corpora}
+    results = {}
+    for path in paths:
+        run, close = make_runner(path, args)
+        try:
+            for name in corpora:
+                # Huge documents through the per-request paths are slow; once is enough
+                times = 1 if CORPORA[name][1] >= 1024 * 1024 else repeat
+                result = measure(run, texts[name], times)
+                results[f'{path}/{name}'] = result
+                print(f"{path + '/' + name:<18} {result['texts_per_s']:>10.1f} texts/s "
+                      f"{result['mb_per_s']:>8.2f} MB/s  p50 {result['p50_ms']:>9.2f} ms  "
+                      f"p99 {result['p99_ms']:>9.2f} ms  peak {result['peak_memory_kb']:>9.0f} KB",
+                      file=sys.stderr)
+        finally:
+            close()
+    return {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': seed,
+            'repeat': repeat,
+            'detector_version': detector.version,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    """List (name, metric, old, new, relative change, regressed) for every change beyond `threshold`"""
+    changes = []
+    for name, new in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        # Throughput should go up; latency and memory should go down
+        for metric, higher_is_better in (('texts_per_s', True), ('p99_ms', False),
+                                         ('peak_memory_kb', False)):
+            if not old[metric]:
+                continue
+            change = (new[metric] - old[metric]) / old[metric]
+            if abs(change) > threshold:
+                regressed = change < 0 if higher_is_better else change > 0
+                changes.append((name, metric, old[metric], new[metric], change, regressed))
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paths', nargs='+', choices=PATHS, default=PATHS)
+    parser.add_argument('--corpora', nargs='+', choices=list(CORPORA), default=list(CORPORA))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='batch pool size')
+    parser.add_argument('--url', help='benchmark a live server instead of the Flask test client')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='earlier results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative change reported by --compare (default 0.10)')
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.paths, args.corpora, args.repeat, args.seed, args)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        changes = compare(baseline, report, args.threshold)
+        for name, metric, old, new, change, regressed in changes:
+            label = 'REGRESSION' if regressed else 'improvement'
+            print(f'{label:<11} {name:<18} {metric:<15} {old:>12} -> {new:<12} ({change:+.0%})',
+                  file=sys.stderr)
+        if not changes:
+            print(f'No change beyond {args.threshold:.0%}', file=sys.stderr)
+        if any(change[-1] for change in changes):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
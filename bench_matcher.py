@@ -0,0 +1,99 @@
+"""Compare the token-index matcher with per-phrase scanning.
+
+`str.count` is the original (substring) loop, `regex` is the only correct
+alternative without an index: one word-boundary regex per phrase.
+
+Run with: python bench_matcher.py
+"""
+import random
+import re
+import time
+
+from textdetect.token_index import TokenMatcher
+
+FILLER = (
+    "the a of and to in is that it for on are with as they be at one have this "
+    "from or had by word but what some we can out other were all there when up "
+    "use your how said an each she which do their time if will way about many"
+).split()
+
+
+def make_dictionary(size, rng):
+    """Build a {category: [phrase, ...]} dictionary with `size` phrases"""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    phrases = set()
+    while len(phrases) < size:
+        words = [''.join(rng.choice(letters) for _ in range(rng.randint(3, 9)))
+                 for _ in range(rng.randint(1, 3))]
+        phrases.add(' '.join(words))
+    phrases = sorted(phrases)
+    return {'category_%d' % i: phrases[i::5] for i in range(5)}
+
+
+def make_text(length, dictionary, rng):
+    """Random lowercase text of roughly `length` characters seeded with phrases"""
+    phrases = [p for group in dictionary.values() for p in group]
+    parts = []
+    size = 0
+    while size < length:
+        word = rng.choice(phrases) if rng.random() < 0.05 else rng.choice(FILLER)
+        parts.append(word)
+        size += len(word) + 1
+    return ' '.join(parts)
+
+
+def count_loop(dictionary, text):
+    """The original implementation: one full substring scan per phrase"""
+    found = []
+    for category, phrases in dictionary.items():
+        for phrase in phrases:
+            count = text.count(phrase)
+            if count > 0:
+                found.append((phrase, count, category))
+    return found
+
+
+def compile_regexes(dictionary):
+    return [(phrase, category, re.compile(r"(?<![\w'-])" + re.escape(phrase) + r"(?![\w'-])"))
+            for category, phrases in dictionary.items() for phrase in phrases]
+
+
+def regex_loop(regexes, text):
+    """Word-boundary-correct, but still one full scan per phrase"""
+    found = []
+    for phrase, category, pattern in regexes:
+        count = len(pattern.findall(text))
+        if count > 0:
+            found.append((phrase, count, category))
+    return found
+
+
+def timed(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'phrases':>8} {'text KB':>8} {'str.count ms':>13} {'regex ms':>9} "
+          f"{'index ms':>9} {'vs count':>9}")
+    for size in (50, 300, 1000, 3000):
+        dictionary = make_dictionary(size, rng)
+        matcher = TokenMatcher({'bench': dictionary})
+        regexes = compile_regexes(dictionary)
+        for length in (2_000, 20_000, 50_000, 200_000):
+            text = make_text(length, dictionary, rng)
+            assert matcher.find(text)['bench'] == regex_loop(regexes, text)
+            old = timed(count_loop, dictionary, text)
+            slow = timed(regex_loop, regexes, text, repeat=1)
+            new = timed(matcher.find, text)
+            print(f"{size:>8} {length // 1000:>8} {old * 1000:>13.2f} {slow * 1000:>9.2f} "
+                  f"{new * 1000:>9.2f} {old / new:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Compare the sentence segmenter with the '.' splitter it replaced.
+
+Both turn a piece, and the piece.split() that TextStats makes for its word
+totals anyway, into sentence lengths; times and peak memory are for that
+step alone. The text mixes '?', '!', abbreviations and decimals, which the
+old splitter got wrong; the sentence counts show by how much.
+
+Run with: python bench_sentences.py
+"""
+import random
+import tracemalloc
+
+from bench_matcher import FILLER, timed
+from textdetect.sentences import sentence_breaks
+
+ENDINGS = ['.', '.', '.', '?', '!', '...', '."']
+EXTRAS = ['Dr.', 'e.g.', 'U.S.', '3.14', 'i.e.', 'Mr.', 'example.com', 'J.']
+
+
+def make_text(length, rng):
+    """Random sentences of 3 to 40 words, roughly `length` characters long, and their number"""
+    sentences = []
+    size = 0
+    while size < length:
+        words = [rng.choice(EXTRAS) if rng.random() < 0.04 else rng.choice(FILLER)
+                 for _ in range(rng.randint(3, 40))]
+        sentence = ' '.join(words)
+        sentence = sentence[0].upper() + sentence[1:] + rng.choice(ENDINGS)
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return ' '.join(sentences), len(sentences)
+
+
+def split_on_periods(piece, words):
+    """The old splitter: every '.' ends a sentence, and every segment is split again"""
+    lengths = [len(segment.split()) for segment in piece.split('.')]
+    return [length for length in lengths if length]
+
+
+def segment(piece, words):
+    """sentences.py: sentence lengths are differences between break indices"""
+    lengths = []
+    previous = -1
+    for i in sentence_breaks(words):
+        lengths.append(i - previous)
+        previous = i
+    if previous < len(words) - 1:
+        lengths.append(len(words) - 1 - previous)
+    return lengths
+
+
+def peak_kb(func, text, words):
+    tracemalloc.start()
+    func(text, words)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'text KB':>8} {'old ms':>8} {'new ms':>8} {'speedup':>8} {'old peak KB':>12} "
+          f"{'new peak KB':>12} {'old sentences':>14} {'new sentences':>14} {'actual':>7}")
+    for length in (2_000, 20_000, 200_000, 2_000_000):
+        text, actual = make_text(length, rng)
+        words = text.split()
+        old = timed(split_on_periods, text, words)
+        new = timed(segment, text, words)
+        print(f"{length // 1000:>8} {old * 1000:>8.2f} {new * 1000:>8.2f} {old / new:>7.1f}x "
+              f"{peak_kb(split_on_periods, text, words):>12.0f} {peak_kb(segment, text, words):>12.0f} "
+              f"{len(split_on_periods(text, words)):>14} {len(segment(text, words)):>14} {actual:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+"""Tune the weights and thresholds of the scoring rules on a labeled corpus (requires numpy).
+
+`extract` tokenizes the corpus once and keeps every document's feature
+counts (see features.py) in a compressed .npz file. Everything else only
+replays the scoring rules over that file: score_features with (settings, 1)
+weight arrays scores a block of settings against every document in a few
+array operations, so thousands of settings take seconds, not corpus passes.
+
+`tune` samples settings around the starting weights (the defaults, or
+--weights) within RANGES, ranks them by accuracy
+(or ROC AUC, or Brier score) on the documents not held out, reports the
+starting and the best setting on both parts and writes the best as a
+weights file for Detector(weights=load_weights(path)), the API's
+ANALYZE_WEIGHTS_PATH and scan.py --weights. The file records the profile
+and lexicon of the features, and only detectors with both accept it.
+
+    python calibrate.py extract corpus/ -o features.npz    # a corpus as model.py reads it
+    python calibrate.py tune features.npz -o weights.json --settings 5000 --roc roc.csv
+    python calibrate.py eval features.npz --weights weights.json
+"""
+import argparse
+import csv
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from features import extract_features, score_features
+from model import read_corpus
+from textdetect import Detector
+from textdetect.weights import DEFAULT_WEIGHTS, DEFAULTS, Weights, load_weights
+
+# Bounds of every weight when tuning; samples are spread over half their width on either side of the start
+RANGES = {
+    'indicator': (0.5, 4),
+    'passive': (0, 2),
+    'long_sentence_words': (15, 40),
+    'long_sentence_score': (0, 10),
+    'short_sentence_words': (6, 18),
+    'short_sentence_score': (0, 8),
+    'variety_ratio': (0.4, 1),
+    'variety_score': (0, 8),
+    'high_vocab_ratio': (0.6, 0.95),
+    'high_vocab_score': (0, 6),
+    'low_vocab_ratio': (0.3, 0.8),
+    'low_vocab_score': (0, 6),
+    'confidence_cap': (70, 99)
+}
+# Weights only read by the sentence-variety rule, left at their start when a profile has none
+VARIETY_WEIGHTS = {'variety_ratio', 'variety_score'}
+# Documents times settings scored at once, which bounds the memory of a block
+BLOCK_CELLS = 1 << 19
+# False positive rates at which the ROC summary reports the true positive rate
+ROC_POINTS = (0.01, 0.05, 0.1, 0.2)
+
+
+def extract(corpus, output, profile='web', lexicon_path=None, workers=1):
+    """Write the feature counts and labels of a labeled corpus to an .npz file; returns the document count"""
+    detector = Detector(profile, lexicon_path)
+    texts = []
+    labels = []
+    for text, label in read_corpus(corpus):
+        texts.append(text)
+        labels.append(label)
+    matrix, columns = extract_features(texts, detector.matcher, workers)
+    with open(output, 'wb') as f:
+        np.savez_compressed(f, matrix=matrix, columns=np.array(columns), labels=np.array(labels, dtype=np.int8),
+                            profile=detector.profile.name, sentence_variety=detector.profile.sentence_variety,
+                            lexicon=detector.matcher.version)
+    return len(labels)
+
+
+def load_features(path):
+    with np.load(path) as data:
+        return SimpleNamespace(matrix=data['matrix'], columns=[str(name) for name in data['columns']],
+                               labels=data['labels'].astype(np.int64), profile=str(data['profile']),
+                               sentence_variety=bool(data['sentence_variety']), lexicon=str(data['lexicon']))
+
+
+def sample_settings(count, rng, base=DEFAULT_WEIGHTS, fixed=()):
+    """{weight: array of `count` values}; setting 0 is `base`, the others are random around it"""
+    settings = {}
+    for name in DEFAULTS:
+        start = float(getattr(base, name))
+        values = np.full(count, start)
+        if name not in fixed:
+            low, high = RANGES[name]
+            spread = (high - low) / 2
+            center = min(max(start, low), high)
+            values[1:] = np.round(np.clip(center + rng.uniform(-spread, spread, count - 1), low, high), 2)
+        settings[name] = values
+    return settings
+
+
+def setting(settings, i, features):
+    """Setting `i` as Weights for the profile and lexicon of `features`"""
+    return Weights(features.profile, features.lexicon,
+                   **{name: float(values[i]) for name, values in settings.items()})
+
+
+def ai_probabilities(scores):
+    """The rules' verdicts as the probability of AI: the confidence of the predicted side"""
+    total = scores['ai_score'] + scores['human_score']
+    confidence = scores['confidence'] / 100
+    return np.where(total == 0, 0.5, np.where(scores['ai_score'] > scores['human_score'],
+                                              confidence, 1 - confidence))
+
+
+def roc_auc(probabilities, labels):
+    """ROC AUC of every row of `probabilities` (ties count half), from the Mann-Whitney rank sum"""
+    rows, documents = probabilities.shape
+    positives = labels.sum()
+    negatives = documents - positives
+    if not positives or not negatives:
+        return np.full(rows, np.nan)
+    # Probabilities are in [0, 1], so shifting row r by 2r lets one sort rank every row
+    offsets = np.arange(rows)[:, None]
+    flat = (probabilities + 2.0 * offsets).ravel()
+    ordered = np.sort(flat)
+    low = np.searchsorted(ordered, flat, 'left')
+    high = np.searchsorted(ordered, flat, 'right')
+    ranks = (low + high + 1) / 2 - documents * offsets.ravel().repeat(documents)
+    rank_sum = ranks.reshape(rows, documents)[:, labels == 1].sum(axis=1)
+    return (rank_sum - positives * (positives + 1) / 2) / (positives * negatives)
+
+
+def roc_curve(probabilities, labels):
+    """(thresholds, false positive rates, true positive rates) of one setting, from (inf, 0, 0) on"""
+    order = np.argsort(-probabilities, kind='stable')
+    probabilities = probabilities[order]
+    labels = labels[order]
+    # Index of the last document at each distinct probability
+    last = np.append(np.flatnonzero(np.diff(probabilities)), len(probabilities) - 1)
+    true_positives = np.cumsum(labels)[last]
+    false_positives = last + 1 - true_positives
+    return (np.append(np.inf, probabilities[last]),
+            np.append(0, false_positives / max(len(labels) - labels.sum(), 1)),
+            np.append(0, true_positives / max(labels.sum(), 1)))
+
+
+def replay(features, settings, rows=None):
+    """accuracy, auc and brier arrays, one value per setting, over the documents in `rows`"""
+    matrix = features.matrix if rows is None else features.matrix[rows]
+    labels = features.labels if rows is None else features.labels[rows]
+    count = len(next(iter(settings.values())))
+    block = max(BLOCK_CELLS // max(len(labels), 1), 1)
+    metrics = {name: np.empty(count) for name in ('accuracy', 'auc', 'brier')}
+    for start in range(0, count, block):
+        weights = SimpleNamespace(**{name: values[start:start + block, None] for name, values in settings.items()})
+        scores = score_features(matrix, features.columns, features.sentence_variety, weights)
+        total = scores['ai_score'] + scores['human_score']
+        # An inconclusive verdict is never right
+        correct = (total > 0) & ((scores['ai_score'] > scores['human_score']) == (labels == 1))
+        probabilities = ai_probabilities(scores)
+        end = start + len(probabilities)
+        metrics['accuracy'][start:end] = correct.mean(axis=1)
+        metrics['auc'][start:end] = roc_auc(probabilities, labels)
+        metrics['brier'][start:end] = ((probabilities - labels) ** 2).mean(axis=1)
+    return metrics
+
+
+def best_setting(metrics, objective):
+    """Index of the best setting; ties go to the better AUC, then to the lower index (the base)"""
+    primary = -metrics['brier'] if objective == 'brier' else metrics[objective]
+    return int(np.lexsort((-np.nan_to_num(metrics['auc']), -primary))[0])
+
+
+def summary(features, weights, rows=None):
+    """One line of accuracy, AUC, Brier score and true positive rates at fixed false positive rates"""
+    settings = {name: np.array([float(getattr(weights, name))]) for name in DEFAULTS}
+    metrics = replay(features, settings, rows)
+    labels = features.labels if rows is None else features.labels[rows]
+    _, fpr, tpr = curve(features, weights, rows)
+    points = ', '.join(f'{tpr[np.searchsorted(fpr, rate, "right") - 1]:.3f}@{rate:g}' for rate in ROC_POINTS)
+    return (f'{len(labels)} documents: accuracy {metrics["accuracy"][0]:.3f}, auc {metrics["auc"][0]:.3f}, '
+            f'brier {metrics["brier"][0]:.4f}, tpr@fpr {points}')
+
+
+def curve(features, weights, rows=None):
+    matrix = features.matrix if rows is None else features.matrix[rows]
+    labels = features.labels if rows is None else features.labels[rows]
+    scores = score_features(matrix, features.columns, features.sentence_variety, weights)
+    return roc_curve(ai_probabilities(scores), labels)
+
+
+def write_roc(path, features, named_weights, rows=None):
+    """CSV of the whole ROC curve of every (name, weights) pair"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['setting', 'threshold', 'fpr', 'tpr'])
+        for name, weights in named_weights:
+            thresholds, fpr, tpr = curve(features, weights, rows)
+            writer.writerows([name, f'{t:.6g}', f'{x:.6g}', f'{y:.6g}'] for t, x, y in zip(thresholds, fpr, tpr))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    extract_command = commands.add_parser('extract', help='cache the feature counts of a labeled corpus')
+    extract_command.add_argument('corpus')
+    extract_command.add_argument('-o', '--output', required=True, help='.npz feature file')
+    extract_command.add_argument('--profile', default='web', help='profile whose lexicon and rules are used')
+    extract_command.add_argument('--lexicon', help='compiled lexicon to use instead of the profile\'s')
+    extract_command.add_argument('--workers', type=int, default=1, help='tokenizing processes (0: one per CPU)')
+    tune = commands.add_parser('tune', help='search weights on a feature file and write the best')
+    tune.add_argument('features')
+    tune.add_argument('-o', '--output', required=True, help='weights file to write')
+    tune.add_argument('--settings', type=int, default=5000, help='settings tried, the starting one included')
+    tune.add_argument('--objective', choices=['accuracy', 'auc', 'brier'], default='accuracy')
+    tune.add_argument('--fix', action='append', default=[], choices=sorted(DEFAULTS), metavar='WEIGHT',
+                      help='keep a weight at its starting value (repeatable)')
+    tune.add_argument('--holdout', type=float, default=0.2, help='share of documents kept for evaluation')
+    tune.add_argument('--seed', type=int, default=0)
+    evaluate = commands.add_parser('eval', help='report accuracy and ROC figures of weights on a feature file')
+    evaluate.add_argument('features')
+    for command in (tune, evaluate):
+        command.add_argument('--weights', help='weights file (tune: the starting setting; default: the defaults)')
+        command.add_argument('--roc', help='CSV file for the ROC curves')
+    args = parser.parse_args(argv)
+
+    if args.command == 'extract':
+        started = time.perf_counter()
+        count = extract(args.corpus, args.output, args.profile, args.lexicon, args.workers or None)
+        if not count:
+            parser.error(f'no labeled documents in {args.corpus}')
+        print(f'{args.output}: {count} documents in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+        return 0
+
+    features = load_features(args.features)
+    if not len(features.labels):
+        parser.error(f'no documents in {args.features}')
+    base = load_weights(args.weights) if args.weights else DEFAULT_WEIGHTS
+    try:
+        base.check(features.profile, features.lexicon)
+    except ValueError as e:
+        parser.error(f'{args.weights}: {e}')
+    if args.command == 'eval':
+        print(summary(features, base))
+        if args.roc:
+            write_roc(args.roc, features, [('weights', base)])
+        return 0
+
+    order = np.random.default_rng(args.seed).permutation(len(features.labels))
+    held = order[:int(len(order) * args.holdout)]
+    kept = order[len(held):]
+    fixed = set(args.fix) if features.sentence_variety else set(args.fix) | VARIETY_WEIGHTS
+    settings = sample_settings(max(args.settings, 1), np.random.default_rng(args.seed), base, fixed)
+    started = time.perf_counter()
+    metrics = replay(features, settings, kept)
+    elapsed = time.perf_counter() - started
+    print(f'{args.settings} settings x {len(kept)} documents replayed in {elapsed:.1f}s', file=sys.stderr)
+    tuned = setting(settings, best_setting(metrics, args.objective), features)
+
+    for name, weights in (('start', base), ('tuned', tuned)):
+        print(f'{name:<6} train    ' + summary(features, weights, kept), file=sys.stderr)
+        if len(held):
+            print(f'{name:<6} holdout  ' + summary(features, weights, held), file=sys.stderr)
+    for name in DEFAULTS:
+        if getattr(tuned, name) != getattr(base, name):
+            print(f'  {name}: {getattr(base, name)} -> {getattr(tuned, name)}', file=sys.stderr)
+    if args.roc:
+        write_roc(args.roc, features, [('start', base), ('tuned', tuned)], held if len(held) else None)
+    tuned.save(args.output)
+    print(f'{args.output}: {tuned.version}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Corpus-scale feature extraction and vectorized scoring (requires numpy).
+
+extract_features() turns a list of texts into one compact integer matrix.
+score_features() then reproduces AITextDetector's verdicts for every row with
+whole-array operations, with no Python work per document, under the default
+or any other scoring weights (see calibrate.py).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from textdetect.text_stats import TextStats
+from textdetect.weights import DEFAULT_WEIGHTS
+
+STAT_COLUMNS = [
+    'passive', 'word_count', 'unique_words',
+    'sentence_count', 'sentence_words', 'distinct_sentence_lengths'
+]
+
+class FeatureExtractor:
+    """Maps a TokenMatcher's per-phrase counts onto per-category feature columns"""
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.categories = []
+        columns = {}
+        for group in ('ai', 'human'):
+            for _, category, _ in matcher.groups[group]:
+                key = f'{group}:{category}'
+                if key not in columns:
+                    columns[key] = len(self.categories)
+                    self.categories.append(key)
+
+        # Column j of `projection` counts how often each phrase is listed in
+        # category j (a phrase listed twice is counted twice, as in scoring)
+        self.projection = np.zeros((len(matcher.sequences), len(self.categories)), dtype=np.int32)
+        self.passive = np.zeros(len(matcher.sequences), dtype=np.int32)
+        for group, entries in matcher.groups.items():
+            for _, category, sid in entries:
+                if group == 'passive':
+                    self.passive[sid] += 1
+                else:
+                    self.projection[sid, columns[f'{group}:{category}']] += 1
+
+    @property
+    def columns(self):
+        return self.categories + STAT_COLUMNS
+
+    def raw_row(self, text):
+        """Per-phrase counts followed by the document statistics for one text"""
+        stats = TextStats(self.matcher)
+        stats.feed(text)
+        stats.finish()
+        return stats.counts + [
+            stats.word_count, len(stats.vocab), stats.sentence_count,
+            stats.sentence_words, len(stats.sentence_lengths)
+        ]
+
+    def transform(self, rows):
+        """Project raw rows (see raw_row) into the feature matrix"""
+        raw = np.asarray(rows, dtype=np.int32).reshape(len(rows), -1)
+        size = len(self.matcher.sequences)
+        counts, stats = raw[:, :size], raw[:, size:]
+        return np.hstack([counts @ self.projection, (counts @ self.passive)[:, None], stats])
+
+
+_extractor = None
+
+
+def _init_worker(extractor):
+    global _extractor
+    _extractor = extractor
+
+
+def _raw_rows(texts):
+    return [_extractor.raw_row(text) for text in texts]
+
+
+def extract_features(texts, matcher, workers=1, chunk_size=256):
+    """Return (matrix, column_names) for a list of texts.
+
+    With workers > 1 the texts are split into chunks that are tokenized in a
+    process pool; the projection to categories is one matrix product.
+    """
+    extractor = FeatureExtractor(matcher)
+    texts = list(texts)
+    if workers == 1 or len(texts) <= chunk_size:
+        rows = [extractor.raw_row(text) for text in texts]
+    else:
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_init_worker, initargs=(extractor,)) as pool:
+            rows = [row for chunk in pool.map(_raw_rows, chunks) for row in chunk]
+    if not rows:
+        return np.zeros((0, len(extractor.columns)), dtype=np.int32), extractor.columns
+    return extractor.transform(rows), extractor.columns
+
+
+def score_features(matrix, columns, sentence_variety=False, weights=DEFAULT_WEIGHTS, neutral_label='Inconclusive'):
+    """Vectorized version of AITextDetector's scoring rules.
+
+    Returns a dict of arrays: prediction, confidence, ai_score, human_score,
+    avg_sentence_length and vocab_ratio. sentence_variety and neutral_label
+    are the profile's (the desktop app's "pro" profile sets both, see
+    textdetect/profiles.py). The attributes of `weights` (a Weights or
+    any object with the same attributes) may also be arrays of shape
+    (settings, 1), which scores every document under every setting at once
+    and gives (settings, documents) arrays.
+    """
+    index = {name: i for i, name in enumerate(columns)}
+    matrix = np.asarray(matrix, dtype=np.float64)
+
+    def column(name):
+        return matrix[:, index[name]]
+
+    ai_columns = [index[name] for name in columns if name.startswith('ai:')]
+    human_columns = [index[name] for name in columns if name.startswith('human:')]
+    ai_score = matrix[:, ai_columns].sum(axis=1) * weights.indicator
+    human_score = matrix[:, human_columns].sum(axis=1) * weights.indicator
+
+    # The `elif` rules of evaluate(): the human side only scores when the AI side did not
+    sentence_count = column('sentence_count')
+    avg_sentence_length = column('sentence_words') / np.maximum(sentence_count, 1)
+    long_sentences = avg_sentence_length > weights.long_sentence_words
+    ai_score = ai_score + np.where(long_sentences, weights.long_sentence_score, 0)
+    human_score = human_score + np.where(
+        ~long_sentences & (avg_sentence_length < weights.short_sentence_words), weights.short_sentence_score, 0)
+
+    ai_score = ai_score + column('passive') * weights.passive
+
+    if sentence_variety:
+        varied = column('distinct_sentence_lengths') > sentence_count * weights.variety_ratio
+        human_score = human_score + np.where(varied, weights.variety_score, 0)
+
+    vocab_ratio = column('unique_words') / np.maximum(column('word_count'), 1)
+    high_vocab = vocab_ratio > weights.high_vocab_ratio
+    ai_score = ai_score + np.where(high_vocab, weights.high_vocab_score, 0)
+    human_score = human_score + np.where(
+        ~high_vocab & (vocab_ratio < weights.low_vocab_ratio), weights.low_vocab_score, 0)
+
+    total = ai_score + human_score
+    is_ai = ai_score > human_score
+    winner = np.where(is_ai, ai_score, human_score)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        confidence = np.where(total == 0, 50.0, np.minimum(winner / total * 100, weights.confidence_cap))
+    prediction = np.where(total == 0, 0, np.where(is_ai, 1, 2))
+    predictions = np.array([neutral_label, 'AI Generated', 'Human Written'])
+
+    return {
+        'prediction': predictions[prediction],
+        'confidence': confidence,
+        'ai_score': ai_score,
+        'human_score': human_score,
+        'avg_sentence_length': avg_sentence_length,
+        'vocab_ratio': vocab_ratio
+    }
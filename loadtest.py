@@ -0,0 +1,163 @@
+"""Local load-test harness for /analyze.
+
+Fires requests at a running server from many concurrent connections and
+reports status codes, latency percentiles and throughput. Requests shed by
+serve.py are counted apart: 429 (per-client limit) and 503 (server full or
+over the time budget). With --spawn it starts serve.py itself on a free port
+and stops it afterwards; since every connection comes from 127.0.0.1, the
+spawned server's per-client limit is raised to --concurrency (or set with
+--per-client-limit) so the run measures throughput and 503 load shedding
+rather than the per-client limiter.
+
+    python loadtest.py --spawn --concurrency 64 --requests 2000
+    python loadtest.py --url http://127.0.0.1:5000/analyze --size 200000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+WORDS = (
+    "i think this is really cool honestly furthermore the methodology was "
+    "effectively validated and the framework demonstrates scalability but "
+    "we were kinda confused because it's pretty weird you know"
+).split()
+
+
+def make_text(size, rng):
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word + ('.' if rng.random() < 0.08 else ''))
+        length += len(word) + 1
+    return ' '.join(words)
+
+
+async def post(host, port, path, body):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f'POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        length = 0
+        while True:
+            header = await reader.readline()
+            if header in (b'\r\n', b''):
+                break
+            name, _, value = header.partition(b':')
+            if name.strip().lower() == b'content-length':
+                length = int(value)
+        await reader.readexactly(length)
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def run(url, concurrency, total, sizes, seed):
+    parts = urlsplit(url)
+    statuses = Counter()
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            i = queue.get_nowait()
+            # A distinct text per request, so the result cache does not hide the scoring cost
+            rng = random.Random(f'{seed}:{i}')
+            body = json.dumps({'text': make_text(rng.choice(sizes), rng) + f' #{i}'}).encode()
+            start = time.perf_counter()
+            try:
+                status = await post(parts.hostname, parts.port or 80, parts.path or '/', body)
+            except OSError:
+                status = 'connection error'
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+
+    return {
+        'requests': total,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(total / elapsed, 1),
+        'ok_rps': round(statuses[200] / elapsed, 1),
+        'rejected': {'per_client_429': statuses[429], 'overloaded_503': statuses[503]},
+        'statuses': {str(k): v for k, v in sorted(statuses.items(), key=str)},
+        'latency_ms': {'p50': round(percentile(0.50), 2), 'p90': round(percentile(0.90), 2),
+                       'p99': round(percentile(0.99), 2), 'max': round(latencies[-1] * 1000, 2)}
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('Server did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000/analyze')
+    parser.add_argument('--spawn', action='store_true', help='start serve.py on a free port')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--size', type=int, action='append',
+                        help='text size in characters (repeatable, default 2000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--per-client-limit', type=int,
+                        help='ANALYZE_PER_CLIENT_LIMIT of the --spawn server (default: --concurrency)')
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if args.spawn:
+        port = free_port()
+        url = f'http://127.0.0.1:{port}/analyze'
+        limit = args.per_client_limit or max(args.concurrency, 1)
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'serve:app', '--port', str(port), '--log-level', 'warning'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env={**os.environ, 'ANALYZE_PER_CLIENT_LIMIT': str(limit)}
+        )
+        wait_for_port(port)
+    try:
+        report = asyncio.run(run(url, args.concurrency, args.requests, args.size or [2000], args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
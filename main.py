@@ -1,154 +1,333 @@
-from flask import Flask, request, jsonify, render_template
-import re
-import math
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context, g
+import os
+import functools
+import itertools
 import json
+import time
+import atexit
+import gc
+from textdetect import Detector, LanguagePacks, SpanRecorder, add_time
+from textdetect.engine import EARLY_EXIT_CONFIDENCE, MODEL_MARGIN
+from textdetect.text_stats import iter_chunks
+from textdetect.weights import load_weights
+from textdetect.incremental import IncrementalAnalyzer
+from batch import BatchAnalyzer
+from result_cache import ResultCache, SqliteResultCache, cache_key
+from metrics import Metrics
+from near_duplicates import NearDuplicateIndex
+from response_format import MSGPACK_TYPES, CompactFormat, msgpack, packb
 
 app = Flask(__name__)
+app.config['BATCH_WORKERS'] = int(os.environ.get('ANALYZE_WORKERS', 0)) or None
+app.config['CACHE_PATH'] = os.environ.get('ANALYZE_CACHE_PATH')
+app.config['CACHE_SIZE'] = int(os.environ.get('ANALYZE_CACHE_SIZE', 1024))
+app.config['CACHE_TTL'] = float(os.environ.get('ANALYZE_CACHE_TTL', 3600))
+app.config['MAX_DOCUMENTS'] = int(os.environ.get('ANALYZE_MAX_DOCUMENTS', 256))
+# Largest request body accepted by every route but /analyze/stream (serve.py uses the same limit)
+app.config['MAX_BODY_BYTES'] = int(os.environ.get('ANALYZE_MAX_BODY_BYTES', 1024 * 1024))
+app.config['LEXICON_PATH'] = os.environ.get('ANALYZE_LEXICON_PATH')
+app.config['MAX_SPANS'] = int(os.environ.get('ANALYZE_MAX_SPANS', 1000))
+app.config['MODEL_PATH'] = os.environ.get('ANALYZE_MODEL_PATH')
+app.config['MODEL_MARGIN'] = float(os.environ.get('ANALYZE_MODEL_MARGIN', MODEL_MARGIN))
+# Scoring weights tuned by calibrate.py; unset keeps the default rules
+app.config['WEIGHTS_PATH'] = os.environ.get('ANALYZE_WEIGHTS_PATH')
+# Language packs kept compiled at once; 0 scores every text with the English lexicon
+app.config['LANGUAGE_PACKS'] = int(os.environ.get('ANALYZE_LANGUAGE_PACKS', 4))
+app.config['NEAR_DUP_SIZE'] = int(os.environ.get('ANALYZE_NEAR_DUP_SIZE', 10_000))
+app.config['NEAR_DUP_THRESHOLD'] = float(os.environ.get('ANALYZE_NEAR_DUP_THRESHOLD', 0.9))
+app.config['NEAR_DUP_PATH'] = os.environ.get('ANALYZE_NEAR_DUP_PATH')
 
-class AITextDetector:
-    def __init__(self):
-        self.ai_indicators = {
-            'formal_phrases': [
-                'furthermore', 'moreover', 'consequently', 'therefore', 'nonetheless',
-                'nevertheless', 'additionally', 'subsequently', 'specifically', 'particularly',
-                'accordingly', 'alternatively', 'simultaneously', 'comprehensively', 'extensively',
-                'systematically', 'methodically', 'strategically', 'effectively', 'efficiently'
-            ],
-            'technical_terms': [
-                'algorithm', 'methodology', 'framework', 'paradigm', 'optimization',
-                'implementation', 'configuration', 'infrastructure', 'architecture', 'protocol',
-                'specification', 'initialization', 'iteration', 'evaluation', 'validation',
-                'authentication', 'authorization', 'encryption', 'deployment', 'scalability'
-            ],
-            'academic_phrases': [
-                'it is important to note', 'it should be emphasized', 'research indicates',
-                'studies suggest', 'evidence shows', 'data reveals', 'analysis demonstrates',
-                'findings indicate', 'results suggest', 'empirical evidence', 'statistical analysis',
-                'peer-reviewed studies', 'theoretical framework', 'conceptual model'
-            ],
-            'structured_phrases': [
-                'in conclusion', 'to summarize', 'in summary', 'overall', 'broadly speaking',
-                'all things considered', 'for instance', 'for example', 'such as', 'including',
-                'particularly', 'especially', 'notably', 'remarkably', 'interestingly'
-            ],
-            'hedge_words': [
-                'potentially', 'possibly', 'presumably', 'arguably', 'conceivably',
-                'theoretically', 'hypothetically', 'allegedly', 'supposedly', 'apparently',
-                'seemingly', 'ostensibly', 'likely', 'probably', 'perhaps', 'might'
-            ]
-        }
-        
-        self.human_indicators = {
-            'conversational': [
-                'i think', 'i believe', 'in my opinion', 'personally', 'honestly',
-                'frankly', 'to be honest', 'i feel like', 'i guess', 'you know',
-                'like', 'um', 'uh', 'well', 'so', 'actually', 'basically',
-                'literally', 'totally', 'really', 'pretty', 'quite', 'sort of'
-            ],
-            'personal_pronouns': [
-                'i am', 'i was', 'i have', 'i had', 'i will', 'i would',
-                'my', 'mine', 'myself', 'me', 'we', 'us', 'our', 'ours'
-            ],
-            'informal_expressions': [
-                'gonna', 'wanna', 'gotta', 'kinda', 'sorta', 'dunno', 'yeah',
-                'yep', 'nope', 'nah', 'ok', 'okay', 'alright', 'sure', 'fine',
-                'cool', 'awesome', 'great', 'amazing', 'weird', 'strange', 'funny'
-            ],
-            'emotional_expressions': [
-                'i love', 'i hate', 'i enjoy', 'i like', 'i dislike', 'i prefer',
-                'i hope', 'i wish', 'i want', 'i need', 'i feel', 'excited',
-                'happy', 'sad', 'angry', 'frustrated', 'surprised', 'confused'
-            ],
-            'contractions': [
-                "i'm", "you're", "he's", "she's", "it's", "we're", "they're",
-                "i've", "you've", "we've", "they've", "i'd", "you'd", "he'd",
-                "won't", "can't", "don't", "doesn't", "didn't", "haven't", "hasn't"
-            ]
-        }
+class AITextDetector(Detector):
+    """The "web" profile, with results shaped for the JSON API"""
 
-    def analyze_text(self, text):
-        """Analyze text for AI vs Human indicators"""
-        text_lower = text.lower()
-        words = text.split()
-        sentences = [s.strip() for s in text.split('.') if s.strip()]
-        
-        ai_score = 0
-        human_score = 0
-        indicators_found = {'ai': [], 'human': []}
-
-        # Check AI indicators
-        for category, indicators in self.ai_indicators.items():
-            for indicator in indicators:
-                count = text_lower.count(indicator)
-                if count > 0:
-                    ai_score += count * 2
-                    indicators_found['ai'].append({
-                        'phrase': indicator,
-                        'count': count,
-                        'category': category
-                    })
-
-        # Check human indicators
-        for category, indicators in self.human_indicators.items():
-            for indicator in indicators:
-                count = text_lower.count(indicator)
-                if count > 0:
-                    human_score += count * 2
-                    indicators_found['human'].append({
-                        'phrase': indicator,
-                        'count': count,
-                        'category': category
-                    })
-
-        # Advanced linguistic analysis
-        avg_sentence_length = sum(len(s.split()) for s in sentences) / max(len(sentences), 1)
-        
-        # AI tends to have longer, more structured sentences
-        if avg_sentence_length > 25:
-            ai_score += 5
-        elif avg_sentence_length < 12:
-            human_score += 3
-
-        # Check for passive voice (more common in AI)
-        passive_patterns = ['was', 'were', 'been', 'being']
-        passive_count = sum(text_lower.count(p) for p in passive_patterns)
-        ai_score += passive_count * 0.5
-
-        # Vocabulary complexity
-        unique_words = len(set(words))
-        vocab_ratio = unique_words / max(len(words), 1)
-        if vocab_ratio > 0.8:
-            ai_score += 2
-        elif vocab_ratio < 0.6:
-            human_score += 2
-
-        # Determine final prediction
-        total_score = ai_score + human_score
-        if total_score == 0:
-            confidence = 50
-            prediction = "Inconclusive"
-        elif ai_score > human_score:
-            confidence = min((ai_score / total_score) * 100, 95)
-            prediction = "AI Generated"
-        else:
-            confidence = min((human_score / total_score) * 100, 95)
-            prediction = "Human Written"
+    def __init__(self, lexicon_path=None, model_path=None, margin=MODEL_MARGIN, language_packs=0,
+                 weights_path=None):
+        scorer = None
+        if model_path:
+            # numpy is only needed when a model is configured
+            from model import load_model
+            scorer = load_model(model_path)
+        languages = LanguagePacks(language_packs) if language_packs else None
+        weights = load_weights(weights_path) if weights_path else None
+        super().__init__('web', lexicon_path, scorer, margin, languages, weights)
+
+    def score(self, stats):
+        """Turn the running totals of a document into the result dict"""
+        verdict = self.evaluate(stats)
+        indicators_found = {
+            group: [{'phrase': indicator, 'count': count, 'category': category}
+                    for indicator, count, category in verdict['matches'][group]]
+            for group in ('ai', 'human')
+        }
 
-        return {
-            'prediction': prediction,
-            'confidence': round(confidence, 1),
+        result = {
+            'prediction': verdict['prediction'],
+            'confidence': round(verdict['confidence'], 1),
             'indicators': indicators_found,
             'stats': {
-                'word_count': len(words),
-                'sentence_count': len(sentences),
-                'avg_sentence_length': round(avg_sentence_length, 1),
-                'vocab_ratio': round(vocab_ratio, 2),
-                'ai_score': round(ai_score, 1),
-                'human_score': round(human_score, 1)
+                'word_count': verdict['word_count'],
+                'sentence_count': verdict['sentence_count'],
+                'avg_sentence_length': round(verdict['avg_sentence_length'], 1),
+                'vocab_ratio': round(verdict['vocab_ratio'], 2),
+                'ai_score': round(verdict['ai_score'], 1),
+                'human_score': round(verdict['human_score'], 1)
             }
         }
+        if verdict['model_probability'] is not None:
+            # The rules were a close call and the model made the prediction
+            result['model_probability'] = round(verdict['model_probability'], 3)
+        if self.language != self.profile.language:
+            result['language'] = self.language
+        return result
+
+# Builds the app's detector; also run in every worker process
+make_detector = functools.partial(AITextDetector, app.config['LEXICON_PATH'], app.config['MODEL_PATH'],
+                                  app.config['MODEL_MARGIN'], app.config['LANGUAGE_PACKS'],
+                                  app.config['WEIGHTS_PATH'])
+detector = make_detector()
+batch_analyzer = None
+
+if app.config['CACHE_PATH']:
+    result_cache = SqliteResultCache(app.config['CACHE_PATH'], max_entries=app.config['CACHE_SIZE'],
+                                     ttl=app.config['CACHE_TTL'])
+else:
+    result_cache = ResultCache(max_entries=app.config['CACHE_SIZE'], ttl=app.config['CACHE_TTL'])
+
+# Near-copies of earlier texts reuse their result; a size of 0 turns this off
+near_duplicates = None
+if app.config['NEAR_DUP_SIZE']:
+    near_duplicates = NearDuplicateIndex(app.config['NEAR_DUP_THRESHOLD'], app.config['NEAR_DUP_SIZE'])
+    if app.config['NEAR_DUP_PATH']:
+        if os.path.exists(app.config['NEAR_DUP_PATH']):
+            near_duplicates.load(app.config['NEAR_DUP_PATH'])
+        atexit.register(near_duplicates.save, app.config['NEAR_DUP_PATH'])
+
+incremental = IncrementalAnalyzer(detector, max_documents=app.config['MAX_DOCUMENTS'])
+
+metrics = Metrics()
+metrics.describe('http_requests_total', 'counter', 'HTTP requests by route, method and status')
+metrics.describe('http_request_duration_seconds', 'histogram',
+                 'Time to produce a response (up to the first byte for streamed responses)')
+metrics.describe('http_request_bytes_total', 'counter', 'Request body bytes received')
+metrics.describe('http_response_bytes_total', 'counter', 'Response body bytes sent, streamed responses excluded')
+metrics.describe('analyze_stage_seconds', 'histogram', 'Time spent in each stage of /analyze')
+metrics.describe('cache_entries', 'gauge', 'Entries in the result cache')
+metrics.describe('cache_hits_total', 'counter', 'Result cache hits')
+metrics.describe('cache_misses_total', 'counter', 'Result cache misses')
+metrics.describe('cache_evictions_total', 'counter', 'Result cache evictions and expirations')
+metrics.describe('batch_workers', 'gauge', 'Processes in the batch pool (0 until the first batch)')
+metrics.describe('incremental_documents', 'gauge', 'Documents open for incremental analysis')
+metrics.describe('lexicon_info', 'gauge', 'Version of the loaded lexicon')
+metrics.describe('language_packs_loaded', 'gauge', 'Language packs compiled in this process')
+metrics.describe('near_duplicate_entries', 'gauge', 'Texts in the near-duplicate index')
+metrics.describe('near_duplicate_hits_total', 'counter', 'Texts answered with the result of a near-copy')
+metrics.describe('near_duplicate_misses_total', 'counter', 'Near-duplicate lookups without a match')
+
+def collect_gauges():
+    """Values owned by the cache, the batch pool and the detector, read at scrape time"""
+    stats = result_cache.stats()
+    backend = {'backend': stats['backend']}
+    return [
+        ('cache_entries', backend, stats['size']),
+        ('cache_hits_total', backend, stats['hits']),
+        ('cache_misses_total', backend, stats['misses']),
+        ('cache_evictions_total', backend, stats['evictions']),
+        ('batch_workers', {}, batch_analyzer.workers if batch_analyzer else 0),
+        ('incremental_documents', {}, len(incremental)),
+        ('lexicon_info', {'version': detector.version}, 1),
+        ('language_packs_loaded', {}, len(detector.languages.loaded()) if detector.languages else 0)
+    ] + ([
+        ('near_duplicate_entries', {}, len(near_duplicates)),
+        ('near_duplicate_hits_total', {}, near_duplicates.hits),
+        ('near_duplicate_misses_total', {}, near_duplicates.misses)
+    ] if near_duplicates is not None else [])
+
+metrics.add_collector(collect_gauges)
+
+def get_batch_analyzer():
+    """Start the worker pool on first use so importing the app stays cheap"""
+    global batch_analyzer
+    if batch_analyzer is None:
+        batch_analyzer = BatchAnalyzer(make_detector, workers=app.config['BATCH_WORKERS'])
+    return batch_analyzer
+
+def validate_text(text):
+    """Return an error message for unusable input, or None"""
+    if not isinstance(text, str) or not text.strip():
+        return 'No text provided'
+    if len(text.strip()) < 20:
+        return 'Text too short for analysis'
+    return None
+
+def read_batch_items(data):
+    """Yield the stripped texts of a batch, or an error dict in place of bad items"""
+    if data is None:
+        # NDJSON: one JSON string or {"text": ...} object per line
+        items = (parse_ndjson_line(line) for line in request.stream if line.strip())
+    else:
+        items = iter(data['texts'])
+
+    for item in items:
+        if item is INVALID_LINE:
+            yield {'error': 'Invalid JSON line'}
+            continue
+        if isinstance(item, dict):
+            item = item.get('text')
+        error = validate_text(item)
+        yield {'error': error} if error else item.strip()
+
+def read_format(options):
+    """Top N for {"format": "compact", "top": N} (body or query), or None for the full result"""
+    fmt = options.get('format', 'full')
+    if fmt not in ('full', 'compact'):
+        raise ValueError('format must be "full" or "compact"')
+    if fmt == 'full':
+        return None
+    try:
+        top = int(options.get('top', 5))
+    except (TypeError, ValueError):
+        top = -1
+    if top < 0:
+        raise ValueError('top must be a non-negative integer')
+    return top
+
+compact_format = None
+
+def get_compact_format():
+    """Category ids of the loaded lexicon, rebuilt after a lexicon reload"""
+    global compact_format
+    if compact_format is None or compact_format.version != detector.version:
+        compact_format = CompactFormat(detector.version, detector.matcher.groups)
+    return compact_format
+
+def wants_msgpack():
+    """Whether the client prefers MessagePack and it can be produced"""
+    if msgpack is None:
+        return False
+    return request.accept_mimetypes.best_match(('application/json',) + MSGPACK_TYPES) in MSGPACK_TYPES
+
+def respond(payload):
+    if wants_msgpack():
+        return Response(packb(payload), mimetype='application/msgpack')
+    return jsonify(payload)
+
+def read_early_exit(option):
+    """The confidence target for "fast": true or a number, or None for an exact analysis"""
+    if option is None or option is False:
+        return None
+    if option is True:
+        return EARLY_EXIT_CONFIDENCE
+    if isinstance(option, bool) or not isinstance(option, (int, float)) or not 50 <= option <= 100:
+        raise ValueError('fast must be true, false or a confidence target from 50 to 100')
+    return option
+
+def read_span_options(options):
+    """A SpanRecorder for {"offset", "limit", "sentence_offset", "sentence_limit"} (or true)
+
+    Raises ValueError for bad values; limits default to 100 and are capped at MAX_SPANS.
+    """
+    if options is True:
+        options = {}
+    if not isinstance(options, dict):
+        raise ValueError('spans must be true or an object')
+    values = {}
+    for name, default in (('offset', 0), ('limit', 100), ('sentence_offset', 0), ('sentence_limit', 100)):
+        value = options.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            value = -1
+        if value < 0:
+            raise ValueError(f'spans {name} must be a non-negative integer')
+        values[name] = value
+    for name in ('limit', 'sentence_limit'):
+        values[name] = min(values[name], app.config['MAX_SPANS'])
+    return SpanRecorder(**values)
+
+def find_near_duplicate(text, version, lookup=True, timings=None):
+    """(signature, result): the result of a near-copy scored under `version`, marked "near_duplicate"
+
+    Both are None without a near-duplicate index; the result is None without
+    a match or when `lookup` is false (the signature is still computed, so
+    the rescored result can be remembered).
+    """
+    if near_duplicates is None:
+        return None, None
+    start = time.perf_counter()
+    signature = near_duplicates.signature(text)
+    result = None
+    match = near_duplicates.lookup(signature, version) if lookup else None
+    if match is not None:
+        original, similarity, result = match
+        result = {**result, 'near_duplicate': {'of': original[:16], 'similarity': round(similarity, 3)}}
+    add_time(timings, 'near_duplicate', time.perf_counter() - start)
+    return signature, result
+
+def remember_near_duplicate(key, signature, version, result):
+    """Index a freshly scored result under the signature find_near_duplicate returned"""
+    if signature is not None:
+        near_duplicates.add(key, signature, version, result)
+
+def read_patches(patches):
+    """[(start, end, text), ...] from a list of {"start", "end", "text"}; ValueError for anything else"""
+    if not isinstance(patches, list):
+        raise ValueError('patches must be a list')
+    result = []
+    for patch in patches:
+        if not isinstance(patch, dict):
+            raise ValueError('Every patch must be an object with "start", "end" and "text"')
+        start, end, text = patch.get('start'), patch.get('end'), patch.get('text', '')
+        if any(isinstance(value, bool) or not isinstance(value, int) for value in (start, end)):
+            raise ValueError('Patch start and end must be integers')
+        if not isinstance(text, str):
+            raise ValueError('Patch text must be a string')
+        result.append((start, end, text))
+    return result
+
+INVALID_LINE = object()
+
+def parse_ndjson_line(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return INVALID_LINE
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.before_request
+def limit_body():
+    """Reject oversized bodies before get_json() reads them; /analyze/stream reads in bounded memory"""
+    if request.path == '/analyze/stream':
+        return None
+    if (request.content_length or 0) > app.config['MAX_BODY_BYTES']:
+        return jsonify({'error': 'Request body too large'}), 413
+    return None
+
+@app.before_request
+def refresh_lexicon():
+    """Follow a lexicon recompiled at LEXICON_PATH, so every worker serves the same version"""
+    try:
+        detector.refresh_lexicon()
+    except (OSError, ValueError):
+        # Keep serving the loaded version until a valid file is in place
+        pass
+
+@app.after_request
+def record_request(response):
+    labels = {'route': request.url_rule.rule if request.url_rule else 'unmatched', 'method': request.method}
+    metrics.inc('http_requests_total', status=response.status_code, **labels)
+    metrics.observe('http_request_duration_seconds', time.perf_counter() - g.request_start, **labels)
+    if request.content_length:
+        metrics.inc('http_request_bytes_total', request.content_length, **labels)
+    if not response.is_streamed:
+        metrics.inc('http_response_bytes_total', response.calculate_content_length() or 0, **labels)
+    return response
 
-detector = AITextDetector()
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/')
 def index():
@@ -156,21 +335,217 @@ def index():
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
+    """Analyze {"text"}; add "profile": true (or ?profile=1) for a per-stage time breakdown
+
+    "format": "compact" (with "top": N, default 5) returns the compact form
+    described in response_format.py; "fast": true (or a confidence target)
+    may stop reading a clear-cut text early, marking the result "early_exit";
+    texts in a language with a pack (textdetect/packs) are scored with its
+    lexicon and marked "language"; a near-copy of an earlier text gets that
+    text's result, marked "near_duplicate", unless "near_duplicates": false
+    asks for a rescore;
+    "spans": true (or {"offset", "limit", "sentence_offset", "sentence_limit"})
+    adds a page of indicator offsets and of per-sentence scores.
+    """
     try:
+        start = time.perf_counter()
         data = request.get_json()
-        text = data.get('text', '').strip()
-        
-        if not text:
-            return jsonify({'error': 'No text provided'}), 400
-        
-        if len(text) < 20:
-            return jsonify({'error': 'Text too short for analysis'}), 400
+        text = data.get('text', '')
+        timings = {'parse': time.perf_counter() - start}
         
-        result = detector.analyze_text(text)
-        return jsonify(result)
+        error = validate_text(text)
+        if error:
+            return jsonify({'error': error}), 400
+
+        spans = None
+        try:
+            top = read_format({**request.args.to_dict(), **data})
+            if data.get('spans'):
+                spans = read_span_options(data['spans'])
+            early_exit = read_early_exit(data.get('fast'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if spans is not None:
+            # Offsets refer to the text as sent, and pages are not cached
+            result = detector.analyze_text(text, timings, spans)
+            cached = False
+        else:
+            # The key includes the detector version, so changed dictionaries never hit stale entries
+            start = time.perf_counter()
+            # Texts in another language are scored (and cached) by their language pack's detector
+            target = detector.for_text(text, timings)
+            version = target.version if early_exit is None else f'{target.version}:fast{early_exit}'
+            key = cache_key(text, version)
+            result = result_cache.get(key)
+            add_time(timings, 'cache', time.perf_counter() - start)
+            cached = result is not None
+            signature = None
+            if result is None:
+                signature, result = find_near_duplicate(text, version, data.get('near_duplicates') is not False,
+                                                        timings)
+            if result is None:
+                result = target.analyze_text(text.strip(), timings, early_exit=early_exit)
+                remember_near_duplicate(key, signature, version, result)
+            # A near-copy's result is not this text's, so it is never cached under this text's key
+            if not cached and 'near_duplicate' not in result:
+                start = time.perf_counter()
+                result_cache.set(key, result)
+                add_time(timings, 'cache', time.perf_counter() - start)
+
+        start = time.perf_counter()
+        if top is not None:
+            result = get_compact_format().compact(result, top)
+        response = respond(result)
+        timings['serialize'] = time.perf_counter() - start
+        for stage, seconds in timings.items():
+            metrics.observe('analyze_stage_seconds', seconds, stage=stage)
+
+        if data.get('profile') is True or request.args.get('profile') in ('1', 'true'):
+            response = respond({**result, 'profile': {
+                'cached': cached,
+                'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+                'total_ms': round(sum(timings.values()) * 1000, 3)
+            }})
+        return response
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/admin/lexicon/reload', methods=['POST'])
+def reload_lexicon():
+    """Hot-swap the compiled lexicon at LEXICON_PATH without restarting the app
+
+    Cached results and open incremental documents are keyed by the lexicon
+    version, and batch workers reload on their next chunk, so nothing stale
+    is served after the swap. Other server workers switch at their next
+    request, when they see the replaced file.
+    """
+    if not app.config['LEXICON_PATH']:
+        return jsonify({'error': 'ANALYZE_LEXICON_PATH is not configured'}), 400
+    try:
+        detector.reload_lexicon(app.config['LEXICON_PATH'])
+    except (OSError, ValueError) as e:
+        return jsonify({'error': str(e)}), 500
+    return jsonify({'version': detector.version})
+
+@app.route('/analyze/categories', methods=['GET'])
+def categories():
+    """Category names by id, for decoding compact results"""
+    compact = get_compact_format()
+    return jsonify({'version': compact.version, 'categories': compact.categories})
+
+@app.route('/analyze/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(result_cache.stats())
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyze {"texts": [...]} or an NDJSON body, streaming NDJSON results in input order
+
+    ?format=compact&top=N compacts every result; a client preferring
+    MessagePack gets a stream of MessagePack maps instead of NDJSON.
+    """
+    data = None
+    if request.mimetype != 'application/x-ndjson':
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('texts'), list):
+            return jsonify({'error': 'Expected {"texts": [...]} or an NDJSON body'}), 400
+    try:
+        top = read_format(request.args.to_dict() if data is None else {**request.args.to_dict(), **data})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    compact = get_compact_format() if top is not None else None
+    binary = wants_msgpack()
+
+    def generate():
+        results = get_batch_analyzer().analyze(read_batch_items(data), version=detector.version)
+        for index, result in enumerate(results):
+            if compact is not None:
+                result = compact.compact(result, top)
+            if binary:
+                yield packb({'index': index, **result})
+            else:
+                yield json.dumps({'index': index, **result}) + '\n'
+
+    mimetype = 'application/msgpack' if binary else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+@app.route('/analyze/incremental', methods=['POST'])
+def analyze_incremental():
+    """Open a document with {"doc_id", "text"}, then send {"doc_id", "patches": [...]}
+
+    Each patch is {"start", "end", "text"} and replaces text[start:end] of the
+    current document; only the blocks an edit touches are rescored.
+    """
+    try:
+        data = request.get_json()
+        doc_id = data.get('doc_id')
+        if not isinstance(doc_id, str) or not doc_id:
+            return jsonify({'error': 'No doc_id provided'}), 400
+
+        if 'patches' not in data:
+            text = data.get('text', '')
+            error = validate_text(text)
+            if error:
+                return jsonify({'error': error}), 400
+            result = incremental.open(doc_id, text)
+        else:
+            try:
+                result = incremental.patch(doc_id, read_patches(data['patches']))
+            except KeyError:
+                return jsonify({'error': 'Unknown doc_id, send the full text first'}), 404
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+        return jsonify({'doc_id': doc_id, **result})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """Analyze a raw text/plain body chunk by chunk without loading it all in memory
+
+    ?spans=1 (with optional offset, limit, sentence_offset and sentence_limit
+    parameters) adds a page of indicator offsets and of per-sentence scores;
+    ?format=compact&top=N returns the compact form.
+    """
+    try:
+        spans = None
+        try:
+            top = read_format(request.args.to_dict())
+            if request.args.get('spans') in ('1', 'true'):
+                spans = read_span_options(request.args.to_dict())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        chunks = iter_chunks(request.stream)
+        head = [next(chunks, b''), next(chunks, b'')]
+        if not head[1]:
+            # The whole body fit in one chunk, so it can be validated like /analyze
+            error = validate_text(head[0].decode('utf-8', errors='replace'))
+            if error:
+                return jsonify({'error': error}), 400
+
+        result = detector.analyze_stream(itertools.chain(head, chunks), spans=spans)
+        if top is not None:
+            result = get_compact_format().compact(result, top)
+        return respond(result)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def pre_fork(*_):
+    """Pre-fork hook: call in the parent, after importing the app and before forking workers
+
+    Under a pre-forking server that imports the app before forking, everything
+    built so far is shared copy-on-write with the workers; freezing it keeps
+    the garbage collector from writing to (and so copying) those pages in
+    every worker. With gunicorn --preload, name it in the config file:
+
+        from main import pre_fork
+    """
+    gc.freeze()
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
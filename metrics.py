@@ -0,0 +1,100 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Counters and histograms are updated by the request handlers; collectors are
+callables polled at scrape time for values owned by other objects (cache and
+pool statistics). Every process keeps its own registry.
+"""
+import threading
+from bisect import bisect_left
+
+# Seconds; spans cache hits on short texts up to multi-megabyte documents
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(labels, extra=()):
+    items = sorted(labels) + list(extra)
+    if not items:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in items)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + '}'
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """Thread-safe registry of counters, histograms and scrape-time collectors"""
+
+    def __init__(self, prefix='textdetect_'):
+        self.prefix = prefix
+        self._help = {}
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def add_collector(self, collector):
+        """Register a callable returning [(name, labels dict, value), ...] gauges"""
+        self._collectors.append(collector)
+
+    def render(self):
+        """The registry in the Prometheus text format (version 0.0.4)"""
+        samples = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                samples.setdefault(name, []).append(f'{self.prefix}{name}{_labels(labels)} {_number(value)}')
+            for (name, labels), histogram in self._histograms.items():
+                lines = samples.setdefault(name, [])
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else _number(bound)
+                    lines.append(f'{self.prefix}{name}_bucket{_labels(labels, [("le", le)])} {cumulative}')
+                lines.append(f'{self.prefix}{name}_sum{_labels(labels)} {_number(histogram.sum)}')
+                lines.append(f'{self.prefix}{name}_count{_labels(labels)} {histogram.count}')
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                samples.setdefault(name, []).append(
+                    f'{self.prefix}{name}{_labels(labels.items())} {_number(value)}')
+
+        output = []
+        for name in sorted(samples):
+            kind, text = self._help.get(name, ('untyped', name))
+            output.append(f'# HELP {self.prefix}{name} {text}')
+            output.append(f'# TYPE {self.prefix}{name} {kind}')
+            output.extend(samples[name])
+        return '\n'.join(output) + '\n'
@@ -0,0 +1,297 @@
+"""Logistic-regression second stage for the rule engine (requires numpy).
+
+The model reads the same single-pass TextStats the rules use, so it works
+for texts, streams and incremental documents alike: every vocabulary word and
+every matched indicator phrase is hashed into a fixed-size sparse vector, and
+a few stylometric ratios (sentence length, vocabulary diversity, word length,
+indicator rates) are added as standardized dense features. Scoring a batch is
+a handful of array operations, whatever its size.
+
+A Detector given a model (see textdetect.engine) only asks it about documents
+whose rule verdict is close or inconclusive.
+
+    python model.py train corpus/ -o model.npz      # corpus/ai/*.txt, corpus/human/*.txt
+    python model.py train labeled.jsonl -o model.npz  # {"text": ..., "label": "ai" | "human"}
+    python model.py eval heldout.jsonl --model model.npz
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import zlib
+
+import numpy as np
+
+from textdetect import Detector, TextStats
+
+DENSE_COLUMNS = [
+    'log_words', 'vocab_ratio', 'avg_sentence_length', 'sentence_variety',
+    'avg_word_length', 'ai_rate', 'human_rate', 'passive_rate'
+]
+LABELS = {'ai': 1, 'human': 0}
+PUNCTUATION = '.,;:!?"\'()[]{}'
+
+
+class HashedFeatures:
+    """Maps finished TextStats onto a sparse hashed vector plus dense stylometric columns"""
+
+    def __init__(self, bits=18):
+        self.bits = bits
+        self.size = 1 << bits
+        self._words = {}
+        self._phrases = {}
+
+    def _hash(self, key):
+        return zlib.crc32(key.encode('utf-8')) & (self.size - 1)
+
+    def _word_index(self, word):
+        index = self._words.get(word)
+        if index is None:
+            if len(self._words) > 1 << 20:
+                self._words.clear()
+            token = word.lower().strip(PUNCTUATION)
+            index = self._words[word] = self._hash(f'w:{token}') if token else -1
+        return index
+
+    def _phrases_of(self, matcher):
+        """Hashed index and groups (one per listing, as scored) of every matcher sequence"""
+        phrases = self._phrases.get(matcher.version)
+        if phrases is None:
+            groups = [[] for _ in matcher.sequences]
+            for group, entries in matcher.groups.items():
+                for _, _, sid in entries:
+                    groups[sid].append(group)
+            indexes = [self._hash('p:' + ' '.join(sequence)) for sequence in matcher.sequences]
+            phrases = self._phrases[matcher.version] = (indexes, groups)
+        return phrases
+
+    def transform(self, stats_list):
+        """(rows, columns, values, dense) arrays for a batch of finished TextStats"""
+        rows = []
+        columns = []
+        values = []
+        dense = np.zeros((len(stats_list), len(DENSE_COLUMNS)))
+        for row, stats in enumerate(stats_list):
+            features = {}
+            letters = 0
+            for word, count in stats.vocab.items():
+                letters += len(word) * count
+                index = self._word_index(word)
+                if index >= 0:
+                    features[index] = features.get(index, 0.0) + count
+            phrase_indexes, phrase_groups = self._phrases_of(stats.matcher)
+            group_counts = dict.fromkeys(('ai', 'human', 'passive'), 0)
+            for sid, count in enumerate(stats.counts):
+                if count:
+                    index = phrase_indexes[sid]
+                    features[index] = features.get(index, 0.0) + count
+                    for group in phrase_groups[sid]:
+                        group_counts[group] = group_counts.get(group, 0) + count
+
+            # Log counts, scaled to unit length so long documents are comparable
+            weights = np.log1p(np.fromiter(features.values(), dtype=np.float64, count=len(features)))
+            norm = np.sqrt((weights * weights).sum()) or 1.0
+            rows.append(np.full(len(features), row, dtype=np.int64))
+            columns.append(np.fromiter(features.keys(), dtype=np.int64, count=len(features)))
+            values.append(weights / norm)
+
+            words = max(stats.word_count, 1)
+            sentences = max(stats.sentence_count, 1)
+            dense[row] = (
+                np.log1p(stats.word_count),
+                len(stats.vocab) / words,
+                stats.sentence_words / sentences,
+                len(stats.sentence_lengths) / sentences,
+                letters / words,
+                group_counts['ai'] / words * 100,
+                group_counts['human'] / words * 100,
+                group_counts['passive'] / words * 100
+            )
+        if not stats_list:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0), dense
+        return np.concatenate(rows), np.concatenate(columns), np.concatenate(values), dense
+
+
+class LogisticModel:
+    """Hashed logistic regression; implements the Detector scorer interface"""
+
+    def __init__(self, bits=18, weights=None, dense_weights=None, bias=0.0, mean=None, scale=None,
+                 profile=None, lexicon=None):
+        self.features = HashedFeatures(bits)
+        # Profile name and matcher version the model was trained with (None: any); not part of the version
+        self.profile = profile
+        self.lexicon = lexicon
+        self.weights = np.zeros(self.features.size) if weights is None else weights
+        self.dense_weights = np.zeros(len(DENSE_COLUMNS)) if dense_weights is None else dense_weights
+        self.bias = float(bias)
+        self.mean = np.zeros(len(DENSE_COLUMNS)) if mean is None else mean
+        self.scale = np.ones(len(DENSE_COLUMNS)) if scale is None else scale
+        self._version = None
+
+    @property
+    def version(self):
+        # Changes with every retrained model, so cached verdicts of the old one are not reused
+        if self._version is None:
+            digest = hashlib.sha256()
+            for array in (self.weights, self.dense_weights, self.mean, self.scale, np.array([self.bias])):
+                digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+            self._version = f'lr-{digest.hexdigest()[:12]}'
+        return self._version
+
+    def check(self, profile, lexicon):
+        """Raise ValueError unless the model fits a detector with this profile name and matcher version"""
+        if self.profile is not None and self.profile != profile:
+            raise ValueError(f'Model was trained for profile {self.profile!r}, not {profile!r}')
+        if self.lexicon is not None and self.lexicon != lexicon:
+            raise ValueError(f'Model was trained for lexicon {self.lexicon}, not {lexicon}')
+
+    def _logits(self, batch):
+        rows, columns, values, dense = batch
+        logits = np.bincount(rows, weights=values * self.weights[columns], minlength=len(dense))
+        return logits + ((dense - self.mean) / self.scale) @ self.dense_weights + self.bias
+
+    def predict_proba(self, stats_list):
+        """Probability that each finished TextStats is AI generated"""
+        return 1.0 / (1.0 + np.exp(-self._logits(self.features.transform(stats_list))))
+
+    def fit(self, stats_list, labels, epochs=200, learning_rate=0.05, l2=1e-4):
+        """Full-batch Adam on the class-balanced log loss"""
+        labels = np.asarray(labels, dtype=np.float64)
+        batch = self.features.transform(stats_list)
+        rows, columns, values, dense = batch
+        self.mean = dense.mean(axis=0)
+        self.scale = dense.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        standardized = (dense - self.mean) / self.scale
+
+        positives = max(labels.sum(), 1.0)
+        negatives = max(len(labels) - labels.sum(), 1.0)
+        sample_weight = np.where(labels == 1, len(labels) / (2 * positives), len(labels) / (2 * negatives))
+        parameters = [self.weights, self.dense_weights, np.array([self.bias])]
+        moments = [(np.zeros_like(p), np.zeros_like(p)) for p in parameters]
+        for step in range(1, epochs + 1):
+            self.bias = parameters[2][0]
+            residual = (1.0 / (1.0 + np.exp(-self._logits(batch))) - labels) * sample_weight / len(labels)
+            gradients = [
+                np.bincount(columns, weights=values * residual[rows], minlength=self.features.size)
+                + l2 * self.weights,
+                standardized.T @ residual + l2 * self.dense_weights,
+                np.array([residual.sum()])
+            ]
+            for parameter, gradient, (first, second) in zip(parameters, gradients, moments):
+                first *= 0.9
+                first += 0.1 * gradient
+                second *= 0.999
+                second += 0.001 * gradient * gradient
+                parameter -= (learning_rate * (first / (1 - 0.9 ** step))
+                              / (np.sqrt(second / (1 - 0.999 ** step)) + 1e-8))
+        self.bias = float(parameters[2][0])
+        self._version = None
+        return self
+
+    def save(self, path):
+        tags = {name: getattr(self, name) for name in ('profile', 'lexicon') if getattr(self, name) is not None}
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, bits=self.features.bits, weights=self.weights,
+                                dense_weights=self.dense_weights, bias=self.bias,
+                                mean=self.mean, scale=self.scale, **tags)
+
+    @classmethod
+    def load(cls, path):
+        """Read a saved model; files from before profile and lexicon were recorded fit any"""
+        with np.load(path) as data:
+            tags = {name: str(data[name]) for name in ('profile', 'lexicon') if name in data}
+            return cls(int(data['bits']), data['weights'], data['dense_weights'], float(data['bias']),
+                       data['mean'], data['scale'], **tags)
+
+
+def load_model(path):
+    return LogisticModel.load(path)
+
+
+def read_corpus(path):
+    """Yield (text, label) from ai/ and human/ directories or a labeled JSONL file"""
+    from scan import walk
+
+    if os.path.isdir(path):
+        for name, label in LABELS.items():
+            for file_path in walk(os.path.join(path, name)):
+                with open(file_path, encoding='utf-8', errors='replace') as f:
+                    yield f.read(), label
+        return
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            label = str(record.get('label', '')).lower()
+            if label not in LABELS:
+                raise ValueError(f'{path}:{number}: label must be "ai" or "human"')
+            yield record['text'], LABELS[label]
+
+
+def corpus_stats(path, detector):
+    stats_list = []
+    labels = []
+    for text, label in read_corpus(path):
+        stats = TextStats(detector.matcher)
+        stats.feed(text)
+        stats_list.append(stats.finish())
+        labels.append(label)
+    return stats_list, np.array(labels)
+
+
+def report(model, stats_list, labels):
+    probabilities = model.predict_proba(stats_list)
+    clipped = np.clip(probabilities, 1e-9, 1 - 1e-9)
+    log_loss = -np.mean(labels * np.log(clipped) + (1 - labels) * np.log(1 - clipped))
+    accuracy = np.mean((probabilities >= 0.5) == labels)
+    return f'{len(labels)} documents: accuracy {accuracy:.3f}, log loss {log_loss:.4f}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    train = commands.add_parser('train', help='fit a model on a labeled corpus')
+    train.add_argument('corpus')
+    train.add_argument('-o', '--output', required=True)
+    train.add_argument('--bits', type=int, default=18, help='log2 of the hashed feature count')
+    train.add_argument('--epochs', type=int, default=200)
+    train.add_argument('--holdout', type=float, default=0.2, help='share of documents kept for evaluation')
+    train.add_argument('--seed', type=int, default=0)
+    evaluate = commands.add_parser('eval', help='report accuracy and log loss on a labeled corpus')
+    evaluate.add_argument('corpus')
+    evaluate.add_argument('--model', required=True)
+    for command in (train, evaluate):
+        command.add_argument('--profile', default='web', help='profile whose lexicon is matched')
+    args = parser.parse_args(argv)
+
+    detector = Detector(args.profile)
+    stats_list, labels = corpus_stats(args.corpus, detector)
+    if not len(labels):
+        parser.error(f'no labeled documents in {args.corpus}')
+    if args.command == 'eval':
+        model = load_model(args.model)
+        try:
+            model.check(detector.profile.name, detector.matcher.version)
+        except ValueError as e:
+            parser.error(f'{args.model}: {e}')
+        print(report(model, stats_list, labels))
+        return 0
+
+    order = np.random.default_rng(args.seed).permutation(len(labels))
+    held = order[:int(len(labels) * args.holdout)]
+    kept = order[len(held):]
+    model = LogisticModel(args.bits, profile=detector.profile.name, lexicon=detector.matcher.version).fit([stats_list[i] for i in kept], labels[kept], epochs=args.epochs)
+    print('train    ' + report(model, [stats_list[i] for i in kept], labels[kept]), file=sys.stderr)
+    if len(held):
+        print('holdout  ' + report(model, [stats_list[i] for i in held], labels[held]), file=sys.stderr)
+    model.save(args.output)
+    print(f'{args.output}: {model.version}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""MinHash/LSH index of analyzed texts, so near-copies reuse an earlier result.
+
+A text's signature is a one-permutation MinHash over its word 3-grams: each
+shingle is hashed once, the low bits pick one of NUM_HASHES bins and each
+bin keeps its smallest hash. The signature is split into BANDS bands; texts
+sharing any band are candidates, and a candidate whose signatures agree on
+at least `threshold` of their positions (the estimated Jaccard similarity of
+the shingle sets) is a near-duplicate.
+
+Signing is a few C-level passes over the text (split, crc32, tuple hashing)
+and one pass over the smallest hashes, so a lookup costs well under a
+rescore. The index keeps at most `max_entries` results, least recently used
+first out, and can be saved to and loaded from a JSON file.
+"""
+import json
+import os
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+
+NUM_HASHES = 64
+BANDS = 16
+SHINGLE = 3
+# Shingles kept per bin on long texts; a bin left empty by the cut is rare and recomputed exactly
+SAMPLE_PER_BIN = 8
+FORMAT = 1
+# Larger than any hash, marks a bin no shingle fell into
+EMPTY = 1 << 63
+
+
+def minhash(text, num_hashes=NUM_HASHES):
+    """The MinHash signature (a tuple of ints) of a text's word 3-grams"""
+    words = list(map(zlib.crc32, text.lower().encode('utf-8').split()))
+    if len(words) >= SHINGLE:
+        shingles = list(map(hash, zip(*(words[i:] for i in range(SHINGLE)))))
+    else:
+        shingles = [hash(tuple(words))]
+
+    # Hashes are spread over the signed 64-bit range; only the smallest can be bin minima
+    sample = SAMPLE_PER_BIN * num_hashes
+    if len(shingles) > sample:
+        cut = -(1 << 63) + (1 << 64) // len(shingles) * sample
+        signature = _bin_minima(filter(cut.__gt__, shingles), num_hashes)
+        if EMPTY in signature:
+            signature = _bin_minima(shingles, num_hashes)
+    else:
+        signature = _bin_minima(shingles, num_hashes)
+
+    # Densify: an empty bin (short texts) borrows the value of the next filled bin
+    if EMPTY in signature:
+        original = signature[:]
+        following = None
+        for i in reversed(range(2 * num_hashes)):
+            slot = i % num_hashes
+            if original[slot] != EMPTY:
+                following = i
+            elif i < num_hashes and following is not None:
+                signature[slot] = hash((original[following % num_hashes], following - i))
+        if following is None:
+            signature = [0] * num_hashes
+    return tuple(signature)
+
+
+def _bin_minima(shingles, num_hashes):
+    mask = num_hashes - 1
+    signature = [EMPTY] * num_hashes
+    for value in shingles:
+        slot = value & mask
+        if value < signature[slot]:
+            signature[slot] = value
+    return signature
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """Bounded LSH index of {signature: result} for one detector version at a time"""
+
+    def __init__(self, threshold=0.9, max_entries=10_000, num_hashes=NUM_HASHES, bands=BANDS):
+        if num_hashes & (num_hashes - 1) or num_hashes % bands:
+            raise ValueError('num_hashes must be a power of two divisible by bands')
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.num_hashes = num_hashes
+        self.bands = bands
+        self.rows = num_hashes // bands
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (version, signature, result), least recently used first
+        self._entries = OrderedDict()
+        self._buckets = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def signature(self, text):
+        return minhash(text, self.num_hashes)
+
+    def _bands(self, signature):
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows] for i in range(self.bands)]
+
+    def lookup(self, signature, version):
+        """(key, similarity, result) of the most similar stored text above the threshold, or None"""
+        with self._lock:
+            candidates = set()
+            for bucket, band in zip(self._buckets, self._bands(signature)):
+                candidates.update(bucket.get(band, ()))
+            best = None
+            for key in candidates:
+                entry_version, entry_signature, result = self._entries[key]
+                if entry_version != version:
+                    continue
+                score = similarity(signature, entry_signature)
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (key, score, result)
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best[0])
+            self.hits += 1
+            return best
+
+    def add(self, key, signature, version, result):
+        signature = tuple(signature)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (version, signature, result)
+            for bucket, band in zip(self._buckets, self._bands(signature)):
+                bucket.setdefault(band, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, signature, _ = self._entries.pop(key)
+        for bucket, band in zip(self._buckets, self._bands(signature)):
+            keys = bucket.get(band)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del bucket[band]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets = [{} for _ in range(self.bands)]
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'threshold': self.threshold,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+    def _header(self):
+        # Tuple hashes of ints are stable across runs but not across Python versions
+        return {'format': FORMAT, 'num_hashes': self.num_hashes, 'python': list(sys.version_info[:2]),
+                'hash': sys.hash_info.algorithm}
+
+    def save(self, path):
+        """Write the index to `path` atomically, one JSON entry per line"""
+        with self._lock:
+            entries = list(self._entries.items())
+        # Every worker of a pre-forking server saves at exit, each to its own temporary file
+        temporary = f'{path}.tmp{os.getpid()}'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self._header()) + '\n')
+            for key, (version, signature, result) in entries:
+                f.write(json.dumps([key, version, signature, result]) + '\n')
+        os.replace(temporary, path)
+
+    def load(self, path):
+        """Add the entries saved at `path`; returns how many
+
+        A file saved by another setup, or that cannot be read, adds nothing;
+        lines that do not parse (e.g. a torn last line) are skipped.
+        """
+        try:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                try:
+                    header = json.loads(f.readline() or 'null')
+                except ValueError:
+                    return 0
+                if header != self._header():
+                    return 0
+                count = 0
+                for line in f:
+                    try:
+                        key, version, signature, result = json.loads(line)
+                        if len(signature) != self.num_hashes:
+                            continue
+                        self.add(key, signature, version, result)
+                    except (ValueError, TypeError):
+                        continue
+                    count += 1
+        except OSError:
+            return 0
+        return count
@@ -0,0 +1,58 @@
+"""Compact and binary encodings of analysis results for high-volume clients.
+
+The full result lists every distinct indicator with its category name. The
+compact form keeps the verdict and stats but lists only the top N indicators
+per group, as [phrase, count, category id], plus the total count of every
+category as [category id, count] and the number of distinct indicators per
+group. Category ids index the sorted category names of the loaded lexicon
+(GET /analyze/categories).
+
+MessagePack is used when the client prefers it and the optional msgpack
+package is installed; otherwise responses stay JSON.
+"""
+import heapq
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+class CompactFormat:
+    """Category ids of one lexicon and the compaction of results produced with it"""
+
+    def __init__(self, version, groups):
+        # groups: TokenMatcher.groups, {group: [(phrase, category, sequence_id), ...]}
+        self.version = version
+        self.categories = sorted({category for entries in groups.values() for _, category, _ in entries})
+        self.ids = {category: i for i, category in enumerate(self.categories)}
+
+    def compact(self, result, top=5):
+        """The compact form of a full result; error results are returned as they are"""
+        if 'indicators' not in result:
+            return result
+        ids = self.ids
+        compact = {key: value for key, value in result.items() if key != 'indicators'}
+        indicators = compact['indicators'] = {}
+        categories = compact['categories'] = {}
+        counts = compact['indicator_counts'] = {}
+        for group, found in result['indicators'].items():
+            totals = {}
+            for item in found:
+                category = ids[item['category']]
+                totals[category] = totals.get(category, 0) + item['count']
+            # Ties keep lexicon order, like the full list
+            ranked = heapq.nlargest(top, found, key=lambda item: item['count'])
+            indicators[group] = [[item['phrase'], item['count'], ids[item['category']]] for item in ranked]
+            categories[group] = [[category, total] for category, total in sorted(totals.items())]
+            counts[group] = len(found)
+        if 'spans' in result:
+            compact['spans'] = {**result['spans'], 'items': [
+                {**span, 'category': ids[span['category']]} for span in result['spans']['items']]}
+        return compact
+
+
+def packb(payload):
+    return msgpack.packb(payload, use_bin_type=True)
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(text, version):
+    """Hash of the whitespace-normalized text plus the lexicon version.
+
+    Whitespace never changes a score (words, sentences and tokens are all
+    whitespace-insensitive), so retries that only differ in spacing share a key.
+    """
+    normalized = ' '.join(text.split())
+    digest = hashlib.sha256(version.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalized.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """In-process LRU cache with a per-entry time to live"""
+
+    def __init__(self, max_entries=1024, ttl=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, result = entry
+                if expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def set(self, key, result):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            'backend': 'memory',
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class SqliteResultCache:
+    """On-disk cache that survives restarts and is shared by worker processes"""
+
+    def __init__(self, path, max_entries=100_000, ttl=24 * 3600, clock=time.time, prune_every=64):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        # Trimming the table costs a COUNT(*), so only do it every few writes
+        self.prune_every = prune_every
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'expires REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+            db.execute('CREATE INDEX IF NOT EXISTS results_expires ON results (expires)')
+
+    def _connect(self):
+        # sqlite connections must not be shared between threads
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=10)
+        return db
+
+    def get(self, key):
+        now = self.clock()
+        db = self._connect()
+        row = db.execute('SELECT value, expires FROM results WHERE key = ?', (key,)).fetchone()
+        if row is not None and row[1] > now:
+            with db:
+                db.execute('UPDATE results SET accessed = ? WHERE key = ?', (now, key))
+            self.hits += 1
+            return json.loads(row[0])
+        if row is not None:
+            with db:
+                db.execute('DELETE FROM results WHERE key = ?', (key,))
+            self.evictions += 1
+        self.misses += 1
+        return None
+
+    def set(self, key, result):
+        now = self.clock()
+        db = self._connect()
+        with db:
+            db.execute(
+                'INSERT OR REPLACE INTO results (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(result), now + self.ttl, now)
+            )
+            self._writes += 1
+            if self._writes % self.prune_every:
+                return
+            # Expired rows go first, then the least recently used ones
+            removed = db.execute('DELETE FROM results WHERE expires <= ?', (now,)).rowcount
+            size = db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            if size > self.max_entries:
+                removed += db.execute(
+                    'DELETE FROM results WHERE key IN '
+                    '(SELECT key FROM results ORDER BY accessed LIMIT ?)',
+                    (size - self.max_entries,)
+                ).rowcount
+            self.evictions += removed
+
+    def clear(self):
+        db = self._connect()
+        with db:
+            db.execute('DELETE FROM results')
+
+    def stats(self):
+        size = self._connect().execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'size': size,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
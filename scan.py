@@ -0,0 +1,284 @@
+"""Bulk scanner: score every document in a directory tree or file list.
+
+.txt and .md files are one document each (read and scored in the worker,
+streamed, so file size does not matter); every line of a .jsonl file is a
+document, given as a JSON string or an object with "text" and optional "id".
+Results are written as they complete, to CSV or JSONL chosen by extension.
+
+The output doubles as the checkpoint: with --resume the ids already in it
+are skipped and new results are appended, so an interrupted scan picks up
+where it stopped without rescoring anything.
+
+    python scan.py corpus/ -o results.csv
+    python scan.py --files-from list.txt -o results.jsonl --workers 8
+    python scan.py corpus/ -o results.csv --resume
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from textdetect import Detector
+from textdetect.weights import load_weights
+
+EXTENSIONS = ('.txt', '.md', '.jsonl')
+FIELDS = ['id', 'prediction', 'confidence', 'ai_score', 'human_score', 'word_count',
+          'sentence_count', 'avg_sentence_length', 'vocab_ratio', 'model_probability', 'error']
+MIN_LENGTH = 20
+
+_detector = None
+
+
+def _init_worker(profile, lexicon_path, model_path=None, weights_path=None):
+    global _detector
+    scorer = None
+    if model_path:
+        from model import load_model
+        scorer = load_model(model_path)
+    weights = load_weights(weights_path) if weights_path else None
+    _detector = Detector(profile, lexicon_path, scorer, weights=weights)
+
+
+def _score(text=None, path=None):
+    if path is not None:
+        if os.path.getsize(path) < MIN_LENGTH:
+            return {'error': 'Text too short for analysis'}
+        with open(path, 'rb') as f:
+            verdict = _detector.analyze_stream(f)
+    else:
+        if not isinstance(text, str) or len(text.strip()) < MIN_LENGTH:
+            return {'error': 'Text too short for analysis' if isinstance(text, str) else 'No text provided'}
+        verdict = _detector.analyze_text(text)
+    return {
+        'prediction': verdict['prediction'],
+        'confidence': round(verdict['confidence'], 1),
+        'ai_score': round(verdict['ai_score'], 1),
+        'human_score': round(verdict['human_score'], 1),
+        'word_count': verdict['word_count'],
+        'sentence_count': verdict['sentence_count'],
+        'avg_sentence_length': round(verdict['avg_sentence_length'], 1),
+        'vocab_ratio': round(verdict['vocab_ratio'], 2),
+        'model_probability': (None if verdict['model_probability'] is None
+                              else round(verdict['model_probability'], 3))
+    }
+
+
+def _scan_chunk(tasks):
+    """Score [(id, path or None, text or None), ...]; a failure only affects its own document"""
+    rows = []
+    for doc_id, path, text in tasks:
+        try:
+            row = _score(text, path)
+        except Exception as e:
+            row = {'error': str(e)}
+        rows.append({'id': doc_id, **row})
+    return rows
+
+
+def walk(root):
+    """Files with a scanned extension under `root`, in a stable order"""
+    if not os.path.isdir(root):
+        yield root
+        return
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError as e:
+            print(f'{directory}: {e.strerror}', file=sys.stderr)
+            continue
+        subdirectories = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+            elif entry.name.lower().endswith(EXTENSIONS):
+                yield entry.path
+        stack.extend(reversed(subdirectories))
+
+
+def iter_sources(paths, files_from=None):
+    """Input files, lazily, so a million-file scan starts right away"""
+    for root in paths:
+        yield from walk(root)
+    if files_from:
+        stream = sys.stdin if files_from == '-' else open(files_from, encoding='utf-8')
+        with stream:
+            for line in stream:
+                if line.strip():
+                    yield line.rstrip('\n')
+
+
+def iter_tasks(paths, files_from=None):
+    """Yield (id, path, text) for every document; files are read by the workers"""
+    for path in iter_sources(paths, files_from):
+        if not path.lower().endswith('.jsonl'):
+            yield path, path, None
+            continue
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if isinstance(record, dict):
+                    doc_id = record.get('id')
+                    yield f'{path}:{doc_id if doc_id is not None else number}', None, record.get('text')
+                else:
+                    yield f'{path}:{number}', None, record
+
+
+def read_finished(path, fmt):
+    """Ids already in an output file; a torn last line from a crash is cut off first"""
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            f.truncate(end)
+            data = data[:end]
+    text = data.decode('utf-8', errors='replace')
+    if fmt == 'csv':
+        rows = csv.reader(io.StringIO(text))
+        next(rows, None)
+        return {row[0] for row in rows if row}
+    return {json.loads(line)['id'] for line in text.splitlines() if line.strip()}
+
+
+class Writer:
+    def __init__(self, stream, fmt, header):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.csv = csv.DictWriter(stream, FIELDS)
+            if header:
+                self.csv.writeheader()
+
+    def write(self, rows):
+        if self.fmt == 'csv':
+            self.csv.writerows(rows)
+        else:
+            self.stream.write(''.join(json.dumps(row) + '\n' for row in rows))
+        # Every finished chunk is on disk before the next one is reported
+        self.stream.flush()
+
+
+def scan(tasks, writer, workers=None, profile='web', lexicon_path=None, chunk_size=32,
+         finished=frozenset(), progress=None, model_path=None, weights_path=None):
+    """Score all tasks in a process pool, writing rows as chunks complete; returns (scored, skipped)"""
+    workers = workers or os.cpu_count() or 1
+    scored = skipped = 0
+    pending = set()
+
+    def drain(block):
+        """Write the chunks that are done, waiting for at least one if `block`"""
+        nonlocal scored
+        if block:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        else:
+            done = {future for future in pending if future.done()}
+        for future in done:
+            pending.discard(future)
+            rows = future.result()
+            writer.write(rows)
+            scored += len(rows)
+        if progress:
+            progress(scored, skipped)
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(profile, lexicon_path, model_path, weights_path)) as pool:
+        try:
+            chunk = []
+            for task in tasks:
+                if task[0] in finished:
+                    skipped += 1
+                    continue
+                chunk.append(task)
+                if len(chunk) >= chunk_size:
+                    pending.add(pool.submit(_scan_chunk, chunk))
+                    chunk = []
+                    # Bound the work in flight so huge scans never pile up in memory
+                    while len(pending) >= workers * 4:
+                        drain(True)
+                    drain(False)
+            if chunk:
+                pending.add(pool.submit(_scan_chunk, chunk))
+            while pending:
+                drain(True)
+        except BaseException:
+            pool.shutdown(cancel_futures=True)
+            raise
+    return scored, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', help='files or directories to scan')
+    parser.add_argument('--files-from', help="file with one path per line ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help='.csv or .jsonl file (default: JSONL on stdout)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='override the format implied by --output')
+    parser.add_argument('--resume', action='store_true', help='skip ids already in --output and append')
+    parser.add_argument('--force', action='store_true', help='overwrite an existing --output')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--profile', default='web', help='engine profile (web or pro)')
+    parser.add_argument('--lexicon', help='compiled lexicon to use instead of the profile\'s')
+    parser.add_argument('--chunk-size', type=int, default=32, help='documents per worker task')
+    parser.add_argument('--model', help='model (see model.py) that settles close rule verdicts')
+    parser.add_argument('--weights', help='scoring weights (see calibrate.py) instead of the defaults')
+    args = parser.parse_args(argv)
+
+    if not args.paths and not args.files_from:
+        parser.error('give at least one path or --files-from')
+    fmt = args.format or ('csv' if args.output.lower().endswith('.csv') else 'jsonl')
+
+    finished = set()
+    if args.output == '-':
+        if args.resume:
+            parser.error('--resume needs an --output file')
+        stream = sys.stdout
+        header = True
+    else:
+        exists = os.path.exists(args.output) and os.path.getsize(args.output) > 0
+        if exists and not (args.resume or args.force):
+            parser.error(f'{args.output} exists; pass --resume to continue it or --force to overwrite it')
+        if exists and args.resume:
+            finished = read_finished(args.output, fmt)
+        header = not (exists and args.resume)
+        stream = open(args.output, 'a' if args.resume else 'w', encoding='utf-8', newline='')
+
+    started = time.perf_counter()
+    last_report = [started]
+
+    def progress(scored, skipped):
+        now = time.perf_counter()
+        if now - last_report[0] >= 2:
+            last_report[0] = now
+            print(f'\r{scored} scored ({scored / (now - started):.0f}/s), {skipped} skipped',
+                  end='', file=sys.stderr, flush=True)
+
+    try:
+        scored, skipped = scan(iter_tasks(args.paths, args.files_from), Writer(stream, fmt, header),
+                               args.workers, args.profile, args.lexicon, args.chunk_size,
+                               finished, progress, args.model, args.weights)
+    except KeyboardInterrupt:
+        print('\nInterrupted; run again with --resume to continue', file=sys.stderr)
+        return 130
+    except BrokenPipeError:
+        # The reader of stdout went away (e.g. piped into head)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    elapsed = time.perf_counter() - started
+    print(f'\r{scored} scored, {skipped} already done, {elapsed:.1f}s', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
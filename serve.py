@@ -0,0 +1,374 @@
+"""Production serving mode: an ASGI app with bounded work and load shedding.
+
+POST /analyze is handled natively on the event loop. Scoring runs in a bounded
+process pool, so a slow or huge request can never block other clients.
+The result cache and the near-duplicate index are shared with main.analyze.
+Requests setting "spans", "fast" or "profile" hold their slot like any
+other but are scored by main.analyze, which implements them.
+Requests over capacity are rejected immediately instead of queueing without
+limit:
+
+    413  body larger than ANALYZE_MAX_BODY_BYTES
+    429  client already has ANALYZE_PER_CLIENT_LIMIT requests in flight
+    503  ANALYZE_WORKERS + ANALYZE_MAX_QUEUE requests already in flight, or
+         the analysis did not finish within ANALYZE_TIME_BUDGET seconds
+
+A client is the connection's address (scope['client']). Behind a reverse
+proxy that is the proxy's address for every request, which turns the
+per-client limit into a global one: run uvicorn with --proxy-headers and
+--forwarded-allow-ips set to the proxy, so the address comes from
+X-Forwarded-For, or raise ANALYZE_PER_CLIENT_LIMIT to the capacity.
+
+Every other route is served by the Flask app in main.py (through asgiref).
+Requests with a body, except /analyze/stream, go through the same limits
+first.
+
+    python serve.py                 # uvicorn on 0.0.0.0:5000
+    uvicorn serve:app --port 5000
+"""
+import asyncio
+import functools
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+import main
+from batch import _analyze_chunk, _init_worker
+from response_format import MSGPACK_TYPES, msgpack, packb
+from result_cache import cache_key
+
+
+# Requests with these methods hold a work slot and have their body size capped
+BODY_METHODS = ('POST', 'PUT', 'PATCH')
+# Streams its body in bounded memory, so any size is accepted
+UNLIMITED_PATHS = ('/analyze/stream',)
+
+
+# /analyze options handled by main.analyze; requests using them are passed on to it
+FLASK_OPTIONS = frozenset(('spans', 'fast', 'profile'))
+
+
+class ServeConfig:
+    def __init__(self, workers=None, max_queue=32, per_client_limit=8,
+                 max_body_bytes=1024 * 1024, time_budget=5.0, use_processes=True):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.per_client_limit = per_client_limit
+        self.max_body_bytes = max_body_bytes
+        self.time_budget = time_budget
+        self.use_processes = use_processes
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        return cls(
+            workers=int(env.get('ANALYZE_WORKERS', 0)) or None,
+            max_queue=int(env.get('ANALYZE_MAX_QUEUE', 32)),
+            per_client_limit=int(env.get('ANALYZE_PER_CLIENT_LIMIT', 8)),
+            max_body_bytes=int(env.get('ANALYZE_MAX_BODY_BYTES', 1024 * 1024)),
+            time_budget=float(env.get('ANALYZE_TIME_BUDGET', 5.0)),
+            use_processes=env.get('ANALYZE_EXECUTOR', 'process') == 'process'
+        )
+
+    @property
+    def capacity(self):
+        return self.workers + self.max_queue
+
+
+class Rejected(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = list(headers)
+
+
+async def send_json(send, status, payload, headers=(), binary=False):
+    if binary:
+        body = packb(payload)
+        content_type = b'application/msgpack'
+    else:
+        body = json.dumps(payload).encode('utf-8')
+        content_type = b'application/json'
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type),
+                    (b'content-length', str(len(body)).encode())] + list(headers)
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def wants_msgpack(scope):
+    """Whether the client's Accept header prefers MessagePack and it can be produced"""
+    if msgpack is None:
+        return False
+    from werkzeug.http import parse_accept_header
+    from werkzeug.datastructures import MIMEAccept
+
+    accept = dict(scope['headers']).get(b'accept', b'').decode('latin-1')
+    best = parse_accept_header(accept, MIMEAccept).best_match(('application/json',) + MSGPACK_TYPES)
+    return best in MSGPACK_TYPES
+
+
+class AnalyzeServer:
+    """ASGI app that serves /analyze with bounded concurrency"""
+
+    def __init__(self, config=None, fallback=None):
+        self.config = config or ServeConfig.from_env()
+        self.fallback = fallback
+        self.executor = None
+        self.active = 0
+        self.per_client = Counter()
+        self.rejected = Counter()
+
+    def start(self):
+        if self.executor is not None:
+            return
+        if self.config.use_processes:
+            self.executor = ProcessPoolExecutor(self.config.workers, initializer=_init_worker,
+                                                initargs=(main.make_detector,))
+        else:
+            self.executor = ThreadPoolExecutor(self.config.workers)
+
+    def stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http' and scope['path'] == '/analyze' and scope['method'] == 'POST':
+            await self.recorded(scope, receive, send)
+        elif self.fallback is not None:
+            if scope['type'] == 'http' and scope['method'] in BODY_METHODS and scope['path'] not in UNLIMITED_PATHS:
+                await self.limited(scope, receive, send)
+            else:
+                await self.fallback(scope, receive, send)
+        else:
+            await send_json(send, 404, {'error': 'Not found'})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.stop()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def recorded(self, scope, receive, send):
+        """Serve /analyze and count it in main.metrics like the Flask routes"""
+        start = time.perf_counter()
+        statuses = []
+
+        async def send_and_record(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            await send(message)
+
+        try:
+            await self.analyze(scope, receive, send_and_record)
+        finally:
+            labels = {'route': '/analyze', 'method': 'POST'}
+            main.metrics.inc('http_requests_total', status=statuses[0] if statuses else 499, **labels)
+            main.metrics.observe('http_request_duration_seconds', time.perf_counter() - start, **labels)
+
+    async def limited(self, scope, receive, send):
+        """Hand a request with a body to the Flask app under the same limits as /analyze"""
+        try:
+            client = self.admit(scope)
+        except Rejected as e:
+            self.rejected[e.status] += 1
+            await send_json(send, e.status, {'error': str(e)}, e.headers)
+            return
+        try:
+            body = await self.read_body(receive)
+            await self.fallback(scope, replay(body, receive), send)
+        except Rejected as e:
+            self.rejected[e.status] += 1
+            await send_json(send, e.status, {'error': str(e)}, e.headers)
+        except ConnectionError:
+            pass
+        finally:
+            self.release(client)
+
+    def collect(self):
+        """In-flight and rejected request counts, read by main.metrics at scrape time"""
+        samples = [('serve_active_requests', {}, self.active),
+                   ('serve_capacity', {}, self.config.capacity)]
+        samples += [('serve_rejected_total', {'reason': str(reason)}, count)
+                    for reason, count in self.rejected.items()]
+        return samples
+
+    def admit(self, scope):
+        """Take a work slot for the request or raise Rejected"""
+        headers = dict(scope['headers'])
+        length = headers.get(b'content-length')
+        if length is not None:
+            try:
+                length = int(length)
+            except ValueError:
+                raise Rejected(400, 'Invalid Content-Length header') from None
+            if length < 0:
+                raise Rejected(400, 'Invalid Content-Length header')
+            if length > self.config.max_body_bytes:
+                raise Rejected(413, 'Request body too large')
+        if self.active >= self.config.capacity:
+            raise Rejected(503, 'Server overloaded, retry later', [(b'retry-after', b'1')])
+        # The proxy's address behind a reverse proxy without --proxy-headers (see above)
+        client = (scope.get('client') or ('unknown',))[0]
+        if self.per_client[client] >= self.config.per_client_limit:
+            raise Rejected(429, 'Too many concurrent requests', [(b'retry-after', b'1')])
+        self.active += 1
+        self.per_client[client] += 1
+        return client
+
+    def release(self, client):
+        self.active -= 1
+        self.per_client[client] -= 1
+        if not self.per_client[client]:
+            del self.per_client[client]
+
+    async def read_body(self, receive):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise ConnectionError('Client disconnected')
+            body += message.get('body', b'')
+            if len(body) > self.config.max_body_bytes:
+                raise Rejected(413, 'Request body too large')
+            if not message.get('more_body'):
+                return bytes(body)
+
+    async def analyze(self, scope, receive, send):
+        try:
+            client = self.admit(scope)
+        except Rejected as e:
+            self.rejected[e.status] += 1
+            await send_json(send, e.status, {'error': str(e)}, e.headers)
+            return
+
+        submitted = False
+        try:
+            body = await self.read_body(receive)
+            data = json.loads(body or b'null')
+            query = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+            if isinstance(data, dict) and (FLASK_OPTIONS.intersection(data) or 'profile' in query):
+                await self.forward(scope, replay(body, receive), send)
+                return
+            text = data.get('text', '') if isinstance(data, dict) else None
+            error = main.validate_text(text)
+            if error:
+                await send_json(send, 400, {'error': error})
+                return
+            try:
+                top = main.read_format({**query, **data})
+            except ValueError as e:
+                await send_json(send, 400, {'error': str(e)})
+                return
+
+            # Pool workers rebuild their detector when this version changes
+            main.refresh_lexicon()
+            version = main.detector.for_text(text).version
+            key = cache_key(text, version)
+            result = main.result_cache.get(key)
+            signature = None
+            if result is None:
+                signature, result = main.find_near_duplicate(text, version, data.get('near_duplicates') is not False)
+            if result is None:
+                future = self.submit(text.strip())
+                # The slot stays taken until the work really finishes, even if
+                # the client already got a 503 for exceeding the time budget
+                future.add_done_callback(lambda _: self.release(client))
+                submitted = True
+                try:
+                    result = await asyncio.wait_for(asyncio.shield(future), self.config.time_budget)
+                except asyncio.TimeoutError:
+                    self.rejected['budget'] += 1
+                    await send_json(send, 503, {'error': 'Analysis exceeded the time budget'})
+                    return
+                if 'error' in result:
+                    await send_json(send, 500, result)
+                    return
+                main.result_cache.set(key, result)
+                main.remember_near_duplicate(key, signature, version, result)
+            if top is not None:
+                result = main.get_compact_format().compact(result, top)
+            await send_json(send, 200, result, binary=wants_msgpack(scope))
+
+        except Rejected as e:
+            self.rejected[e.status] += 1
+            await send_json(send, e.status, {'error': str(e)}, e.headers)
+        except ValueError:
+            await send_json(send, 400, {'error': 'Invalid JSON body'})
+        except ConnectionError:
+            pass
+        finally:
+            if not submitted:
+                self.release(client)
+
+    async def forward(self, scope, receive, send):
+        """Serve an /analyze request with options only main.analyze implements"""
+        if self.fallback is None:
+            await send_json(send, 501, {'error': f'{", ".join(sorted(FLASK_OPTIONS))} need asgiref installed'})
+            return
+        await self.fallback(scope, receive, send)
+
+    def submit(self, text):
+        self.start()
+        loop = asyncio.get_running_loop()
+        if self.config.use_processes:
+            call = functools.partial(_analyze_chunk, [text], main.detector.version)
+            return asyncio.ensure_future(self._first(loop.run_in_executor(self.executor, call)))
+        return loop.run_in_executor(self.executor, _analyze_one, text)
+
+    @staticmethod
+    async def _first(future):
+        return (await future)[0]
+
+
+def replay(body, receive):
+    """An ASGI receive that yields an already read body, then defers to `receive`"""
+    pending = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+    async def receive_body():
+        if pending:
+            return pending.pop()
+        return await receive()
+
+    return receive_body
+
+
+def _analyze_one(text):
+    try:
+        return main.detector.analyze_text(text)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def _flask_fallback():
+    try:
+        from asgiref.wsgi import WsgiToAsgi
+    except ImportError:
+        return None
+    return WsgiToAsgi(main.app)
+
+
+app = AnalyzeServer(fallback=_flask_fallback())
+main.metrics.describe('serve_active_requests', 'gauge', 'Requests holding a work slot')
+main.metrics.describe('serve_capacity', 'gauge', 'Work slots (workers plus queue)')
+main.metrics.describe('serve_rejected_total', 'counter', 'Requests shed, by status code or exceeded budget')
+main.metrics.add_collector(app.collect)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from near_duplicates import NearDuplicateIndex
+from result_cache import ResultCache
+
+WORDS = ('alpha beta gamma delta river stone cloud paper window garden yellow quiet music '
+         'table orange summer winter bottle candle forest morning letter').split()
+
+
+@pytest.fixture
+def make_text():
+    """Random indicator-free text of `words` words in sentences of 12, the same for a given seed"""
+    def make(seed=0, words=300):
+        rng = random.Random(seed)
+        return ' '.join(rng.choice(WORDS) + ('.' if i % 12 == 11 else '') for i in range(words))
+    return make
+
+
+@pytest.fixture
+def main(monkeypatch):
+    """main.py with a fresh result cache, near-duplicate index and incremental store"""
+    pytest.importorskip('flask')
+    import main
+    from textdetect.incremental import IncrementalAnalyzer
+
+    monkeypatch.setattr(main, 'result_cache', ResultCache(max_entries=64))
+    monkeypatch.setattr(main, 'near_duplicates', NearDuplicateIndex(0.9, 64))
+    monkeypatch.setattr(main, 'incremental', IncrementalAnalyzer(main.detector, max_documents=8))
+    return main
+
+
+@pytest.fixture
+def client(main):
+    return main.app.test_client()
+
+
+@pytest.fixture
+def asgi():
+    """Call an ASGI app once: asgi(app, method, path, body) -> (status, decoded JSON body)"""
+    def call(app, method, path, body=b'', headers=(), client=('127.0.0.1', 1234)):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        if not any(name == b'content-length' for name, _ in headers):
+            headers = [(b'content-length', str(len(body)).encode())] + list(headers)
+        path, _, query = path.partition('?')
+        scope = {'type': 'http', 'http_version': '1.1', 'scheme': 'http', 'method': method, 'path': path,
+                 'raw_path': path.encode(), 'root_path': '', 'query_string': query.encode(),
+                 'headers': [(b'content-type', b'application/json')] + list(headers),
+                 'client': client, 'server': ('testserver', 80)}
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.sleep(3600)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(app(scope, receive, send))
+        status = sent[0]['status']
+        payload = b''.join(message.get('body', b'') for message in sent[1:])
+        return status, json.loads(payload)
+    return call
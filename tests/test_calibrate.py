@@ -0,0 +1,32 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import calibrate
+from textdetect.weights import Weights, load_weights
+
+
+def write_corpus(root, make_text):
+    for label in ('ai', 'human'):
+        (root / label).mkdir(parents=True)
+        for i in range(20):
+            text = make_text(i, words=80)
+            if label == 'ai':
+                text += ' Furthermore, the methodology was evaluated comprehensively.'
+            (root / label / f'{i}.txt').write_text(text, encoding='utf-8')
+
+
+def test_tune_leaves_the_variety_weights_alone_without_sentence_variety(tmp_path, make_text, capsys):
+    write_corpus(tmp_path / 'corpus', make_text)
+    features = tmp_path / 'features.npz'
+    calibrate.main(['extract', str(tmp_path / 'corpus'), '-o', str(features), '--profile', 'web'])
+    weights_path = tmp_path / 'weights.json'
+    calibrate.main(['tune', str(features), '-o', str(weights_path), '--settings', '200', '--objective', 'brier'])
+    report = capsys.readouterr().err
+    assert ' -> ' in report
+    assert 'variety_ratio:' not in report and 'variety_score:' not in report
+    tuned = load_weights(str(weights_path))
+    assert (tuned.variety_ratio, tuned.variety_score) == (Weights().variety_ratio, Weights().variety_score)
+
+    settings = calibrate.sample_settings(50, np.random.default_rng(0), fixed=calibrate.VARIETY_WEIGHTS)
+    assert set(settings['variety_ratio']) == {Weights().variety_ratio}
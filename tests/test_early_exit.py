@@ -0,0 +1,29 @@
+from textdetect import Detector
+
+AI_SENTENCE = ('Furthermore, the methodology demonstrates that the framework was '
+               'comprehensively evaluated and systematically validated. ')
+
+
+def test_clear_cut_text_stops_early_with_the_full_verdict():
+    detector = Detector('web')
+    text = AI_SENTENCE * 200
+    early = detector.analyze_text(text, early_exit=True)
+    full = detector.analyze_text(text)
+    assert early['early_exit']['processed_chars'] < early['early_exit']['total_chars'] == len(text)
+    assert early['prediction'] == full['prediction']
+
+
+def test_fast_results_are_marked_and_cached_apart(client, main):
+    text = AI_SENTENCE * 200
+    fast = client.post('/analyze', json={'text': text, 'fast': True}).get_json()
+    assert 'early_exit' in fast
+    exact = client.post('/analyze', json={'text': text}).get_json()
+    assert 'early_exit' not in exact
+    assert exact['prediction'] == fast['prediction']
+    assert main.result_cache.stats()['size'] == 2
+
+
+def test_bad_fast_values_are_rejected(client):
+    for fast in (40, 101, 'yes'):
+        response = client.post('/analyze', json={'text': AI_SENTENCE * 3, 'fast': fast})
+        assert response.status_code == 400, fast
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from features import extract_features, score_features
+from textdetect import Detector
+
+FILLER = 'the cat sat on a mat while rain fell and we went home to eat bread with jam'.split()
+
+
+def make_texts(detector, count, seed):
+    rng = random.Random(seed)
+    phrases = [phrase for group in ('ai', 'human', 'passive')
+               for phrase, _, _ in detector.matcher.groups[group]]
+    texts = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            # Even sentence lengths and a middling vocabulary fire no rule at all
+            texts.append(' '.join(' '.join(f'w{rng.randrange(100)}' for _ in range(16)) + '.'
+                                  for _ in range(4)))
+            continue
+        sentences = []
+        for _ in range(rng.randint(1, 8)):
+            words = [rng.choice(phrases) if rng.random() < 0.03 else rng.choice(FILLER)
+                     for _ in range(rng.randint(3, 30))]
+            sentences.append(' '.join(words).capitalize() + rng.choice('.!?'))
+        texts.append(' '.join(sentences))
+    return texts
+
+
+def assert_parity(profile):
+    detector = Detector(profile)
+    texts = make_texts(detector, 400, seed=len(profile))
+    matrix, columns = extract_features(texts, detector.matcher)
+    scores = score_features(matrix, columns, detector.profile.sentence_variety,
+                            neutral_label=detector.profile.neutral_label)
+    predictions = set()
+    for i, text in enumerate(texts):
+        verdict = detector.analyze_text(text)
+        predictions.add(verdict['prediction'])
+        assert scores['prediction'][i] == verdict['prediction']
+        assert scores['confidence'][i] == pytest.approx(verdict['confidence'])
+        assert scores['ai_score'][i] == pytest.approx(verdict['ai_score'])
+        assert scores['human_score'][i] == pytest.approx(verdict['human_score'])
+    return predictions
+
+
+def test_score_features_matches_web_profile():
+    assert 'Inconclusive' in assert_parity('web')
+
+
+def test_score_features_matches_pro_profile():
+    assert 'Neutral' in assert_parity('pro')
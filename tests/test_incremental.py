@@ -0,0 +1,62 @@
+from textdetect import Detector, LanguagePacks
+from textdetect.incremental import IncrementalAnalyzer, LiveDocument
+
+SPANISH = ('Creo que el viaje fue muy bonito, pero yo no tenía mucho tiempo para la playa. '
+           'Mi hermana y yo comimos en un restaurante pequeño con mis padres. '
+           'Personalmente, pienso que la comida del pueblo es la mejor de todas. ') * 3
+
+
+def routed_detector():
+    return Detector('web', languages=LanguagePacks(2))
+
+
+def test_open_routes_to_the_language_pack():
+    detector = routed_detector()
+    expected = detector.analyze_text(SPANISH)
+    assert detector.for_text(SPANISH).language == 'es'
+    assert IncrementalAnalyzer(detector).open('doc', SPANISH) == expected
+
+
+def test_patch_follows_the_language_of_the_edited_text():
+    detector = routed_detector()
+    analyzer = IncrementalAnalyzer(detector)
+    english = 'The weather was fine and we walked to the old market by the river. ' * 4
+    analyzer.open('doc', english)
+    result = analyzer.patch('doc', [(0, len(english), SPANISH)])
+    assert result == detector.analyze_text(SPANISH)
+
+
+def test_live_document_routes_to_the_language_pack():
+    detector = routed_detector()
+    live = LiveDocument(detector)
+    live.update('Creo que')
+    assert live.update(SPANISH) == detector.analyze_text(SPANISH)
+
+
+def test_incremental_endpoint_agrees_with_analyze(client):
+    analyzed = client.post('/analyze', json={'text': SPANISH}).get_json()
+    opened = client.post('/analyze/incremental', json={'doc_id': 'es', 'text': SPANISH}).get_json()
+    assert analyzed.get('language') == 'es'
+    assert {**opened, 'doc_id': None} == {**analyzed, 'doc_id': None}
+
+
+def test_bad_patches_are_rejected_without_changing_the_document(client, make_text):
+    text = make_text(5, words=60)
+    opened = client.post('/analyze/incremental', json={'doc_id': 'doc', 'text': text}).get_json()
+    bad = [
+        [{'start': 0}],
+        [{'start': '0', 'end': 1, 'text': 'x'}],
+        [{'start': 0, 'end': 1, 'text': 7}],
+        [{'start': True, 'end': 1, 'text': 'x'}],
+        ['not a patch'],
+        {'start': 0, 'end': 1},
+        # The second range is outside the text the first one leaves
+        [{'start': 0, 'end': 0, 'text': 'Hello. '}, {'start': 0, 'end': len(text) + 100, 'text': ''}],
+    ]
+    for patches in bad:
+        response = client.post('/analyze/incremental', json={'doc_id': 'doc', 'patches': patches})
+        assert response.status_code == 400, patches
+        assert 'error' in response.get_json()
+
+    unchanged = client.post('/analyze/incremental', json={'doc_id': 'doc', 'patches': []}).get_json()
+    assert unchanged == opened
@@ -0,0 +1,50 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from model import LogisticModel, load_model
+from textdetect import Detector, TextStats, compile_lexicon, get_profile, save_lexicon
+
+
+def trained(detector, make_text):
+    stats_list = []
+    for i in range(20):
+        stats = TextStats(detector.matcher)
+        stats.feed(make_text(i, words=60) + (' Furthermore, the framework was validated.' if i % 2 else ''))
+        stats_list.append(stats.finish())
+    model = LogisticModel(10, profile=detector.profile.name, lexicon=detector.matcher.version)
+    return model.fit(stats_list, [i % 2 for i in range(20)], epochs=5)
+
+
+def test_saved_model_keeps_its_profile_and_lexicon(tmp_path, make_text):
+    detector = Detector('web')
+    model = trained(detector, make_text)
+    model.save(str(tmp_path / 'model.npz'))
+    loaded = load_model(str(tmp_path / 'model.npz'))
+    assert (loaded.profile, loaded.lexicon) == ('web', detector.matcher.version)
+    assert loaded.version == model.version
+
+    Detector('web', scorer=loaded)
+    with pytest.raises(ValueError):
+        Detector('pro', scorer=loaded)
+
+
+def test_lexicon_swap_is_refused_under_a_model_for_another_lexicon(tmp_path, make_text):
+    path = tmp_path / 'lexicon.bin'
+    groups = get_profile('web').indicator_groups()
+    matcher = compile_lexicon(groups)
+    save_lexicon(matcher, str(path))
+    detector = Detector('web', str(path), scorer=trained(Detector('web'), make_text))
+
+    other = tmp_path / 'other.bin'
+    save_lexicon(compile_lexicon({**groups, 'ai': {**groups['ai'], 'extra': ['brand new phrase']}}), str(other))
+    with pytest.raises(ValueError):
+        detector.reload_lexicon(str(other))
+    assert detector.matcher.version == matcher.version
+
+
+def test_untagged_model_fits_any_detector(tmp_path, make_text):
+    model = trained(Detector('web'), make_text)
+    model.profile = model.lexicon = None
+    model.save(str(tmp_path / 'model.npz'))
+    Detector('pro', scorer=load_model(str(tmp_path / 'model.npz')))
@@ -0,0 +1,35 @@
+import pytest
+
+
+def test_near_copy_reuses_the_earlier_result(client, main, make_text):
+    text = make_text(1)
+    first = client.post('/analyze', json={'text': text}).get_json()
+    assert 'near_duplicate' not in first
+
+    copy = client.post('/analyze', json={'text': text + ' One more line.'}).get_json()
+    assert copy['near_duplicate']['similarity'] >= 0.9
+    assert copy['prediction'] == first['prediction']
+    # A near-copy's result is never cached under the copy's own key
+    assert main.result_cache.stats()['size'] == 1
+
+
+def test_near_duplicates_false_rescores(client, main, make_text):
+    text = make_text(2)
+    client.post('/analyze', json={'text': text})
+    result = client.post('/analyze', json={'text': text + ' Else.', 'near_duplicates': False}).get_json()
+    assert 'near_duplicate' not in result
+    assert main.near_duplicates.hits == 0
+
+
+def test_native_serve_path_uses_the_near_duplicate_index(main, asgi, make_text):
+    serve = pytest.importorskip('serve')
+    server = serve.AnalyzeServer(serve.ServeConfig(workers=1, use_processes=False))
+    text = make_text(3)
+    status, first = asgi(server, 'POST', '/analyze', {'text': text})
+    assert status == 200 and 'near_duplicate' not in first
+    assert len(main.near_duplicates) == 1
+
+    status, copy = asgi(server, 'POST', '/analyze', {'text': text + ' One more line.'})
+    assert status == 200
+    assert copy['near_duplicate']['similarity'] >= 0.9
+    server.stop()
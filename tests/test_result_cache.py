@@ -0,0 +1,53 @@
+import pytest
+
+from result_cache import ResultCache, SqliteResultCache, cache_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_entries_expire_after_their_ttl(backend, tmp_path):
+    clock = Clock()
+    if backend == 'memory':
+        cache = ResultCache(ttl=10, clock=clock)
+    else:
+        cache = SqliteResultCache(str(tmp_path / 'cache.db'), ttl=10, clock=clock)
+    cache.set('key', {'prediction': 'AI Generated'})
+    clock.now += 9
+    assert cache.get('key') == {'prediction': 'AI Generated'}
+    clock.now += 2
+    assert cache.get('key') is None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_least_recently_used_entry_goes_first():
+    cache = ResultCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1
+
+
+def test_keys_ignore_whitespace_but_not_the_version():
+    assert cache_key('one  two\nthree', 'v1') == cache_key(' one two three ', 'v1')
+    assert cache_key('one two three', 'v1') != cache_key('one two three', 'v2')
+
+
+def test_analyze_is_served_from_the_cache_until_the_version_changes(client, main, make_text, monkeypatch):
+    body = {'text': make_text(1), 'profile': True}
+    first = client.post('/analyze', json=body).get_json()
+    second = client.post('/analyze', json={**body, 'text': '  ' + body['text']}).get_json()
+    assert (first['profile']['cached'], second['profile']['cached']) == (False, True)
+
+    # New scoring rules change the detector version, so the entry is bypassed
+    monkeypatch.setattr(main.detector.profile, 'rules', 'rules-test')
+    third = client.post('/analyze', json=body).get_json()
+    assert third['profile']['cached'] is False
+    assert main.result_cache.stats()['size'] == 2
@@ -0,0 +1,52 @@
+import pytest
+
+serve = pytest.importorskip('serve')
+
+
+@pytest.fixture
+def server(main):
+    server = serve.AnalyzeServer(serve.ServeConfig(workers=1, max_queue=1, per_client_limit=1,
+                                                   max_body_bytes=4096, use_processes=False),
+                                 fallback=serve._flask_fallback())
+    yield server
+    server.stop()
+
+
+def test_analyze_is_served_and_releases_its_slot(server, asgi, make_text):
+    status, result = asgi(server, 'POST', '/analyze', {'text': make_text(1, words=100)})
+    assert status == 200 and 'prediction' in result
+    assert server.active == 0 and not server.per_client
+
+
+def test_oversized_bodies_are_rejected(server, asgi, make_text):
+    pytest.importorskip('asgiref')
+    big = make_text(2, words=2000)
+    for path, body in (('/analyze', {'text': big}), ('/analyze/batch', {'texts': [big]}),
+                       ('/analyze/incremental', {'doc_id': 'doc', 'text': big})):
+        status, result = asgi(server, 'POST', path, body)
+        assert status == 413, path
+    assert server.rejected[413] == 3
+    assert server.active == 0
+
+
+def test_stream_bodies_are_not_capped(server, asgi, make_text):
+    pytest.importorskip('asgiref')
+    status, result = asgi(server, 'POST', '/analyze/stream', make_text(3, words=2000).encode())
+    assert status == 200 and 'prediction' in result
+
+
+def test_per_client_limit_and_capacity(server, asgi, make_text):
+    body = {'text': make_text(4, words=100)}
+    server.active = server.per_client['127.0.0.1'] = 1
+    status, _ = asgi(server, 'POST', '/analyze', body)
+    assert status == 429
+    # Another client still gets the last slot; a full server sheds everyone
+    assert asgi(server, 'POST', '/analyze', body, client=('10.0.0.2', 1))[0] == 200
+    server.active = server.config.capacity
+    assert asgi(server, 'POST', '/analyze', body, client=('10.0.0.3', 1))[0] == 503
+    assert server.rejected[429] == 1 and server.rejected[503] == 1
+
+
+def test_invalid_content_length(server, asgi):
+    status, _ = asgi(server, 'POST', '/analyze', b'{}', headers=[(b'content-length', b'abc')])
+    assert status == 400
@@ -0,0 +1,33 @@
+TEXT = ('Furthermore, the methodology was validated. I think it is kinda cool, honestly. '
+        'Moreover, the framework demonstrates scalability!')
+
+
+def test_spans_point_at_the_matched_phrases(client):
+    result = client.post('/analyze', json={'text': TEXT, 'spans': True}).get_json()
+    spans = result['spans']
+    assert spans['total'] == len(spans['items']) > 0
+    for span in spans['items']:
+        assert TEXT[span['start']:span['end']].lower() == span['phrase']
+    assert result['sentences']['total'] == 3
+    assert [s['start'] for s in result['sentences']['items']] == [0, TEXT.index('I think'), TEXT.index('Moreover')]
+
+
+def test_spans_are_paged(client):
+    full = client.post('/analyze', json={'text': TEXT, 'spans': True}).get_json()['spans']
+    page = client.post('/analyze', json={'text': TEXT, 'spans': {'offset': 1, 'limit': 2}}).get_json()['spans']
+    assert page['items'] == full['items'][1:3]
+    assert page['next_offset'] == (3 if full['total'] > 3 else None)
+
+
+def test_span_results_are_not_cached_and_match_the_plain_verdict(client, main):
+    plain = client.post('/analyze', json={'text': TEXT}).get_json()
+    with_spans = client.post('/analyze', json={'text': TEXT, 'spans': True}).get_json()
+    assert with_spans['prediction'] == plain['prediction']
+    assert with_spans['stats'] == plain['stats']
+    assert main.result_cache.stats()['size'] == 1
+
+
+def test_bad_span_options_are_rejected(client):
+    for spans in ('yes', {'limit': -1}, {'offset': 'x'}):
+        response = client.post('/analyze', json={'text': TEXT, 'spans': spans})
+        assert response.status_code == 400, spans
@@ -0,0 +1,25 @@
+from textdetect import TokenMatcher, tokenize
+
+
+def counts(phrases, text):
+    matcher = TokenMatcher({'ai': {'test': phrases}})
+    return {phrase: count for phrase, count, _ in matcher.find(text.lower())['ai']}
+
+
+def test_phrase_matches_on_word_boundaries():
+    assert counts(['you know', 'i was'], 'You know, I was there. You knowingly went.') == {
+        'you know': 1, 'i was': 1}
+
+
+def test_phrase_split_by_comma_is_not_matched():
+    assert counts(['you know', 'i was'], 'I, was told. Thank you, know-it-all.') == {}
+
+
+def test_phrase_split_by_other_punctuation_is_not_matched():
+    for text in ('I: was', 'I; was', 'I "was"', 'I — was', 'I - was', 'I… was', 'I (was)', 'I. Was'):
+        assert counts(['i was'], text) == {}, text
+
+
+def test_punctuation_tokens_keep_hyphenated_words_and_contractions():
+    assert tokenize("wasn't peer-reviewed, “ok” — fine…") == [
+        "wasn't", 'peer-reviewed', ',', '“', 'ok', '”', '—', 'fine', '…']
@@ -0,0 +1,36 @@
+import pytest
+
+from textdetect import Detector, LanguagePacks, Weights, compile_lexicon, get_profile, save_lexicon
+from textdetect.weights import DEFAULT_WEIGHTS
+
+
+def write_lexicon(path, extra=()):
+    groups = get_profile('web').indicator_groups()
+    groups = {**groups, 'ai': {**groups['ai'], 'extra': list(extra)}}
+    matcher = compile_lexicon(groups)
+    save_lexicon(matcher, str(path))
+    return matcher
+
+
+def test_reload_keeps_lexicon_that_fits_the_weights(tmp_path):
+    path = tmp_path / 'lexicon.bin'
+    matcher = write_lexicon(path)
+    detector = Detector('web', str(path), weights=Weights('web', matcher.version, indicator=3))
+
+    other = tmp_path / 'other.bin'
+    write_lexicon(other, ['brand new phrase'])
+    with pytest.raises(ValueError):
+        detector.reload_lexicon(str(other))
+    assert detector.matcher.version == matcher.version
+
+    write_lexicon(path, ['brand new phrase'])
+    with pytest.raises(ValueError):
+        detector.refresh_lexicon()
+    assert detector.matcher.version == matcher.version
+
+
+def test_language_pack_copies_use_default_weights():
+    weights = Weights('web', indicator=3)
+    detector = Detector('web', weights=weights, languages=LanguagePacks(2))
+    assert detector.for_language('en').weights is weights
+    assert detector.for_language('es').weights is DEFAULT_WEIGHTS
@@ -0,0 +1,16 @@
+"""Detection engine shared by the Flask API (main.py) and the desktop app (SourceCode.py).
+
+Only the standard library is imported, so the engine loads quickly in
+workers and command line tools.
+
+    from textdetect import Detector
+    result = Detector('pro').analyze_text(text)
+"""
+from .engine import Detector, compiled_lexicon
+from .languages import LanguagePacks, identify
+from .lexicon import compile_lexicon, load_lexicon, save_lexicon
+from .profiles import PROFILES, Profile, get_profile
+from .spans import SpanRecorder
+from .text_stats import TextStats, add_time
+from .token_index import TokenMatcher, tokenize
+from .weights import Weights, load_weights
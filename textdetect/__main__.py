@@ -0,0 +1,5 @@
+import sys
+
+from .lexicon import main
+
+sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,454 @@
+import copy
+import itertools
+import threading
+import time
+
+from .languages import identify
+from .lexicon import compile_lexicon, lexicon_stamp, load_lexicon
+from .profiles import get_profile
+from .spans import SpanRecorder, page
+from .text_stats import CHUNK_SIZE, TextStats, add_time, iter_chunks, read_pieces
+from .weights import DEFAULT_WEIGHTS
+
+# Rule verdicts whose scores differ by less than this share of their total are close calls
+MODEL_MARGIN = 0.2
+# Early exit: first piece size (doubled after every piece), default confidence
+# target, and the text read before the confidence target is trusted
+EARLY_EXIT_STEP = 256
+EARLY_EXIT_CONFIDENCE = 90
+EARLY_EXIT_MIN_CHARS = 1000
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def compiled_lexicon(profile):
+    """The compiled matcher of a profile, shared by every detector using it"""
+    profile = get_profile(profile)
+    with _compiled_lock:
+        matcher = _compiled.get(profile)
+        if matcher is None:
+            matcher = _compiled[profile] = compile_lexicon(profile.indicator_groups())
+        return matcher
+
+
+class Detector:
+    """Rule-based AI vs human text detector for one profile
+
+    An optional `scorer` settles close calls: any object with a `version` and
+    a `predict_proba(stats_list)` returning the probability that each finished
+    TextStats is AI generated (see model.py). The rules stay the first stage;
+    the scorer only sees documents whose rule verdict is inconclusive or
+    within `margin`. A scorer with a `check(profile, lexicon)` method (see
+    model.py) is checked like the weights below.
+
+    `weights` (see weights.py) replaces the default weights and thresholds of
+    the scoring rules, e.g. with a setting tuned by calibrate.py; weights
+    tuned for another profile or lexicon raise ValueError.
+    """
+
+    def __init__(self, profile='web', lexicon_path=None, scorer=None, margin=MODEL_MARGIN, languages=None,
+                 weights=None):
+        self.profile = get_profile(profile)
+        self.weights = weights or DEFAULT_WEIGHTS
+        # With LanguagePacks, texts in another language are scored with their pack's lexicon
+        self.languages = languages
+        self.language = self.profile.language
+        self._routed = {}
+        # A precompiled lexicon (see lexicon.py) skips compiling the profile's tables
+        self.lexicon_path = lexicon_path
+        self._lexicon_stamp = None
+        self._reload_lock = threading.Lock()
+        if lexicon_path:
+            self._lexicon_stamp = lexicon_stamp(lexicon_path)
+            self.matcher = load_lexicon(lexicon_path)
+        else:
+            self.matcher = compiled_lexicon(self.profile)
+        self.scorer = scorer
+        self._check(self.matcher)
+        self.margin = margin
+        self._exit_bounds = None
+
+    @property
+    def version(self):
+        # The profile's rules id changes whenever the scoring rules change, so
+        # that persisted cache entries computed by the old rules are never reused
+        version = f'{self.profile.rules}:{self.matcher.version}'
+        if not self.weights.is_default:
+            version += f':{self.weights.version}'
+        if self.scorer is not None:
+            version += f':{self.scorer.version}'
+        return version
+
+    def indicator_groups(self):
+        return self.profile.indicator_groups()
+
+    def _check(self, matcher):
+        """Raise ValueError unless the weights and the scorer fit this profile and `matcher`"""
+        self.weights.check(self.profile.name, matcher.version)
+        if hasattr(self.scorer, 'check'):
+            self.scorer.check(self.profile.name, matcher.version)
+
+    def reload_lexicon(self, path):
+        """Swap in a compiled lexicon; analyses already running finish with the old one
+
+        Raises ValueError, keeping the old lexicon, if the weights or the
+        scorer were tuned for another lexicon.
+        """
+        stamp = lexicon_stamp(path)
+        matcher = load_lexicon(path)
+        self._check(matcher)
+        self.matcher = matcher
+        if path == self.lexicon_path:
+            self._lexicon_stamp = stamp
+
+    def refresh_lexicon(self):
+        """Reload the lexicon if its file was replaced since it was loaded; True if it was
+
+        save_lexicon replaces the file atomically, so every process watching
+        the same path (e.g. the workers of a pre-forking server) switches to
+        the new version at its next call, at the cost of one stat() per call.
+        Like reload_lexicon, it raises ValueError and keeps the old lexicon if
+        the weights or the scorer were tuned for another one.
+        """
+        if not self.lexicon_path:
+            return False
+        stamp = lexicon_stamp(self.lexicon_path)
+        if stamp == self._lexicon_stamp:
+            return False
+        with self._reload_lock:
+            if stamp == self._lexicon_stamp:
+                return False
+            # A file replaced again since the stat is loaded now and, harmlessly, once more next call
+            matcher = load_lexicon(self.lexicon_path)
+            self._check(matcher)
+            self.matcher = matcher
+            self._lexicon_stamp = stamp
+        return True
+
+    def for_text(self, text, timings=None):
+        """The detector for the language of `text` (see for_language)"""
+        if self.languages is None:
+            return self
+        start = time.perf_counter()
+        language = identify(text, self.languages.languages | {self.language}, self.language)
+        add_time(timings, 'language', time.perf_counter() - start)
+        return self.for_language(language)
+
+    def for_language(self, language):
+        """A detector with these rules and the lexicon of `language`, falling back to this one's
+
+        Without language packs this is the detector itself. Otherwise it is a
+        copy that does not identify languages again; only the copy for this
+        detector's own language keeps the scorer and the weights, which were
+        trained on it; the others score with the default weights.
+        """
+        if self.languages is None:
+            return self
+        if language not in self.languages.languages:
+            language = self.language
+        matcher = self.matcher if language == self.language else self.languages.get(language)
+        detector = self._routed.get(language)
+        if detector is None or detector.matcher is not matcher:
+            detector = copy.copy(self)
+            detector.languages = None
+            detector.language = language
+            detector.matcher = matcher
+            # Only this detector follows the lexicon file
+            detector.lexicon_path = None
+            detector._routed = {}
+            if language != self.language:
+                detector.scorer = None
+                detector.weights = DEFAULT_WEIGHTS
+            # Copies of evicted packs go too, so their tables can be freed
+            loaded = set(self.languages.loaded())
+            self._routed = {other: routed for other, routed in self._routed.items()
+                            if other == self.language or other in loaded}
+            self._routed[language] = detector
+        return detector
+
+    def analyze_text(self, text, timings=None, spans=None, early_exit=None):
+        """Analyze text for AI vs Human indicators
+
+        Pass a dict as `timings` to get the seconds spent in each stage. Pass
+        `spans` (True, or a SpanRecorder for another page) to also get the
+        character offsets of every indicator and a score for every sentence.
+        `early_exit` (True, or a confidence target) opts into analyze_early.
+        """
+        if self.languages is not None:
+            return self.for_text(text, timings).analyze_text(text, timings, spans, early_exit)
+        if early_exit:
+            target = EARLY_EXIT_CONFIDENCE if early_exit is True else early_exit
+            return self.analyze_early(text, target, timings)
+        stats = TextStats(self.matcher, timings, _recorder(spans))
+        stats.feed(text)
+        return self.timed_score(stats.finish(), timings)
+
+    def analyze_early(self, text, target=EARLY_EXIT_CONFIDENCE, timings=None):
+        """Analyze text progressively, stopping as soon as the verdict is settled
+
+        The text is fed in doubling pieces. After each one, analysis stops if
+        the rest of the text cannot overturn the prediction under the scoring
+        rules, or if EARLY_EXIT_MIN_CHARS have been read and the confidence
+        so far reaches `target`. Such results carry 'early_exit': {reason,
+        processed_chars, total_chars} and statistics of the processed part
+        only; analyze_text gives the exact result.
+        """
+        stats = TextStats(self.matcher, timings)
+        size = len(text)
+        position = 0
+        step = EARLY_EXIT_STEP
+        reason = None
+        while position < size and reason is None:
+            cut = min(position + step, size)
+            # Pieces end on whitespace so that no word is cut in half
+            while cut < size and not text[cut].isspace():
+                cut += 1
+            stats.feed(text[position:cut])
+            position = cut
+            step *= 2
+            if position < size:
+                reason = self._settled(stats, size - position, target)
+
+        result = self.timed_score(stats.finish(), timings)
+        if reason is not None:
+            result['early_exit'] = {'reason': reason, 'processed_chars': position, 'total_chars': size}
+        return result
+
+    def _settled(self, stats, remaining, target):
+        """Why the verdict of a partly fed document is final ('bound' or 'confidence'), or None"""
+        bounds = self._exit_bounds
+        if bounds is None or bounds.matcher is not self.matcher or bounds.weights is not self.weights:
+            bounds = self._exit_bounds = ExitBounds(self.matcher, self.profile, self.weights)
+        ai_score, human_score = bounds.scores(stats.counts)
+        if ai_score > human_score + bounds.human_gain(remaining):
+            return 'bound'
+        if human_score >= ai_score + bounds.ai_gain(remaining):
+            return 'bound'
+        if stats.char_count >= EARLY_EXIT_MIN_CHARS:
+            verdict = self.evaluate(stats)
+            if verdict['confidence'] >= target and verdict['prediction'] != self.profile.neutral_label:
+                return 'confidence'
+        return None
+
+    def analyze_stream(self, stream, chunk_size=CHUNK_SIZE, timings=None, spans=None):
+        """Analyze a file-like object (or iterable of str/bytes chunks) in bounded memory"""
+        chunks = iter_chunks(stream, chunk_size) if hasattr(stream, 'read') else stream
+        pieces = read_pieces(chunks)
+        if self.languages is not None:
+            # The language is told by the first piece
+            first = next(pieces, '')
+            detector = self.for_text(first, timings)
+            return detector.analyze_stream(itertools.chain([first], pieces), chunk_size, timings, spans)
+        stats = TextStats(self.matcher, timings, _recorder(spans))
+        for piece in pieces:
+            stats.feed(piece)
+        return self.timed_score(stats.finish(), timings)
+
+    def analyze_batch(self, texts, timings=None):
+        """analyze_text for many texts, with one batched scorer call for all their close calls"""
+        if self.languages is not None:
+            by_detector = {}
+            for i, text in enumerate(texts):
+                by_detector.setdefault(self.for_text(text, timings), []).append(i)
+            results = [None] * len(texts)
+            for detector, indexes in by_detector.items():
+                for i, result in zip(indexes, detector.analyze_batch([texts[i] for i in indexes], timings)):
+                    results[i] = result
+            return results
+        batch = []
+        for text in texts:
+            stats = TextStats(self.matcher, timings)
+            stats.feed(text)
+            batch.append(stats.finish())
+        if self.scorer is not None:
+            self.refine(batch, timings)
+        return [self._timed_score(stats, timings) for stats in batch]
+
+    def refine(self, batch, timings=None):
+        """Ask the scorer about the finished TextStats whose rule verdict is a close call"""
+        start = time.perf_counter()
+        close = []
+        for stats in batch:
+            stats.model_probability = None
+            verdict = self.evaluate(stats)
+            ai_score = verdict['ai_score']
+            human_score = verdict['human_score']
+            if abs(ai_score - human_score) <= self.margin * (ai_score + human_score):
+                close.append(stats)
+        if close:
+            for stats, probability in zip(close, self.scorer.predict_proba(close)):
+                stats.model_probability = float(probability)
+        add_time(timings, 'model', time.perf_counter() - start)
+
+    def timed_score(self, stats, timings=None):
+        if self.scorer is not None:
+            self.refine([stats], timings)
+        return self._timed_score(stats, timings)
+
+    def _timed_score(self, stats, timings):
+        start = time.perf_counter()
+        result = self.score(stats)
+        if stats.spans is not None:
+            result.update(self.attribution(stats.spans))
+        add_time(timings, 'verdict', time.perf_counter() - start)
+        return result
+
+    def attribution(self, recorder):
+        """Pages of indicator spans and of per-sentence scores from a finished SpanRecorder"""
+        weights = self.weights
+        sentences = []
+        for start, end, counts in recorder.sentences:
+            sentences.append({
+                'start': start,
+                'end': end,
+                'ai_score': (counts.get('ai', 0) * weights.indicator
+                             + counts.get('passive', 0) * weights.passive),
+                'human_score': counts.get('human', 0) * weights.indicator
+            })
+        return {
+            'spans': page(recorder.spans, recorder.span_total, recorder.offset, recorder.limit),
+            'sentences': page(sentences, recorder.sentence_total, recorder.sentence_offset,
+                              recorder.sentence_limit)
+        }
+
+    def score(self, stats):
+        """Result of a finished TextStats; front ends override this to format it"""
+        return self.evaluate(stats)
+
+    def evaluate(self, stats):
+        """Apply the profile's scoring rules to the running totals of a document"""
+        profile = self.profile
+        weights = self.weights
+        ai_score = 0
+        human_score = 0
+
+        # Every indicator and passive marker was counted while the text was fed
+        # (counts are summed before weighting, as calibrate.py replays them)
+        matches = stats.matches()
+        ai_score += sum(count for _, count, _ in matches['ai']) * weights.indicator
+        human_score += sum(count for _, count, _ in matches['human']) * weights.indicator
+
+        # AI tends to have longer, more structured sentences
+        avg_sentence_length = stats.sentence_words / max(stats.sentence_count, 1)
+        if avg_sentence_length > weights.long_sentence_words:
+            ai_score += weights.long_sentence_score
+        elif avg_sentence_length < weights.short_sentence_words:
+            human_score += weights.short_sentence_score
+
+        # Passive voice is more common in AI text
+        passive_count = sum(count for _, count, _ in matches['passive'])
+        ai_score += passive_count * weights.passive
+
+        # Varied sentence structure is more human
+        if (profile.sentence_variety
+                and len(stats.sentence_lengths) > stats.sentence_count * weights.variety_ratio):
+            human_score += weights.variety_score
+
+        # Very high vocabulary diversity can indicate AI, repetition is more human
+        vocab_ratio = len(stats.vocab) / max(stats.word_count, 1)
+        if vocab_ratio > weights.high_vocab_ratio:
+            ai_score += weights.high_vocab_score
+        elif vocab_ratio < weights.low_vocab_ratio:
+            human_score += weights.low_vocab_score
+
+        total_score = ai_score + human_score
+        probability = stats.model_probability
+        if probability is not None:
+            # A close call settled by the scorer (see refine)
+            confidence = max(probability, 1 - probability) * 100
+            prediction = "AI Generated" if probability >= 0.5 else "Human Written"
+        elif total_score == 0:
+            confidence = 50
+            prediction = profile.neutral_label
+        elif ai_score > human_score:
+            confidence = min((ai_score / total_score) * 100, weights.confidence_cap)
+            prediction = "AI Generated"
+        else:
+            confidence = min((human_score / total_score) * 100, weights.confidence_cap)
+            prediction = "Human Written"
+
+        return {
+            'prediction': prediction,
+            'confidence': confidence,
+            'ai_score': ai_score,
+            'human_score': human_score,
+            'matches': matches,
+            'passive_count': passive_count,
+            'avg_sentence_length': avg_sentence_length,
+            'vocab_ratio': vocab_ratio,
+            'word_count': stats.word_count,
+            'char_count': stats.char_count,
+            'sentence_count': stats.sentence_count,
+            'model_probability': probability
+        }
+
+
+def _recorder(spans):
+    if spans is True:
+        return SpanRecorder()
+    return spans or None
+
+
+class ExitBounds:
+    """The most score the unread rest of a document can still add, per side
+
+    A match is counted at its last token, and only one sequence of each
+    length can end at a token, so a position adds at most the sum over
+    lengths of the heaviest sequence of that length. Positions are at least
+    one separator plus the shortest possible last token apart.
+    """
+
+    def __init__(self, matcher, profile, weights=DEFAULT_WEIGHTS):
+        self.matcher = matcher
+        self.weights = weights
+        self.ai_weights = [0.0] * len(matcher.sequences)
+        self.human_weights = [0.0] * len(matcher.sequences)
+        for group, entries in matcher.groups.items():
+            for _, _, sid in entries:
+                if group == 'ai':
+                    self.ai_weights[sid] += weights.indicator
+                elif group == 'human':
+                    self.human_weights[sid] += weights.indicator
+                elif group == 'passive':
+                    self.ai_weights[sid] += weights.passive
+        self.ai_position = self._position_bound(self.ai_weights)
+        self.human_position = self._position_bound(self.human_weights)
+        # evaluate()'s sentence-length and vocabulary rules, plus sentence variety
+        self.ai_rules = weights.long_sentence_score + weights.high_vocab_score
+        self.human_rules = (weights.short_sentence_score + weights.low_vocab_score
+                            + (weights.variety_score if profile.sentence_variety else 0))
+
+    def _position_bound(self, weights):
+        heaviest = {}
+        shortest = None
+        for sid, sequence in enumerate(self.matcher.sequences):
+            if weights[sid] and sequence:
+                length = len(sequence)
+                heaviest[length] = max(heaviest.get(length, 0), weights[sid])
+                last = len(sequence[-1])
+                shortest = last if shortest is None else min(shortest, last)
+        return sum(heaviest.values()), shortest or 1
+
+    def scores(self, counts):
+        """Indicator and passive scores of the counts so far (without the statistics rules)"""
+        ai_score = 0.0
+        human_score = 0.0
+        ai_weights = self.ai_weights
+        human_weights = self.human_weights
+        for sid, count in enumerate(counts):
+            if count:
+                ai_score += count * ai_weights[sid]
+                human_score += count * human_weights[sid]
+        return ai_score, human_score
+
+    @staticmethod
+    def _gain(position, remaining):
+        weight, spacing = position
+        return (remaining // (spacing + 1) + 1) * weight
+
+    def ai_gain(self, remaining):
+        return self._gain(self.ai_position, remaining) + self.ai_rules
+
+    def human_gain(self, remaining):
+        return self._gain(self.human_position, remaining) + self.human_rules
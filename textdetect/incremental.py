@@ -0,0 +1,225 @@
+import bisect
+import itertools
+import threading
+from collections import OrderedDict
+
+from .languages import SAMPLE_CHARS
+from .sentences import ends_sentence, sentence_ends
+from .text_stats import TextStats
+
+# A block may only end right after a word that ends a sentence with a '.',
+# '!' or '?' (all tokens, unlike '…'), followed by whitespace. Words, sentences
+# and phrases never cross such a point, so every block can be scored on its
+# own and its totals added to (or removed from) the document's.
+BLOCK_TERMINATORS = '.!?'
+
+
+def split_blocks(text, target_size=1024):
+    """Split text into blocks of roughly `target_size` characters at block ends"""
+    blocks = []
+    start = 0
+    for end in sentence_ends(text):
+        if end - start >= target_size and text[end - 1] in BLOCK_TERMINATORS:
+            blocks.append(text[start:end])
+            start = end
+    if start < len(text) or not blocks:
+        blocks.append(text[start:])
+    return blocks
+
+
+def ends_block(text):
+    """Whether `text` ends where a block may end (if whitespace follows)"""
+    if text[-1:] not in BLOCK_TERMINATORS:
+        return False
+    start = len(text)
+    while start and not text[start - 1].isspace():
+        start -= 1
+    return ends_sentence(text[start:])
+
+
+class Document:
+    """Per-block partial totals for one document, kept up to date under edits"""
+
+    def __init__(self, matcher, text, target_size=1024, detector=None):
+        self.matcher = matcher
+        # The detector scoring the document, routed to its language (see Detector.for_text)
+        self.detector = detector
+        self.target_size = target_size
+        self.blocks = []
+        self.block_stats = []
+        self.total = TextStats(matcher)
+        self.lock = threading.Lock()
+        self._insert(0, split_blocks(text, target_size))
+
+    @property
+    def text(self):
+        return ''.join(self.blocks)
+
+    def head(self, size=SAMPLE_CHARS):
+        """At least the first `size` characters of the text, without joining every block"""
+        parts = []
+        length = 0
+        for block in self.blocks:
+            if length >= size:
+                break
+            parts.append(block)
+            length += len(block)
+        return ''.join(parts)
+
+    def _score_block(self, block):
+        stats = TextStats(self.matcher)
+        stats.feed(block)
+        return stats.finish()
+
+    def _insert(self, position, blocks):
+        new_stats = [self._score_block(block) for block in blocks]
+        self.blocks[position:position] = blocks
+        self.block_stats[position:position] = new_stats
+        for stats in new_stats:
+            self.total.add(stats)
+
+    def _remove(self, first, last):
+        for stats in self.block_stats[first:last]:
+            self.total.subtract(stats)
+        removed = ''.join(self.blocks[first:last])
+        del self.blocks[first:last]
+        del self.block_stats[first:last]
+        return removed
+
+    def patch(self, start, end, replacement):
+        """Replace text[start:end] and rescore only the blocks the edit touches"""
+        starts = [0] + list(itertools.accumulate(len(block) for block in self.blocks))
+        size = starts[-1]
+        if not 0 <= start <= end <= size:
+            raise ValueError(f'Patch range {start}:{end} is outside the document (length {size})')
+
+        def block_at(offset):
+            return min(bisect.bisect_right(starts, offset) - 1, len(self.blocks) - 1)
+
+        # The character before the edit is included because changing what
+        # follows a '.' can turn a block end into an ordinary position
+        first = block_at(max(start - 1, 0))
+        last = max(block_at(max(end - 1, 0)), first)
+        region_start = starts[first]
+        old = self._remove(first, last + 1)
+        region = (old[:start - region_start] + replacement + old[end - region_start:])
+
+        # If the edit removed the block end, the region runs into the next block
+        while region and first < len(self.blocks) and not ends_block(region):
+            region += self._remove(first, first + 1)
+
+        if region or not self.blocks:
+            self._insert(first, split_blocks(region, self.target_size))
+
+
+def text_patch(old, new):
+    """The single (start, end, replacement) patch that turns `old` into `new`.
+
+    The common prefix and suffix are found by binary search over slice
+    comparisons, which run at memcmp speed even for large documents.
+    """
+    limit = min(len(old), len(new))
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[:mid] == new[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    prefix = low
+
+    low, high = 0, limit - prefix
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            low = mid
+        else:
+            high = mid - 1
+    suffix = low
+    return prefix, len(old) - suffix, new[prefix:len(new) - suffix]
+
+
+class LiveDocument:
+    """Rescores a text that is being edited, given only its successive versions"""
+
+    def __init__(self, detector, target_size=1024):
+        self.detector = detector
+        self.target_size = target_size
+        self.document = None
+        self.text = ''
+        self.result = None
+
+    def update(self, text):
+        """Score the new version of the text, rescoring only the blocks that changed"""
+        document = self.document
+        detector = self.detector.for_text(text)
+        if document is None or document.detector is not detector or document.matcher is not detector.matcher:
+            # New, in another language, or the lexicon was swapped
+            document = self.document = Document(detector.matcher, text, self.target_size, detector)
+        elif text != self.text:
+            document.patch(*text_patch(self.text, text))
+        elif self.result is not None:
+            return self.result
+        self.text = text
+        self.result = detector.timed_score(document.total)
+        return self.result
+
+
+class IncrementalAnalyzer:
+    """Keeps a bounded number of open documents and rescores them by edit"""
+
+    def __init__(self, detector, max_documents=256, target_size=1024):
+        self.detector = detector
+        self.max_documents = max_documents
+        self.target_size = target_size
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, doc_id, text):
+        """Start (or restart) tracking a document and return its full result"""
+        detector = self.detector.for_text(text)
+        document = Document(detector.matcher, text, self.target_size, detector)
+        with self._lock:
+            self._documents[doc_id] = document
+            self._documents.move_to_end(doc_id)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+        return detector.timed_score(document.total)
+
+    def patch(self, doc_id, patches):
+        """Apply [(start, end, replacement), ...] in order and return the new result
+
+        Every range is checked, against the document as the patches before it
+        leave it, before any is applied: a bad patch raises ValueError and
+        leaves the document unchanged.
+        """
+        with self._lock:
+            document = self._documents.get(doc_id)
+            if document is None:
+                raise KeyError(doc_id)
+            self._documents.move_to_end(doc_id)
+        with document.lock:
+            size = sum(len(block) for block in document.blocks)
+            for start, end, replacement in patches:
+                if not 0 <= start <= end <= size:
+                    raise ValueError(f'Patch range {start}:{end} is outside the document (length {size})')
+                size += len(replacement) - (end - start)
+            for start, end, replacement in patches:
+                document.patch(start, end, replacement)
+            # The edits may have changed the language, or the lexicon was swapped since
+            detector = self.detector.for_text(document.head())
+            if document.detector is not detector or document.matcher is not detector.matcher:
+                document = Document(detector.matcher, document.text, self.target_size, detector)
+                with self._lock:
+                    self._documents[doc_id] = document
+            return detector.timed_score(document.total)
+
+    def close(self, doc_id):
+        with self._lock:
+            self._documents.pop(doc_id, None)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._documents
+
+    def __len__(self):
+        return len(self._documents)
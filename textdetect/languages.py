@@ -0,0 +1,121 @@
+"""Language identification and lazily loaded language packs.
+
+A language pack is a lexicon JSON file named after its language (packs/es.json,
+in the format `python -m textdetect compile` reads) whose categories are
+those of the English lexicon. Only the packs that texts actually need are
+compiled, on first use, and the least recently used ones are dropped.
+
+Identification counts the most frequent function words of each language in
+the beginning of the text: a dictionary lookup per token, with no model to
+load, which separates these languages reliably from a few dozen words on.
+Words that are also everyday English ("no", "die", "plus") are not counted,
+and a text only leaves its default language when another one clearly
+outnumbers it, so English text quoting a few foreign words stays English.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from .lexicon import compile_lexicon
+from .token_index import tokenize
+
+PACKS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'packs')
+# Characters read to identify the language, and the function words needed to trust it
+SAMPLE_CHARS = 2000
+MIN_HITS = 3
+# How many times the default language's hits another language needs to replace it
+MARGIN = 2
+
+FUNCTION_WORDS = {
+    'en': ['the', 'and', 'of', 'to', 'is', 'that', 'it', 'was', 'for', 'with', 'this', 'are', 'be',
+           'have', 'not', 'on', 'but', 'you', 'they', 'which', 'from', 'at', 'by', 'would', 'there',
+           'their', 'what', 'been', 'has', 'were', 'will', 'can', 'i', 'we', 'he', 'she', 'or'],
+    'es': ['el', 'la', 'los', 'las', 'de', 'que', 'y', 'en', 'un', 'una', 'es', 'por', 'con', 'para',
+           'se', 'del', 'al', 'lo', 'como', 'más', 'pero', 'sus', 'su', 'le', 'ya', 'este',
+           'esta', 'está', 'muy', 'también', 'fue', 'porque', 'cuando', 'yo'],
+    'de': ['der', 'das', 'und', 'ist', 'nicht', 'ein', 'eine', 'ich', 'zu', 'von', 'mit',
+           'sich', 'des', 'auf', 'für', 'dem', 'auch', 'es', 'werden', 'aus',
+           'dass', 'sie', 'nach', 'wird', 'bei', 'noch', 'wie', 'einem', 'einer', 'sind', 'oder'],
+    'fr': ['le', 'la', 'les', 'de', 'des', 'et', 'est', 'un', 'une', 'que', 'qui', 'dans', 'en', 'du',
+           'pas', 'sur', 'au', 'avec', 'ce', 'il', 'elle', 'sont', 'ne', 'se',
+           'mais', 'ou', 'nous', 'vous', 'aux', 'cette', 'je', 'été', "c'est", "n'est"]
+}
+
+
+def _index_words(profiles):
+    """Word -> the languages it is a function word of"""
+    index = {}
+    for language, words in profiles.items():
+        for word in words:
+            index.setdefault(word, []).append(language)
+    return index
+
+
+_word_languages = _index_words(FUNCTION_WORDS)
+
+
+def identify(text, languages=None, default='en'):
+    """The language of `text` among `languages` (default: every profiled one), or None if unclear
+
+    Another language than `default` needs MARGIN times the function words of
+    `default` to be chosen.
+    """
+    counts = dict.fromkeys(FUNCTION_WORDS if languages is None else languages, 0)
+    for token in tokenize(text[:SAMPLE_CHARS].lower()):
+        for language in _word_languages.get(token, ()):
+            if language in counts:
+                counts[language] += 1
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    if not ranked or ranked[0][1] < MIN_HITS or (len(ranked) > 1 and ranked[0][1] == ranked[1][1]):
+        return None
+    language, hits = ranked[0]
+    if language != default and hits < MARGIN * counts.get(default, 0):
+        return None
+    return language
+
+
+class LanguagePacks:
+    """The language packs in `directory`, compiled on first use; at most `max_packs` stay loaded"""
+
+    def __init__(self, max_packs=4, directory=PACKS_DIRECTORY):
+        self.max_packs = max_packs
+        self.directory = directory
+        self.languages = frozenset(name[:-len('.json')] for name in os.listdir(directory)
+                                   if name.endswith('.json'))
+        self.loads = 0
+        self.evictions = 0
+        self._matchers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, language):
+        """The compiled matcher of a language's pack"""
+        if language not in self.languages:
+            raise ValueError(f'No language pack for {language!r}, expected one of {sorted(self.languages)}')
+        with self._lock:
+            matcher = self._matchers.get(language)
+            if matcher is None:
+                with open(os.path.join(self.directory, f'{language}.json'), encoding='utf-8') as f:
+                    matcher = compile_lexicon(json.load(f))
+                self._matchers[language] = matcher
+                self.loads += 1
+                while len(self._matchers) > self.max_packs:
+                    self._matchers.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._matchers.move_to_end(language)
+            return matcher
+
+    def loaded(self):
+        """Languages whose pack is compiled, least recently used first"""
+        with self._lock:
+            return list(self._matchers)
+
+    def stats(self):
+        return {
+            'available': sorted(self.languages),
+            'loaded': self.loaded(),
+            'max_packs': self.max_packs,
+            'loads': self.loads,
+            'evictions': self.evictions
+        }
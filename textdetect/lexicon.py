@@ -0,0 +1,179 @@
+"""Lexicon compiler: dedupe the indicator dictionaries and save the compiled matcher.
+
+The artifact is a small binary file made of fixed-layout little-endian uint32
+tables followed by a UTF-8 string blob, so it can be memory-mapped and turned
+back into a ready-to-use TokenMatcher without tokenizing a single phrase.
+The mapping is only read while loading: every process builds its own
+matcher from it and releases it. Files are replaced atomically, so one file
+can serve every worker of a server, and Detector.refresh_lexicon picks up a
+recompiled version in each.
+
+    python -m textdetect compile web lexicon.bin      # built-in Flask lexicon
+    python -m textdetect compile pro lexicon.bin      # built-in desktop lexicon
+    python -m textdetect compile custom.json lexicon.bin
+    python -m textdetect info lexicon.bin
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .token_index import TokenMatcher, tokenize
+
+MAGIC = b'AITDLEX\0'
+FORMAT_VERSION = 1
+# magic, format version, matcher version, strings, sequences, sequence tokens, entries
+HEADER = struct.Struct('<8sI16sIIII')
+
+
+def normalize_phrase(phrase):
+    return ' '.join(phrase.lower().replace('’', "'").split())
+
+
+def normalize_lexicon(groups):
+    """Normalize every phrase and keep only its first listing within each group.
+
+    A phrase listed twice in a group (even under two categories) used to be
+    counted twice; after normalization it is counted once, under the first
+    category it appears in.
+    """
+    normalized = {}
+    for group, categories in groups.items():
+        seen = set()
+        result = normalized[group] = {}
+        for category, phrases in categories.items():
+            kept = result[category] = []
+            for phrase in phrases:
+                phrase = normalize_phrase(phrase)
+                key = tuple(tokenize(phrase))
+                if key and key not in seen:
+                    seen.add(key)
+                    kept.append(phrase)
+    return normalized
+
+
+def compile_lexicon(groups):
+    """Build a TokenMatcher from raw {group: {category: [phrase, ...]}} dictionaries"""
+    return TokenMatcher(normalize_lexicon(groups))
+
+
+def save_lexicon(matcher, path):
+    """Write a compiled matcher to `path` atomically"""
+    strings = []
+    string_ids = {}
+
+    def intern(value):
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    seq_offsets = array('I', [0])
+    seq_tokens = array('I')
+    for sequence in matcher.sequences:
+        seq_tokens.extend(intern(token) for token in sequence)
+        seq_offsets.append(len(seq_tokens))
+
+    entries = array('I')
+    for group, group_entries in matcher.groups.items():
+        for phrase, category, sid in group_entries:
+            entries.extend((intern(group), intern(category), intern(phrase), sid))
+
+    encoded = [s.encode('utf-8') for s in strings]
+    string_offsets = array('I', [0])
+    for data in encoded:
+        string_offsets.append(string_offsets[-1] + len(data))
+
+    tables = [string_offsets, seq_offsets, seq_tokens, entries]
+    if sys.byteorder != 'little':
+        for table in tables:
+            table.byteswap()
+
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, matcher.version.encode('ascii'),
+                            len(strings), len(matcher.sequences), len(seq_tokens),
+                            len(entries) // 4))
+        for table in tables:
+            f.write(table.tobytes())
+        f.write(b''.join(encoded))
+    # Readers either see the old file or the complete new one
+    os.replace(tmp_path, path)
+
+
+def _read_tables(buffer):
+    magic, fmt, version, n_strings, n_sequences, n_seq_tokens, n_entries = \
+        HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or fmt != FORMAT_VERSION:
+        raise ValueError('Not a compiled lexicon (or an unsupported format version)')
+
+    offset = HEADER.size
+    tables = []
+    for length in (n_strings + 1, n_sequences + 1, n_seq_tokens, n_entries * 4):
+        table = memoryview(buffer)[offset:offset + length * 4]
+        if sys.byteorder == 'little':
+            table = table.cast('I')
+        else:
+            table = array('I', table)
+            table.byteswap()
+        tables.append(table)
+        offset += length * 4
+    return version.decode('ascii'), tables, offset
+
+
+def load_lexicon(path):
+    """Load a compiled lexicon written by save_lexicon into a TokenMatcher"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        version, tables, blob_start = _read_tables(buffer)
+        string_offsets, seq_offsets, seq_tokens, entries = tables
+        blob = buffer[blob_start:blob_start + string_offsets[-1]]
+        strings = [blob[string_offsets[i]:string_offsets[i + 1]].decode('utf-8')
+                   for i in range(len(string_offsets) - 1)]
+
+        sequences = [tuple(strings[t] for t in seq_tokens[seq_offsets[i]:seq_offsets[i + 1]])
+                     for i in range(len(seq_offsets) - 1)]
+        groups = {}
+        for i in range(0, len(entries), 4):
+            group, category, phrase, sid = entries[i:i + 4]
+            groups.setdefault(strings[group], []).append((strings[phrase], strings[category], sid))
+
+        for table in tables:
+            if isinstance(table, memoryview):
+                table.release()
+    return TokenMatcher.from_compiled(version, groups, sequences)
+
+
+def lexicon_stamp(path):
+    """Identifies the file now at `path`; changes whenever save_lexicon replaces it"""
+    st = os.stat(path)
+    return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def builtin_lexicon(name):
+    """The raw dictionaries of one of the shipped profiles"""
+    from .profiles import get_profile
+    return get_profile(name).indicator_groups()
+
+
+def main(argv):
+    if len(argv) == 3 and argv[0] == 'compile':
+        source, path = argv[1], argv[2]
+        if source.endswith('.json'):
+            with open(source, encoding='utf-8') as f:
+                groups = json.load(f)
+        else:
+            groups = builtin_lexicon(source)
+        matcher = compile_lexicon(groups)
+        save_lexicon(matcher, path)
+        print(f'{path}: version {matcher.version}, {len(matcher.sequences)} phrases')
+    elif len(argv) == 2 and argv[0] == 'info':
+        matcher = load_lexicon(argv[1])
+        print(f'version {matcher.version}')
+        for group, entries in matcher.groups.items():
+            print(f'  {group}: {len(entries)} phrases')
+    else:
+        print(__doc__)
+        return 1
+    return 0
@@ -0,0 +1,215 @@
+"""Lexicons and rule sets of the two shipped detectors.
+
+"web" is the Flask API's detector and "pro" the desktop app's: a larger
+lexicon plus the sentence-variety rule. Both reproduce the verdicts their
+front ends gave before they shared this engine.
+"""
+
+WEB_AI_INDICATORS = {
+    'formal_phrases': [
+        'furthermore', 'moreover', 'consequently', 'therefore', 'nonetheless',
+        'nevertheless', 'additionally', 'subsequently', 'specifically', 'particularly',
+        'accordingly', 'alternatively', 'simultaneously', 'comprehensively', 'extensively',
+        'systematically', 'methodically', 'strategically', 'effectively', 'efficiently'
+    ],
+    'technical_terms': [
+        'algorithm', 'methodology', 'framework', 'paradigm', 'optimization',
+        'implementation', 'configuration', 'infrastructure', 'architecture', 'protocol',
+        'specification', 'initialization', 'iteration', 'evaluation', 'validation',
+        'authentication', 'authorization', 'encryption', 'deployment', 'scalability'
+    ],
+    'academic_phrases': [
+        'it is important to note', 'it should be emphasized', 'research indicates',
+        'studies suggest', 'evidence shows', 'data reveals', 'analysis demonstrates',
+        'findings indicate', 'results suggest', 'empirical evidence', 'statistical analysis',
+        'peer-reviewed studies', 'theoretical framework', 'conceptual model'
+    ],
+    'structured_phrases': [
+        'in conclusion', 'to summarize', 'in summary', 'overall', 'broadly speaking',
+        'all things considered', 'for instance', 'for example', 'such as', 'including',
+        'particularly', 'especially', 'notably', 'remarkably', 'interestingly'
+    ],
+    'hedge_words': [
+        'potentially', 'possibly', 'presumably', 'arguably', 'conceivably',
+        'theoretically', 'hypothetically', 'allegedly', 'supposedly', 'apparently',
+        'seemingly', 'ostensibly', 'likely', 'probably', 'perhaps', 'might'
+    ]
+}
+
+WEB_HUMAN_INDICATORS = {
+    'conversational': [
+        'i think', 'i believe', 'in my opinion', 'personally', 'honestly',
+        'frankly', 'to be honest', 'i feel like', 'i guess', 'you know',
+        'like', 'um', 'uh', 'well', 'so', 'actually', 'basically',
+        'literally', 'totally', 'really', 'pretty', 'quite', 'sort of'
+    ],
+    'personal_pronouns': [
+        'i am', 'i was', 'i have', 'i had', 'i will', 'i would',
+        'my', 'mine', 'myself', 'me', 'we', 'us', 'our', 'ours'
+    ],
+    'informal_expressions': [
+        'gonna', 'wanna', 'gotta', 'kinda', 'sorta', 'dunno', 'yeah',
+        'yep', 'nope', 'nah', 'ok', 'okay', 'alright', 'sure', 'fine',
+        'cool', 'awesome', 'great', 'amazing', 'weird', 'strange', 'funny'
+    ],
+    'emotional_expressions': [
+        'i love', 'i hate', 'i enjoy', 'i like', 'i dislike', 'i prefer',
+        'i hope', 'i wish', 'i want', 'i need', 'i feel', 'excited',
+        'happy', 'sad', 'angry', 'frustrated', 'surprised', 'confused'
+    ],
+    'contractions': [
+        "i'm", "you're", "he's", "she's", "it's", "we're", "they're",
+        "i've", "you've", "we've", "they've", "i'd", "you'd", "he'd",
+        "won't", "can't", "don't", "doesn't", "didn't", "haven't", "hasn't"
+    ]
+}
+
+PRO_AI_INDICATORS = {
+    'formal_phrases': [
+        'furthermore', 'moreover', 'consequently', 'therefore', 'nonetheless',
+        'nevertheless', 'additionally', 'subsequently', 'specifically', 'particularly',
+        'accordingly', 'alternatively', 'simultaneously', 'comparatively', 'essentially',
+        'fundamentally', 'substantially', 'significantly', 'comprehensively', 'extensively',
+        'systematically', 'methodically', 'strategically', 'effectively', 'efficiently',
+        'predominantly', 'consistently', 'precisely', 'accurately', 'thoroughly',
+        'systematically', 'methodically', 'strategically', 'comprehensively', 'extensively'
+    ],
+    'technical_terms': [
+        'algorithm', 'methodology', 'framework', 'paradigm', 'optimization',
+        'implementation', 'configuration', 'infrastructure', 'architecture', 'protocol',
+        'specification', 'initialization', 'iteration', 'evaluation', 'validation',
+        'authentication', 'authorization', 'encryption', 'deployment', 'scalability',
+        'interoperability', 'compatibility', 'functionality', 'capability', 'reliability',
+        'maintainability', 'sustainability', 'feasibility', 'viability', 'adaptability'
+    ],
+    'academic_phrases': [
+        'it is important to note', 'it should be emphasized', 'it is worth mentioning',
+        'research indicates', 'studies suggest', 'evidence shows', 'data reveals',
+        'analysis demonstrates', 'findings indicate', 'results suggest', 'research shows',
+        'empirical evidence', 'statistical analysis', 'quantitative data', 'qualitative research',
+        'peer-reviewed studies', 'scholarly articles', 'academic literature', 'theoretical framework',
+        'conceptual model', 'hypothesis testing', 'experimental design', 'control group',
+        'sample size', 'statistical significance', 'correlation analysis', 'regression model'
+    ],
+    'structured_phrases': [
+        'in conclusion', 'to summarize', 'in summary', 'to conclude', 'overall',
+        'in general', 'broadly speaking', 'on the whole', 'all things considered',
+        'taking everything into account', 'to put it simply', 'in other words',
+        'that is to say', 'namely', 'specifically', 'for instance', 'for example',
+        'such as', 'including', 'particularly', 'especially', 'notably', 'remarkably',
+        'interestingly', 'surprisingly', 'unexpectedly', 'predictably', 'understandably'
+    ],
+    'hedge_words': [
+        'potentially', 'possibly', 'presumably', 'arguably', 'conceivably',
+        'theoretically', 'hypothetically', 'presumably', 'allegedly', 'supposedly',
+        'apparently', 'seemingly', 'ostensibly', 'evidently', 'presumably',
+        'likely', 'probably', 'possibly', 'perhaps', 'maybe', 'might',
+        'could', 'would', 'should', 'may', 'can', 'generally', 'typically',
+        'usually', 'commonly', 'frequently', 'often', 'sometimes', 'occasionally'
+    ]
+}
+
+PRO_HUMAN_INDICATORS = {
+    'conversational': [
+        'i think', 'i believe', 'in my opinion', 'personally', 'honestly',
+        'frankly', 'to be honest', 'i feel like', 'i guess', 'i suppose',
+        'you know', 'like', 'um', 'uh', 'well', 'so', 'actually',
+        'basically', 'literally', 'totally', 'really', 'pretty', 'quite',
+        'sort of', 'kind of', 'a bit', 'a little', 'somewhat', 'rather',
+        'fairly', 'definitely', 'absolutely', 'certainly', 'surely', 'obviously'
+    ],
+    'personal_pronouns': [
+        'i am', 'i was', 'i have', 'i had', 'i will', 'i would',
+        'i do', 'i did', 'i can', 'i could', 'i should', 'i must',
+        'my', 'mine', 'myself', 'me', 'we', 'us', 'our', 'ours',
+        'ourselves', 'you', 'your', 'yours', 'yourself', 'yourselves'
+    ],
+    'informal_expressions': [
+        'gonna', 'wanna', 'gotta', 'kinda', 'sorta', 'dunno', 'yeah',
+        'yep', 'nope', 'nah', 'ok', 'okay', 'alright', 'sure', 'fine',
+        'cool', 'awesome', 'great', 'amazing', 'fantastic', 'wonderful',
+        'terrible', 'awful', 'horrible', 'weird', 'strange', 'funny',
+        'crazy', 'insane', 'nuts', 'wild', 'sick', 'dope', 'lit'
+    ],
+    'emotional_expressions': [
+        'i love', 'i hate', 'i enjoy', 'i like', 'i dislike', 'i prefer',
+        'i hope', 'i wish', 'i want', 'i need', 'i feel', 'i think',
+        'excited', 'happy', 'sad', 'angry', 'frustrated', 'disappointed',
+        'surprised', 'shocked', 'amazed', 'confused', 'worried', 'scared',
+        'nervous', 'anxious', 'relieved', 'grateful', 'proud', 'ashamed'
+    ],
+    'internet_slang': [
+        'lol', 'lmao', 'rofl', 'omg', 'wtf', 'btw', 'fyi', 'imo', 'imho',
+        'tbh', 'ngl', 'smh', 'fml', 'yolo', 'bae', 'squad', 'goals',
+        'vibes', 'mood', 'stan', 'ship', 'tea', 'spill', 'salty',
+        'savage', 'fire', 'ghost', 'flex', 'cap', 'no cap', 'periodt'
+    ],
+    'casual_time_refs': [
+        'yesterday', 'today', 'tomorrow', 'this morning', 'last night',
+        'right now', 'just now', 'a while ago', 'earlier', 'later',
+        'soon', 'recently', 'lately', 'nowadays', 'these days',
+        'back in the day', 'once upon a time', 'the other day'
+    ],
+    'personal_experiences': [
+        'my friend', 'my family', 'my mom', 'my dad', 'my brother',
+        'my sister', 'my job', 'my boss', 'my teacher', 'my school',
+        'when i was', 'i remember', 'i recall', 'i experienced',
+        'happened to me', 'i went to', 'i saw', 'i met', 'i heard'
+    ],
+    'contractions': [
+        "i'm", "you're", "he's", "she's", "it's", "we're", "they're",
+        "i've", "you've", "we've", "they've", "i'd", "you'd", "he'd",
+        "she'd", "we'd", "they'd", "i'll", "you'll", "he'll", "she'll",
+        "we'll", "they'll", "won't", "can't", "don't", "doesn't",
+        "didn't", "haven't", "hasn't", "hadn't", "shouldn't", "wouldn't",
+        "couldn't", "mustn't", "needn't", "daren't", "oughtn't"
+    ]
+}
+
+PASSIVE_PATTERNS = ['was', 'were', 'been', 'being']
+
+
+class Profile:
+    """A lexicon plus the scoring rules that go with it.
+
+    `rules` names the scoring rules and is part of the detector version, so
+    change it whenever a rule changes.
+    """
+
+    def __init__(self, name, ai_indicators, human_indicators, passive_patterns=PASSIVE_PATTERNS,
+                 rules='rules-3', sentence_variety=False, neutral_label='Inconclusive', language='en'):
+        self.name = name
+        self.ai_indicators = ai_indicators
+        self.human_indicators = human_indicators
+        self.passive_patterns = passive_patterns
+        self.rules = rules
+        # Reward texts whose sentences have many different lengths
+        self.sentence_variety = sentence_variety
+        # Prediction when no rule fired at all
+        self.neutral_label = neutral_label
+        # Language of the lexicon; other languages use language packs (see languages.py)
+        self.language = language
+
+    def indicator_groups(self):
+        return {
+            'ai': self.ai_indicators,
+            'human': self.human_indicators,
+            'passive': {'passive': self.passive_patterns}
+        }
+
+
+PROFILES = {
+    'web': Profile('web', WEB_AI_INDICATORS, WEB_HUMAN_INDICATORS),
+    'pro': Profile('pro', PRO_AI_INDICATORS, PRO_HUMAN_INDICATORS, rules='rules-3-pro',
+                   sentence_variety=True, neutral_label='Neutral'),
+}
+
+
+def get_profile(profile):
+    """Look up a profile by name; Profile instances are returned unchanged"""
+    if isinstance(profile, Profile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f'Unknown profile {profile!r}, expected one of {sorted(PROFILES)}') from None
@@ -0,0 +1,85 @@
+"""Sentence segmentation shared by TextStats, SpanRecorder and incremental blocks.
+
+A sentence ends with a word whose last character, after any closing quotes
+or brackets, is '.', '!', '?' or '…', unless that '.' belongs to an
+abbreviation ("Dr.", "e.g.", "U.S.") or an initial ("J."). Decimals and
+dotted names ("3.14", "example.com") never end one. The decision only looks
+at the word itself, so pieces split on whitespace are segmented exactly as
+the whole text would be.
+
+Words that could end a sentence are found at C speed (by translating the
+string of the words' last characters, or by one regex over the text); only
+those few candidates are looked at in Python, and no sentence is ever
+copied out.
+"""
+import re
+from itertools import accumulate
+from operator import itemgetter
+
+TERMINATORS = '.!?…'
+CLOSERS = '"\'’”)]}»'
+OPENERS = '"\'‘“([{«'
+# Abbreviations that are practically never the last word of a sentence
+ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'mt', 'vs', 'cf', 'al', 'approx', 'ca',
+    'fig', 'figs', 'eq', 'vol', 'vols', 'pp', 'dept', 'gen', 'gov', 'sen', 'rep', 'rev', 'hon',
+    'capt', 'col', 'lt', 'sgt', 'cpl'
+})
+# Longest word looked up around a candidate offset before scanning back char by char
+WINDOW = 32
+
+# Candidate last characters become '\0', so splitting on it gives the gaps between candidates
+_CANDIDATES = str.maketrans({char: '\0' for char in TERMINATORS + CLOSERS} | {'\0': ' '})
+_CANDIDATE_END_RE = re.compile(r'[%s](?!\S)' % re.escape(TERMINATORS + CLOSERS))
+_ACRONYM_RE = re.compile(r'(?:[^\W\d_]\.)+[^\W\d_]')
+# Candidate word -> ends_sentence(word); natural text keeps reusing the same few
+_verdicts = {}
+
+
+def ends_sentence(word):
+    """Whether a whitespace-separated word is the last word of a sentence"""
+    stripped = word.rstrip(CLOSERS)
+    if not stripped or stripped[-1] not in TERMINATORS:
+        return False
+    if stripped[-1] != '.' or stripped.endswith('..'):
+        return True
+    token = stripped[:-1].lstrip(OPENERS)
+    if len(token) == 1:
+        # "J." is an initial, "a." and "3." end sentences
+        return not token.isupper()
+    return not (token.lower() in ABBREVIATIONS or _ACRONYM_RE.fullmatch(token))
+
+
+def _ends_sentence(word):
+    verdict = _verdicts.get(word)
+    if verdict is None:
+        if len(_verdicts) > 1 << 16:
+            _verdicts.clear()
+        verdict = _verdicts[word] = ends_sentence(word)
+    return verdict
+
+
+def sentence_breaks(words):
+    """Indices of the words (as from str.split()) that end a sentence"""
+    gaps = ''.join(map(itemgetter(-1), words)).translate(_CANDIDATES).split('\0')
+    candidates = accumulate(map(len, gaps[:-1]), lambda previous, gap: previous + gap + 1, initial=-1)
+    next(candidates)
+    return [i for i in candidates if _ends_sentence(words[i])]
+
+
+def sentence_ends(text):
+    """Offsets in `text` right after each word that ends a sentence"""
+    ends = []
+    for match in _CANDIDATE_END_RE.finditer(text):
+        end = match.end()
+        window = text[max(end - WINDOW, 0):end]
+        word = window.split()[-1]
+        if len(word) == WINDOW:
+            # The word may start before the window
+            start = end - WINDOW
+            while start and not text[start - 1].isspace():
+                start -= 1
+            word = text[start:end]
+        if _ends_sentence(word):
+            ends.append(end)
+    return ends
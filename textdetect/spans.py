@@ -0,0 +1,130 @@
+import re
+
+from .sentences import sentence_ends
+from .token_index import TokenIndex, tokenize_offsets
+
+DEFAULT_LIMIT = 100
+_NON_SPACE_RE = re.compile(r'\S')
+
+
+class SpanRecorder:
+    """Where the indicators of one document are, collected while TextStats counts them.
+
+    Every match becomes a span with character offsets into the document and
+    the index of its sentence, in the order the matches end; every sentence
+    (see sentences.py, as TextStats counts them) gets its per-group match
+    counts. Only the requested page of spans and of sentences is kept, so
+    memory stays bounded for any document; `limit=None` keeps everything.
+    """
+
+    def __init__(self, offset=0, limit=DEFAULT_LIMIT, sentence_offset=0, sentence_limit=DEFAULT_LIMIT):
+        self.offset = offset
+        self.limit = limit
+        self.sentence_offset = sentence_offset
+        self.sentence_limit = sentence_limit
+        self.spans = []
+        self.sentences = []
+        self.span_total = 0
+        self.sentence_total = 0
+        self._entries = None
+        self._keep = 0
+        # Offsets of the context tokens carried over from the previous piece
+        self._starts = []
+        self._ends = []
+        # The sentence still open at the end of the last piece
+        self._sentence_start = None
+        self._sentence_counts = {}
+        self._end = 0
+
+    def index(self, matcher, piece, base, context):
+        """Tokenize a piece starting at document offset `base`, keeping token offsets"""
+        if self._entries is None:
+            # Sequence id -> every (group, phrase, category) listing it, as evaluate() counts them
+            self._entries = {}
+            for group, entries in matcher.groups.items():
+                for phrase, category, sid in entries:
+                    self._entries.setdefault(sid, []).append((group, phrase, category))
+            self._keep = matcher.max_length - 1
+
+        lowered = piece.lower()
+        tokens, starts, ends = tokenize_offsets(lowered)
+        if len(lowered) != len(piece):
+            # A few characters lowercase to more than one; map offsets back to the piece
+            origin = []
+            for i, char in enumerate(piece):
+                origin.extend([i] * len(char.lower()))
+            origin.append(len(piece))
+            starts = [origin[start] for start in starts]
+            ends = [origin[end - 1] + 1 for end in ends]
+        self._starts = self._starts + [base + start for start in starts]
+        self._ends = self._ends + [base + end for end in ends]
+        return TokenIndex(tokens, matcher.anchors, context)
+
+    def record(self, piece, base, found):
+        """Turn the matches of the last indexed piece into spans and close its sentences"""
+        starts = self._starts
+        # A match is reported with the piece holding its last token, so ordering
+        # by the last token keeps the span order independent of the piece sizes
+        found.sort(key=lambda match: (match[2], match[1], match[0]))
+        position = 0
+        k = 0
+        for end in sentence_ends(piece):
+            if self._sentence_start is None:
+                self._sentence_start = base + _NON_SPACE_RE.search(piece, position).start()
+            # A match belongs to the sentence its last token is in
+            stop = base + end
+            while k < len(found) and starts[found[k][2]] < stop:
+                self._add(found[k])
+                k += 1
+            self._close_sentence(stop)
+            position = end
+        if self._sentence_start is None:
+            word = _NON_SPACE_RE.search(piece, position)
+            if word:
+                self._sentence_start = base + word.start()
+        for match in found[k:]:
+            self._add(match)
+
+        if piece.strip():
+            self._end = base + len(piece.rstrip())
+        if self._keep:
+            self._starts = starts[-self._keep:]
+            self._ends = self._ends[-self._keep:]
+        else:
+            self._starts = []
+            self._ends = []
+
+    def finish(self):
+        self._close_sentence(self._end)
+
+    def _add(self, match):
+        sid, first, last = match
+        start = self._starts[first]
+        end = self._ends[last]
+        counts = self._sentence_counts
+        for group, phrase, category in self._entries[sid]:
+            counts[group] = counts.get(group, 0) + 1
+            if _in_page(self.span_total, self.offset, self.limit):
+                self.spans.append({'start': start, 'end': end, 'phrase': phrase, 'group': group,
+                                   'category': category, 'sentence': self.sentence_total})
+            self.span_total += 1
+
+    def _close_sentence(self, end):
+        if self._sentence_start is None:
+            return
+        if _in_page(self.sentence_total, self.sentence_offset, self.sentence_limit):
+            self.sentences.append((self._sentence_start, end, self._sentence_counts))
+        self.sentence_total += 1
+        self._sentence_start = None
+        self._sentence_counts = {}
+
+
+def _in_page(number, offset, limit):
+    return number >= offset and (limit is None or number < offset + limit)
+
+
+def page(items, total, offset, limit):
+    """A page of results with the offset of the next one (None on the last page)"""
+    end = offset + len(items)
+    more = limit is not None and end < total
+    return {'total': total, 'offset': offset, 'next_offset': end if more else None, 'items': items}
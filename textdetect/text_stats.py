@@ -0,0 +1,156 @@
+import codecs
+from collections import Counter
+from time import perf_counter
+
+from .sentences import sentence_breaks
+
+CHUNK_SIZE = 64 * 1024
+
+
+def add_time(timings, stage, seconds):
+    """Accumulate a stage duration into a {stage: seconds} dict, if one is given"""
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+class TextStats:
+    """Running totals for one document, fed piece by piece.
+
+    Pieces must be split on whitespace (see `read_pieces`) so that no word is
+    cut in half. Memory is bounded by the piece size plus the vocabulary,
+    whatever the length of the document. If `timings` is a dict, the time
+    spent in each stage is added to it; a SpanRecorder as `spans` also
+    collects where each indicator and sentence is, in the same pass.
+    """
+
+    def __init__(self, matcher, timings=None, spans=None):
+        self.matcher = matcher
+        self.timings = timings
+        self.spans = spans
+        self.counts = [0] * len(matcher.sequences)
+        self.char_count = 0
+        self.word_count = 0
+        # Word -> occurrences, so totals of independent pieces can be combined
+        self.vocab = Counter()
+        self.sentence_count = 0
+        self.sentence_words = 0
+        self.sentence_lengths = Counter()
+        # Words of the sentence still open at the end of the last piece
+        self._open_words = 0
+        # Trailing tokens kept so that phrases can span two pieces
+        self._tail = []
+        # P(AI) from the detector's scorer when the rules were a close call
+        self.model_probability = None
+
+    def feed(self, piece):
+        start = perf_counter()
+        self.char_count += len(piece)
+
+        words = piece.split()
+        self.word_count += len(words)
+        self.vocab.update(words)
+
+        # Sentences (see sentences.py) may continue across pieces
+        previous = -1
+        for i in sentence_breaks(words):
+            self._open_words += i - previous
+            self._close_sentence()
+            previous = i
+        self._open_words += len(words) - 1 - previous
+        counted = perf_counter()
+
+        if self.spans is None:
+            index = self.matcher.index(piece.lower(), self._tail)
+            tokenized = perf_counter()
+            # One pass counts the AI, human and passive phrases together
+            self.matcher.count(index, self.counts)
+        else:
+            base = self.char_count - len(piece)
+            index = self.spans.index(self.matcher, piece, base, self._tail)
+            tokenized = perf_counter()
+            self.spans.record(piece, base, self.matcher.locate(index, self.counts))
+        keep = self.matcher.max_length - 1
+        self._tail = index.tokens[-keep:] if keep else []
+
+        if self.timings is not None:
+            add_time(self.timings, 'stats', counted - start)
+            add_time(self.timings, 'tokenize', tokenized - counted)
+            add_time(self.timings, 'match', perf_counter() - tokenized)
+
+    def _close_sentence(self):
+        if self._open_words:
+            self.sentence_count += 1
+            self.sentence_words += self._open_words
+            self.sentence_lengths[self._open_words] += 1
+            self._open_words = 0
+
+    def finish(self):
+        self._close_sentence()
+        if self.spans is not None:
+            self.spans.finish()
+        self._tail = []
+        return self
+
+    def add(self, other):
+        """Add the totals of a finished, independent piece of text"""
+        self._combine(other, 1)
+        return self
+
+    def subtract(self, other):
+        """Remove the totals of a piece that was previously added"""
+        self._combine(other, -1)
+        return self
+
+    def _combine(self, other, sign):
+        counts = self.counts
+        for i, count in enumerate(other.counts):
+            if count:
+                counts[i] += sign * count
+        self.char_count += sign * other.char_count
+        self.word_count += sign * other.word_count
+        self.sentence_count += sign * other.sentence_count
+        self.sentence_words += sign * other.sentence_words
+        for target, source in ((self.vocab, other.vocab),
+                               (self.sentence_lengths, other.sentence_lengths)):
+            for key, count in source.items():
+                left = target[key] + sign * count
+                if left:
+                    target[key] = left
+                else:
+                    del target[key]
+
+    def matches(self):
+        """{group: [(phrase, count, category), ...]} for everything fed so far"""
+        return self.matcher.report(self.counts)
+
+
+def iter_chunks(stream, chunk_size=CHUNK_SIZE):
+    """Read a file-like object in fixed-size chunks"""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_pieces(chunks, max_buffer=16 * CHUNK_SIZE):
+    """Re-split str or UTF-8 bytes chunks so every piece ends on whitespace"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    buffer = ''
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        buffer += chunk
+        # Hold back the trailing partial word; it is completed by the next chunk
+        cut = len(buffer)
+        while cut and not buffer[cut - 1].isspace():
+            cut -= 1
+        if not cut and len(buffer) < max_buffer:
+            continue
+        # A single "word" longer than max_buffer is split rather than buffered
+        cut = cut or len(buffer)
+        yield buffer[:cut]
+        buffer = buffer[cut:]
+    buffer += decoder.decode(b'', final=True)
+    if buffer:
+        yield buffer
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import re
+from collections import Counter
+
+# Words keep inner apostrophes and hyphens ("wasn't", "peer-reviewed").
+# Sentence and clause punctuation (commas, colons, quotes, dashes, ...) is
+# kept as its own token so that multi-word phrases never match across it.
+TOKEN_RE = re.compile(r"[^\W_]+(?:['-][^\W_]+)*|[.!?,;:…\"'“”‘()\[\]—–-]")
+
+
+def tokenize(text_lower):
+    """Split already-lowercased text into word and punctuation tokens"""
+    if '’' in text_lower:
+        text_lower = text_lower.replace('’', "'")
+    return TOKEN_RE.findall(text_lower)
+
+
+def tokenize_offsets(text_lower):
+    """tokenize(), plus the start and end offset of every token"""
+    if '’' in text_lower:
+        text_lower = text_lower.replace('’', "'")
+    tokens = []
+    starts = []
+    ends = []
+    for match in TOKEN_RE.finditer(text_lower):
+        tokens.append(match.group())
+        starts.append(match.start())
+        ends.append(match.end())
+    return tokens, starts, ends
+
+
+class TokenIndex:
+    """Per-document token -> positions index built in one tokenization pass
+
+    `context` holds tokens already counted from a previous piece of the same
+    document; they are only used to complete phrases that span the boundary.
+    """
+
+    def __init__(self, tokens, anchors=(), context=()):
+        self.start = len(context)
+        self.tokens = list(context) + tokens if context else tokens
+        self.counts = Counter(tokens)
+        # Positions are only needed for tokens that start a multi-word phrase
+        anchors = {tok for tok in anchors if tok in self.counts or tok in context}
+        self.positions = {tok: [] for tok in anchors}
+        if anchors:
+            for i, tok in enumerate(self.tokens):
+                if tok in anchors:
+                    self.positions[tok].append(i)
+
+    def count(self, token):
+        return self.counts.get(token, 0)
+
+
+class TokenMatcher:
+    """Word-boundary-aware indicator matcher backed by a TokenIndex"""
+
+    def __init__(self, groups):
+        # groups: {'ai': {category: [phrase, ...]}, 'human': {...}, ...}
+        # The version changes whenever any phrase or category changes, so it
+        # can be used to invalidate anything derived from the matcher's output
+        version = hashlib.sha256(
+            json.dumps(groups, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:16]
+        compiled = {}
+        sequences = []
+        sequence_ids = {}
+        for group, indicators in groups.items():
+            entries = compiled[group] = []
+            for category, phrases in indicators.items():
+                for phrase in phrases:
+                    sequence = tuple(tokenize(phrase.lower()))
+                    if sequence not in sequence_ids:
+                        sequence_ids[sequence] = len(sequences)
+                        sequences.append(sequence)
+                    entries.append((phrase, category, sequence_ids[sequence]))
+        self._setup(version, compiled, sequences)
+
+    @classmethod
+    def from_compiled(cls, version, groups, sequences):
+        """Rebuild a matcher from already tokenized tables (see lexicon.py)"""
+        matcher = cls.__new__(cls)
+        matcher._setup(version, groups, sequences)
+        return matcher
+
+    def _setup(self, version, groups, sequences):
+        # groups: {group: [(phrase, category, sequence_id), ...]}
+        self.version = version
+        self.groups = groups
+        self.sequences = sequences
+
+        # Single words are plain hash lookups on the index; multi-word phrases
+        # are walked through a token trie from each position of their first word
+        self.singles = []
+        self.single_ids = {}
+        self.trie = {}
+        for sid, sequence in enumerate(self.sequences):
+            if len(sequence) == 1:
+                self.singles.append((sid, sequence[0]))
+                self.single_ids[sequence[0]] = sid
+                continue
+            node = self.trie
+            for token in sequence:
+                node = node.setdefault(token, {})
+            node[''] = sid
+        self.anchors = set(self.trie)
+        self.max_length = max((len(seq) for seq in self.sequences), default=1)
+
+    def index(self, text_lower, context=()):
+        return TokenIndex(tokenize(text_lower), self.anchors, context)
+
+    def count(self, index, counts=None):
+        """Add per-sequence counts for an indexed document (or piece) to `counts`"""
+        if counts is None:
+            counts = [0] * len(self.sequences)
+        for sid, token in self.singles:
+            counts[sid] += index.count(token)
+
+        tokens = index.tokens
+        size = len(tokens)
+        # Matches ending inside the context were counted with the previous piece
+        first_end = index.start
+        for first, positions in index.positions.items():
+            root = self.trie[first]
+            for i in positions:
+                node = root
+                j = i + 1
+                while j < size:
+                    node = node.get(tokens[j])
+                    if node is None:
+                        break
+                    sid = node.get('')
+                    if sid is not None and j >= first_end:
+                        counts[sid] += 1
+                    j += 1
+        return counts
+
+    def locate(self, index, counts):
+        """Like count(), but also return (sequence id, first token, last token) of every match
+
+        Token positions are indices into `index.tokens`, context included.
+        """
+        found = []
+        tokens = index.tokens
+        size = len(tokens)
+        first_end = index.start
+        single_ids = self.single_ids
+        if single_ids:
+            for i in range(first_end, size):
+                sid = single_ids.get(tokens[i])
+                if sid is not None:
+                    found.append((sid, i, i))
+
+        for first, positions in index.positions.items():
+            root = self.trie[first]
+            for i in positions:
+                node = root
+                j = i + 1
+                while j < size:
+                    node = node.get(tokens[j])
+                    if node is None:
+                        break
+                    sid = node.get('')
+                    if sid is not None and j >= first_end:
+                        found.append((sid, i, j))
+                    j += 1
+
+        for sid, _, _ in found:
+            counts[sid] += 1
+        return found
+
+    def find(self, text_lower, index=None):
+        """Return {group: [(phrase, count, category), ...]} for phrases in text"""
+        return self.report(self.count(index or self.index(text_lower)))
+
+    def report(self, counts):
+        """Turn per-sequence counts into {group: [(phrase, count, category), ...]}"""
+        return {
+            group: [(phrase, counts[sid], category)
+                    for phrase, category, sid in entries if counts[sid]]
+            for group, entries in self.groups.items()
+        }
@@ -0,0 +1,90 @@
+"""Weights and thresholds of the scoring rules, loadable from a JSON file.
+
+The defaults are the rules the profiles shipped with. calibrate.py tunes them
+on a labeled corpus and writes a file in the format load_weights reads: a
+JSON object of any of the DEFAULTS keys, the others keeping their default,
+plus the "profile" and "lexicon" (matcher version) they were tuned for.
+A Detector refuses weights tuned for another profile or lexicon.
+"""
+import hashlib
+import json
+import os
+
+DEFAULTS = {
+    # Score per indicator match, and per passive-voice marker (to the AI side)
+    'indicator': 2,
+    'passive': 0.5,
+    # Average sentence length above which the AI side scores, and below which the human side does
+    'long_sentence_words': 25,
+    'long_sentence_score': 5,
+    'short_sentence_words': 12,
+    'short_sentence_score': 3,
+    # Share of distinct sentence lengths above which the human side scores (sentence_variety profiles)
+    'variety_ratio': 0.7,
+    'variety_score': 3,
+    # Vocabulary ratio above which the AI side scores, and below which the human side does
+    'high_vocab_ratio': 0.8,
+    'high_vocab_score': 2,
+    'low_vocab_ratio': 0.6,
+    'low_vocab_score': 2,
+    # Highest confidence a rule verdict reports
+    'confidence_cap': 95
+}
+
+
+class Weights:
+    """One setting of the scoring rules; unspecified values keep their default
+
+    `profile` and `lexicon` name the profile and matcher version the weights
+    were tuned for (None: any); they are not part of the version.
+    """
+
+    def __init__(self, profile=None, lexicon=None, **values):
+        self.profile = profile
+        self.lexicon = lexicon
+        unknown = set(values) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f'Unknown scoring weights {sorted(unknown)}, expected some of {sorted(DEFAULTS)}')
+        for name, default in DEFAULTS.items():
+            value = values.get(name, default)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not value >= 0:
+                raise ValueError(f'Scoring weight {name!r} must be a non-negative number, got {value!r}')
+            setattr(self, name, value)
+        self.is_default = self.to_dict() == DEFAULTS
+        # Part of the detector version unless the weights are the defaults
+        digest = hashlib.sha256(json.dumps({name: float(value) for name, value in self.to_dict().items()},
+                                           sort_keys=True).encode('utf-8'))
+        self.version = f'w-{digest.hexdigest()[:12]}'
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in DEFAULTS}
+
+    def check(self, profile, lexicon):
+        """Raise ValueError unless the weights fit a detector with this profile name and matcher version"""
+        if self.profile is not None and self.profile != profile:
+            raise ValueError(f'Scoring weights were tuned for profile {self.profile!r}, not {profile!r}')
+        if self.lexicon is not None and self.lexicon != lexicon:
+            raise ValueError(f'Scoring weights were tuned for lexicon {self.lexicon}, not {lexicon}')
+
+    def save(self, path):
+        """Write the weights to `path` atomically"""
+        values = self.to_dict()
+        for name in ('profile', 'lexicon'):
+            if getattr(self, name) is not None:
+                values[name] = getattr(self, name)
+        temporary = f'{path}.tmp{os.getpid()}'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(values, f, indent=2)
+            f.write('\n')
+        os.replace(temporary, path)
+
+
+DEFAULT_WEIGHTS = Weights()
+
+
+def load_weights(path):
+    with open(path, encoding='utf-8') as f:
+        values = json.load(f)
+    if not isinstance(values, dict):
+        raise ValueError(f'{path}: expected a JSON object of scoring weights')
+    return Weights(**values)
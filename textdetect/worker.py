@@ -0,0 +1,81 @@
+import queue
+import threading
+
+from .text_stats import CHUNK_SIZE
+
+
+class Cancelled(Exception):
+    pass
+
+
+class AnalysisWorker:
+    """One persistent background thread that analyzes the latest submitted text.
+
+    submit() supersedes every earlier job: a queued job is skipped and a
+    running one stops at its next chunk. `analyze` receives an iterable of
+    text chunks (e.g. Detector.analyze_stream) and `on_result(job_id, result,
+    error)` is called on the worker thread for jobs that were not superseded.
+    """
+
+    def __init__(self, analyze, on_result, chunk_size=CHUNK_SIZE):
+        self.analyze = analyze
+        self.on_result = on_result
+        self.chunk_size = chunk_size
+        self._jobs = queue.Queue()
+        self._current = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='analysis-worker', daemon=True)
+        self._thread.start()
+
+    def submit(self, text, analyze=None):
+        """Queue `text` for analysis and return its job id.
+
+        `analyze` replaces the worker's callable for this job; it gets the
+        whole text rather than chunks, so it runs to completion even when the
+        job is superseded (only its result is dropped).
+        """
+        with self._lock:
+            self._current += 1
+            job_id = self._current
+        self._jobs.put((job_id, text, analyze))
+        return job_id
+
+    def cancel(self):
+        """Drop the queued and running jobs"""
+        with self._lock:
+            self._current += 1
+
+    def is_current(self, job_id):
+        return job_id == self._current
+
+    def stop(self, timeout=None):
+        self.cancel()
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    def _chunks(self, job_id, text):
+        for start in range(0, len(text), self.chunk_size):
+            if job_id != self._current:
+                raise Cancelled()
+            yield text[start:start + self.chunk_size]
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            job_id, text, analyze = job
+            if job_id != self._current:
+                continue
+            result = error = None
+            try:
+                if analyze is not None:
+                    result = analyze(text)
+                else:
+                    result = self.analyze(self._chunks(job_id, text))
+            except Cancelled:
+                continue
+            except Exception as e:
+                error = e
+            if job_id == self._current:
+                self.on_result(job_id, result, error)